@@ -25,6 +25,41 @@ LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 # 数据库配置
 DATABASE_URL = "sqlite:///" + os.path.join(DATA_DIR, "smilex_agent.db")
 
+# 存储配置
+STORAGE_CONFIG = {
+    # 热榜快照：每次轮询只记录相对上次快照的变化（新上榜、下榜、排名变化、热度变化超过阈值），
+    # 每KEYFRAME_INTERVAL次轮询记录一次完整热榜作为关键帧，重建任意时刻热榜时最多回放这么多次快照
+    "HOT_LIST_SNAPSHOT": {
+        "KEYFRAME_INTERVAL": 48,
+        # 排名未变时，热度相对上次记录值的变化达到该比例才记录，0表示任何变化都记录
+        "HEAT_CHANGE_THRESHOLD": 0.02,
+    },
+    # 爬取工作队列：多个工作进程按租约领取关键词，python -m crawler.zhihu.queue_worker 入队和启动工作进程；
+    # 多台机器共享同一存储卷时DATABASE_URL需指向该卷上的SQLite文件（网络文件系统需支持文件锁）
+    "WORK_QUEUE": {
+        # 队列数据库，None表示与DATABASE_URL使用同一个数据库
+        "DATABASE_URL": None,
+        # 租约时长（秒），工作进程每隔三分之一租约时长续租一次，进程退出后租约到期即重新入队
+        "VISIBILITY_TIMEOUT": 300,
+        # 单个条目最多领取次数，超过后标记为failed
+        "MAX_ATTEMPTS": 3,
+        # 失败后重新可领取前的延迟（秒）
+        "RETRY_DELAY": 30,
+        # 队列为空时的轮询间隔（秒）
+        "POLL_INTERVAL": 5.0,
+        # 默认工作进程数
+        "WORKERS": 4,
+    },
+    # SQLite等待其他进程释放写锁的最长时间（秒），多个工作进程同时入库时避免database is locked
+    "SQLITE_BUSY_TIMEOUT": 30,
+    # 批量入库时每块的行数：每块一次IN查询加一条多行INSERT（SQLite单条语句的参数个数有上限，不宜过大）
+    "BULK_CHUNK_SIZE": 500,
+    # 保存已存在的回答时是否刷新点赞数和评论数（内容未变化的回答默认直接跳过）
+    "REFRESH_ANSWER_METRICS": False,
+    # 批量保存内容评分时每个事务提交的评分条数
+    "SCORE_COMMIT_CHUNK_SIZE": 200,
+}
+
 # 大模型配置
 # OpenAI配置（默认）
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -47,6 +82,99 @@ CRAWLER_CONFIG = {
         "MAX_RETRIES": 3,
         "DOWNLOAD_DELAY": 2,
         "CONCURRENT_REQUESTS": 4,
+        # 每个主机每秒允许的请求数（令牌桶速率），进程内所有爬虫实例共享
+        "RATE_LIMIT": 0.5,
+        # 令牌桶容量，允许的瞬时突发请求数
+        "RATE_BURST": 2,
+        # HTML解析后端："lxml"（默认，预编译XPath）或 "bs4"（BeautifulSoup回退）
+        "PARSER_BACKEND": "lxml",
+        # 热门列表解析池的工作线程/进程数，1表示在当前线程顺序解析
+        "PARSE_WORKERS": 4,
+        # 解析池类型："thread" 或 "process"（大列表时进程池可绕开GIL）
+        "PARSE_EXECUTOR": "thread",
+        # 搜索翻页预取深度：解析第N页时后台最多提前获取的页数，0表示关闭预取（仍受限速器约束）
+        "SEARCH_PREFETCH_DEPTH": 1,
+        # API响应JSON解码器："auto"（安装orjson时使用orjson，否则回退到标准库json）、"orjson" 或 "json"
+        "JSON_DECODER": "auto",
+        # 解码后只保留解析用到的字段。完整解码结果已在内存中，投影不减少解码开销，只额外遍历一次，
+        # 解析本身也只读取用到的字段，因此默认关闭（bench_json.py可对比开销）
+        "JSON_PROJECTION": False,
+        # GET响应磁盘缓存：TTL内直接使用缓存，过期后发送条件请求，304时从磁盘返回
+        "HTTP_CACHE": {
+            "ENABLED": False,
+            "DIR": os.path.join(DATA_DIR, "http_cache"),
+            # 缓存正文总大小上限，超出后按LRU淘汰
+            "MAX_BYTES": 256 * 1024 * 1024,
+            # 未匹配到端点规则时的TTL（秒），0表示每次都发送条件请求
+            "DEFAULT_TTL": 0,
+            # URL路径前缀到TTL（秒）的映射，最长前缀优先
+            "TTLS": {
+                "/hot": 300,
+                "/api/v4/search_v3": 600,
+                "/question/": 3600,
+            },
+        },
+        # 自适应限速（AIMD）：响应健康时逐步提高速率和并发，遇到429/5xx或p95延迟升高时减半，并遵守Retry-After；
+        # 启用后RATE_LIMIT和CONCURRENT_REQUESTS作为初始值
+        "ADAPTIVE": {
+            "ENABLED": False,
+            "MIN_RATE": 0.2,
+            "MAX_RATE": 10.0,
+            # 每INCREASE_EVERY个健康响应，速率增加RATE_STEP、并发数增加1
+            "RATE_STEP": 0.1,
+            "INCREASE_EVERY": 10,
+            "MIN_CONCURRENCY": 1,
+            "MAX_CONCURRENCY": 16,
+            # 乘性减小系数
+            "DECREASE_FACTOR": 0.5,
+            # 触发减速的状态码
+            "DECREASE_STATUS": [429, 502, 503, 504],
+            # p95延迟统计窗口，以及超过基线多少倍视为拥塞
+            "LATENCY_WINDOW": 50,
+            "LATENCY_TOLERANCE": 2.0,
+            # 两次减速的最小间隔（秒），避免同一批在途请求重复减速
+            "COOLDOWN": 1.0,
+            # Retry-After的最长等待时间（秒）
+            "MAX_RETRY_AFTER": 300,
+        },
+        # 已见ID过滤器：启动时从数据库预热已入库的问题ID和回答ID，搜索结果在清理HTML、解析之前跳过已入库的回答，
+        # 入库时自动更新；set模式精确，bloom模式内存固定但有BLOOM_ERROR_RATE概率把新回答误判为已见
+        "SEEN_FILTER": {
+            "ENABLED": False,
+            "MODE": "set",
+            # 匹配方式：id只要回答ID已入库就跳过，已入库回答的内容变化不会再被检测和更新；
+            # content按（ID, 正文原始HTML指纹）匹配，内容变化的回答会重新清理并更新入库。
+            # 两种方式都会跳过内容未变化的回答，因此开启STORAGE_CONFIG的REFRESH_ANSWER_METRICS时搜索不使用过滤器
+            "MATCH": "id",
+            # bloom模式的预期ID数量和误判率
+            "BLOOM_CAPACITY": 10_000_000,
+            "BLOOM_ERROR_RATE": 0.001,
+            # 预热时每批从数据库读取的行数
+            "WARM_BATCH_SIZE": 10000,
+        },
+        # 连接池：进程内所有爬虫实例按主机共享keep-alive连接，避免每个实例重复TCP/TLS握手
+        "CONNECTION_POOL": {
+            "SHARED": True,
+            # 缓存的主机连接池数量
+            "POOL_CONNECTIONS": 10,
+            # 每个主机保持的最大连接数，None表示按CONCURRENT_REQUESTS推算（启用ADAPTIVE时取MAX_CONCURRENCY）
+            "POOL_MAXSIZE": None,
+            # 连接数达到上限时是否阻塞等待空闲连接
+            "POOL_BLOCK": False,
+            # 请求头Accept-Encoding，None表示按已安装的解码器协商（gzip、deflate，安装brotli/zstandard后追加br/zstd）
+            "ACCEPT_ENCODING": None,
+        },
+        # 传输层：live直连；record直连并把请求/响应录制到磁带目录；
+        # replay只从磁带回放（可注入延迟，不访问网络）；stub把请求转发到本地替身服务器
+        "TRANSPORT": {
+            "MODE": "live",
+            "CASSETTE_DIR": os.path.join(DATA_DIR, "cassettes"),
+            # 回放时每个请求注入的固定延迟与最大随机抖动（秒）
+            "REPLAY_LATENCY": 0.0,
+            "REPLAY_JITTER": 0.0,
+            # 替身服务器地址，可用 python -m crawler.zhihu.stub_server 启动
+            "STUB_URL": "http://127.0.0.1:8765",
+        },
     }
 }
 
@@ -0,0 +1,309 @@
+"""
+自适应限速模块，按AIMD（加性增、乘性减）策略根据响应状态码和延迟调整每个主机的请求速率与并发数
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+from crawler.rate_limiter import TokenBucket, get_host_limiter
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 未配置时使用的默认参数
+DEFAULT_ADAPTIVE_CONFIG = {
+    "MIN_RATE": 0.2,
+    "MAX_RATE": 10.0,
+    "RATE_STEP": 0.1,
+    "MIN_CONCURRENCY": 1,
+    "MAX_CONCURRENCY": 16,
+    "DECREASE_FACTOR": 0.5,
+    "INCREASE_EVERY": 10,
+    "LATENCY_WINDOW": 50,
+    "LATENCY_TOLERANCE": 2.0,
+    "DECREASE_STATUS": [429, 502, 503, 504],
+    "COOLDOWN": 1.0,
+    "MAX_RETRY_AFTER": 300,
+}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析Retry-After响应头，支持秒数和HTTP日期两种格式
+    
+    Args:
+        value (Optional[str]): Retry-After响应头的值
+    
+    Returns:
+        Optional[float]: 需要等待的秒数，无法解析时返回None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveController:
+    """
+    单个主机的AIMD控制器，进程内所有爬虫实例和线程共用
+    
+    - 连续健康响应时，每INCREASE_EVERY个响应把速率加RATE_STEP、并发数加1
+    - 收到DECREASE_STATUS中的状态码，或p95延迟超过基线的LATENCY_TOLERANCE倍时，速率和并发数乘以DECREASE_FACTOR
+    - 响应带Retry-After时，在指定时间内暂停向该主机发送新请求
+    """
+    
+    def __init__(self, limiter: TokenBucket, concurrency: int, config: Dict[str, Any],
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        初始化控制器
+        
+        Args:
+            limiter (TokenBucket): 主机共享的令牌桶，控制器直接调整其速率
+            concurrency (int): 初始并发数
+            config (Dict[str, Any]): ADAPTIVE配置
+            clock (Callable[[], float], optional): 单调时钟，用于Retry-After暂停和冷却期，测试时可注入. Defaults to time.monotonic.
+        """
+        self.config = {**DEFAULT_ADAPTIVE_CONFIG, **config}
+        self._clock = clock
+        self.limiter = limiter
+        self.min_rate = self.config['MIN_RATE']
+        self.max_rate = max(self.config['MAX_RATE'], self.min_rate)
+        self.min_concurrency = max(1, self.config['MIN_CONCURRENCY'])
+        self.max_concurrency = max(self.config['MAX_CONCURRENCY'], self.min_concurrency)
+        self.decrease_status = set(self.config['DECREASE_STATUS'])
+        
+        self.rate = min(max(limiter.rate, self.min_rate), self.max_rate)
+        self.concurrency = float(min(max(concurrency, self.min_concurrency), self.max_concurrency))
+        self.limiter.set_rate(self.rate)
+        
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = None
+        self._healthy_count = 0
+        self._latencies = deque(maxlen=self.config['LATENCY_WINDOW'])
+        self._baseline_p95 = None
+        self._stats = {'increases': 0, 'decreases': 0, 'throttled': 0, 'retry_after_pauses': 0}
+    
+    @property
+    def concurrency_limit(self) -> int:
+        """
+        当前允许的在途请求数
+        
+        Returns:
+            int: 并发上限
+        """
+        return max(self.min_concurrency, int(self.concurrency))
+    
+    def _pause_remaining(self) -> float:
+        """
+        距离Retry-After暂停结束的秒数
+        
+        Returns:
+            float: 剩余秒数，未暂停时为0
+        """
+        return max(0.0, self._paused_until - self._clock())
+    
+    def _try_acquire_slot(self) -> bool:
+        """
+        非阻塞地占用一个并发名额，调用方需持有self._cond
+        
+        Returns:
+            bool: 是否占用成功
+        """
+        if self._pause_remaining() > 0 or self._in_flight >= self.concurrency_limit:
+            return False
+        self._in_flight += 1
+        return True
+    
+    def acquire(self) -> float:
+        """
+        同步获取发送许可：等待Retry-After暂停结束、占用并发名额并获取令牌
+        
+        Returns:
+            float: 总等待秒数
+        """
+        start = time.monotonic()
+        with self._cond:
+            while not self._try_acquire_slot():
+                pause = self._pause_remaining()
+                self._cond.wait(timeout=pause if pause > 0 else 0.5)
+        self.limiter.acquire()
+        return time.monotonic() - start
+    
+    async def acquire_async(self) -> float:
+        """
+        异步获取发送许可，等待期间不阻塞事件循环
+        
+        Returns:
+            float: 总等待秒数
+        """
+        start = time.monotonic()
+        while True:
+            with self._cond:
+                if self._try_acquire_slot():
+                    break
+                pause = self._pause_remaining()
+            await asyncio.sleep(pause if pause > 0 else 0.01)
+        await self.limiter.acquire_async()
+        return time.monotonic() - start
+    
+    def release(self, status: Optional[int], latency: float, retry_after: Optional[str] = None):
+        """
+        释放并发名额并根据本次响应调整速率与并发数
+        
+        Args:
+            status (Optional[int]): 响应状态码，网络错误时为None
+            latency (float): 请求耗时（秒）
+            retry_after (Optional[str], optional): Retry-After响应头. Defaults to None.
+        """
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            
+            if status in self.decrease_status:
+                self._stats['throttled'] += 1
+                wait = parse_retry_after(retry_after)
+                if wait:
+                    wait = min(wait, self.config['MAX_RETRY_AFTER'])
+                    self._paused_until = max(self._paused_until, self._clock() + wait)
+                    self._stats['retry_after_pauses'] += 1
+                    logger.warning(f"服务器要求等待 {wait:.1f} 秒后重试（Retry-After），暂停新请求")
+                self._decrease(f"状态码 {status}")
+            elif status is not None and status < 400:
+                self._latencies.append(latency)
+                self._healthy_count += 1
+                if self._healthy_count >= self.config['INCREASE_EVERY']:
+                    self._healthy_count = 0
+                    if self._latency_congested():
+                        self._decrease("p95延迟升高")
+                    else:
+                        self._increase()
+            
+            self._cond.notify_all()
+    
+    def _p95(self) -> Optional[float]:
+        """
+        计算最近窗口内的p95延迟
+        
+        Returns:
+            Optional[float]: p95延迟（秒），样本不足时返回None
+        """
+        if len(self._latencies) < self._latencies.maxlen // 2:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    
+    def _latency_congested(self) -> bool:
+        """
+        判断p95延迟是否相对基线明显升高，同时维护基线（观测到的最低p95）
+        
+        Returns:
+            bool: 是否视为拥塞
+        """
+        p95 = self._p95()
+        if p95 is None:
+            return False
+        if self._baseline_p95 is None or p95 < self._baseline_p95:
+            self._baseline_p95 = p95
+            return False
+        return p95 > self._baseline_p95 * self.config['LATENCY_TOLERANCE']
+    
+    def _increase(self):
+        """
+        加性增加速率和并发数，调用方需持有self._cond
+        """
+        rate = min(self.max_rate, self.rate + self.config['RATE_STEP'])
+        concurrency = min(self.max_concurrency, self.concurrency + 1)
+        if rate == self.rate and concurrency == self.concurrency:
+            return
+        self.rate, self.concurrency = rate, concurrency
+        self.limiter.set_rate(self.rate)
+        self._stats['increases'] += 1
+        logger.debug(f"自适应限速加性增加: 速率 {self.rate:.2f}/秒，并发 {self.concurrency_limit}")
+    
+    def _decrease(self, reason: str):
+        """
+        乘性减小速率和并发数，冷却期内只减一次，避免同一批在途请求的失败被重复计算，调用方需持有self._cond
+        
+        Args:
+            reason (str): 减小原因
+        """
+        now = self._clock()
+        if self._last_decrease is not None and now - self._last_decrease < self.config['COOLDOWN']:
+            return
+        self._last_decrease = now
+        self._healthy_count = 0
+        self._latencies.clear()
+        
+        factor = self.config['DECREASE_FACTOR']
+        self.rate = max(self.min_rate, self.rate * factor)
+        self.concurrency = max(self.min_concurrency, self.concurrency * factor)
+        self.limiter.set_rate(self.rate)
+        self._stats['decreases'] += 1
+        logger.warning(f"自适应限速乘性减小（{reason}）: 速率 {self.rate:.2f}/秒，并发 {self.concurrency_limit}")
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        获取控制器当前状态
+        
+        Returns:
+            Dict[str, Any]: 速率、并发上限、在途请求数、p95延迟与调整次数
+        """
+        with self._cond:
+            return {
+                'rate': round(self.rate, 3),
+                'concurrency': self.concurrency_limit,
+                'in_flight': self._in_flight,
+                'p95_latency': self._p95(),
+                'baseline_p95_latency': self._baseline_p95,
+                'paused_for': round(self._pause_remaining(), 3),
+                **self._stats,
+            }
+
+
+# 进程内共享的控制器注册表，按主机名索引
+_controllers: Dict[str, AdaptiveController] = {}
+_controllers_lock = threading.Lock()
+
+
+def get_adaptive_controller(url: str, adaptive_config: Optional[Dict[str, Any]], rate: Optional[float],
+                            burst: int = 1, concurrency: int = 4) -> Optional[AdaptiveController]:
+    """
+    获取URL所属主机的共享自适应控制器
+    
+    Args:
+        url (str): 请求URL
+        adaptive_config (Optional[Dict[str, Any]]): ADAPTIVE配置，未启用时返回None
+        rate (Optional[float]): 初始每秒请求数，为空时取MIN_RATE
+        burst (int, optional): 允许的瞬时突发请求数. Defaults to 1.
+        concurrency (int, optional): 初始并发数. Defaults to 4.
+    
+    Returns:
+        Optional[AdaptiveController]: 主机对应的控制器，未启用时返回None
+    """
+    if not adaptive_config or not adaptive_config.get('ENABLED'):
+        return None
+    
+    host = urlparse(url).netloc
+    controller = _controllers.get(host)
+    if controller is None:
+        with _controllers_lock:
+            controller = _controllers.get(host)
+            if controller is None:
+                initial_rate = rate or adaptive_config.get('MIN_RATE', DEFAULT_ADAPTIVE_CONFIG['MIN_RATE'])
+                limiter = get_host_limiter(url, initial_rate, burst)
+                controller = AdaptiveController(limiter, concurrency, adaptive_config)
+                _controllers[host] = controller
+    return controller
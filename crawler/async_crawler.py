@@ -0,0 +1,324 @@
+"""
+异步基础爬虫类，基于aiohttp实现非阻塞请求与并发控制
+"""
+import asyncio
+import json as jsonlib
+import time
+from typing import Any, Dict, List, Optional
+import aiohttp
+from crawler.adaptive import get_adaptive_controller
+from crawler.metrics import CrawlMetrics
+from crawler.rate_limiter import get_host_limiter
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 需要重试的HTTP状态码，与同步爬虫的重试策略保持一致
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class AsyncResponse:
+    """
+    异步请求的响应对象，提供与requests.Response相近的访问接口
+    """
+    
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes,
+                 encoding: Optional[str] = None):
+        """
+        初始化响应对象
+        
+        Args:
+            url (str): 最终请求URL
+            status_code (int): HTTP状态码
+            headers (Dict[str, str]): 响应头
+            content (bytes): 响应体
+            encoding (str, optional): 响应编码. Defaults to None.
+        """
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or 'utf-8'
+    
+    @property
+    def text(self) -> str:
+        """
+        以文本形式返回响应体
+        
+        Returns:
+            str: 响应文本
+        """
+        return self.content.decode(self.encoding, errors='replace')
+    
+    def json(self) -> Any:
+        """
+        将响应体解析为JSON
+        
+        Returns:
+            Any: 解析后的JSON数据
+        """
+        return jsonlib.loads(self.content)
+
+
+class AsyncBaseCrawler:
+    """
+    异步基础爬虫类，使用有界信号量控制同时进行的请求数
+    """
+    
+    def __init__(self, base_url: str, user_agent: str, cookie: str, max_retries: int = 3,
+                 timeout: int = 10, download_delay: float = 1.0, concurrent_requests: int = 4,
+                 rate_limit: float = None, rate_burst: int = 1, adaptive: Dict[str, Any] = None):
+        """
+        初始化异步基础爬虫
+        
+        Args:
+            base_url (str): 基础URL
+            user_agent (str): User-Agent
+            cookie (str): Cookie
+            max_retries (int, optional): 最大重试次数. Defaults to 3.
+            timeout (int, optional): 请求超时时间. Defaults to 10.
+            download_delay (float, optional): 下载延迟. Defaults to 1.0.
+            concurrent_requests (int, optional): 最大并发请求数. Defaults to 4.
+            rate_limit (float, optional): 每个主机每秒允许的请求数，未指定时按1/download_delay计算. Defaults to None.
+            rate_burst (int, optional): 每个主机允许的瞬时突发请求数. Defaults to 1.
+            adaptive (Dict[str, Any], optional): 自适应限速（AIMD）配置，启用时由控制器决定并发数与速率. Defaults to None.
+        """
+        self.base_url = base_url
+        self.user_agent = user_agent
+        self.cookie = cookie
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.download_delay = download_delay
+        self.concurrent_requests = max(1, concurrent_requests)
+        if rate_limit is None and download_delay and download_delay > 0:
+            rate_limit = 1.0 / download_delay
+        self.rate_limit = rate_limit
+        self.rate_burst = rate_burst
+        self.adaptive = adaptive if adaptive and adaptive.get('ENABLED') else None
+        # 请求指标：按端点统计延迟分布、流量、状态码、重试与限速等待
+        self.metrics = CrawlMetrics()
+        
+        # session与信号量需要在事件循环中创建，延迟到首次请求时初始化
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    async def __aenter__(self):
+        await self._init_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def _init_session(self) -> aiohttp.ClientSession:
+        """
+        初始化aiohttp session，配置连接池和默认headers
+        
+        Returns:
+            aiohttp.ClientSession: 配置好的session实例
+        """
+        if self.session is None or self.session.closed:
+            # 启用自适应限速时并发数可能升到MAX_CONCURRENCY，连接池按上限创建
+            pool_size = max(self.concurrent_requests, (self.adaptive or {}).get('MAX_CONCURRENCY', 0))
+            connector = aiohttp.TCPConnector(limit=pool_size)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={
+                    "User-Agent": self.user_agent,
+                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                    "Accept-Language": "zh-CN,zh;q=0.9",
+                    "Cookie": self.cookie
+                }
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrent_requests)
+        return self.session
+    
+    async def _send_once(self, session: aiohttp.ClientSession, method: str, url: str,
+                         **kwargs) -> AsyncResponse:
+        """
+        发送一次请求并读取完整响应，记录延迟、字节数和状态码（无响应的失败记为错误）
+        
+        Args:
+            session (aiohttp.ClientSession): session实例
+            method (str): 请求方法
+            url (str): 请求URL
+            **kwargs: 其他请求参数
+        
+        Returns:
+            AsyncResponse: 请求响应
+        """
+        start = time.monotonic()
+        try:
+            async with session.request(method, url, **kwargs) as resp:
+                content = await resp.read()
+                response = AsyncResponse(
+                    url=str(resp.url),
+                    status_code=resp.status,
+                    headers=dict(resp.headers),
+                    content=content,
+                    encoding=resp.charset
+                )
+                response.request_info = resp.request_info
+                # aiohttp读到的是解压后的正文，网络字节数只能按Content-Length（压缩后的长度）计
+                content_length = resp.headers.get('Content-Length')
+                wire_bytes_in = int(content_length) if content_length and content_length.isdigit() else None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.metrics.record_error(url, e, time.monotonic() - start)
+            raise
+        self.metrics.record_response(url, response.status_code, time.monotonic() - start, len(content),
+                                     wire_bytes_in)
+        return response
+    
+    async def _request(self, method: str, url: str, **kwargs) -> AsyncResponse:
+        """
+        发送请求，受信号量与主机限速器约束（启用自适应限速时由AIMD控制器约束），
+        并对可重试状态码做指数退避重试
+        
+        Args:
+            method (str): 请求方法
+            url (str): 请求URL
+            **kwargs: 其他请求参数
+        
+        Returns:
+            AsyncResponse: 请求响应
+        
+        Raises:
+            aiohttp.ClientError: 请求异常
+        """
+        session = await self._init_session()
+        retryable = method in ("GET", "HEAD", "OPTIONS")
+        controller = get_adaptive_controller(url, self.adaptive, self.rate_limit, self.rate_burst,
+                                             self.concurrent_requests)
+        limiter = get_host_limiter(url, self.rate_limit, self.rate_burst) if controller is None else None
+        attempt = 0
+        
+        while True:
+            try:
+                if controller is not None:
+                    self.metrics.record_throttle(url, await controller.acquire_async())
+                    start = time.monotonic()
+                    response = None
+                    try:
+                        response = await self._send_once(session, method, url, **kwargs)
+                    finally:
+                        controller.release(
+                            response.status_code if response is not None else None,
+                            time.monotonic() - start,
+                            response.headers.get('Retry-After') if response is not None else None
+                        )
+                else:
+                    # 等待并发槽位和令牌的时间都计入限速等待
+                    wait_start = time.monotonic()
+                    async with self._semaphore:
+                        if limiter is not None:
+                            await limiter.acquire_async()
+                        self.metrics.record_throttle(url, time.monotonic() - wait_start)
+                        response = await self._send_once(session, method, url, **kwargs)
+                
+                # 错误状态码统一抛出，由下方异常处理决定是否重试
+                if response.status_code >= 400:
+                    raise aiohttp.ClientResponseError(
+                        response.request_info, (), status=response.status_code,
+                        message=f"HTTP {response.status_code}"
+                    )
+                return response
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status = getattr(e, 'status', None)
+                can_retry = retryable and attempt < self.max_retries and (
+                    status is None or status in RETRY_STATUS_CODES
+                )
+                if not can_retry:
+                    raise
+                
+                # 退避策略与urllib3 Retry(backoff_factor=1)一致；过载状态码由控制器降速并按Retry-After暂停
+                backoff = 2 ** attempt
+                if controller is not None and status in controller.decrease_status:
+                    backoff = 0
+                attempt += 1
+                self.metrics.record_retry(url)
+                logger.warning(f"{method}请求重试({attempt}/{self.max_retries}): {url}, 错误: {str(e)}")
+                await asyncio.sleep(backoff)
+                self.metrics.record_backoff(url, backoff)
+    
+    async def get(self, url: str, params: dict = None, headers: dict = None,
+                  **kwargs) -> AsyncResponse:
+        """
+        发送异步GET请求
+        
+        Args:
+            url (str): 请求URL
+            params (dict, optional): 请求参数. Defaults to None.
+            headers (dict, optional): 请求头. Defaults to None.
+            **kwargs: 其他请求参数
+        
+        Returns:
+            AsyncResponse: 请求响应
+        
+        Raises:
+            aiohttp.ClientError: 请求异常
+        """
+        try:
+            response = await self._request("GET", url, params=params, headers=headers, **kwargs)
+            logger.info(f"GET请求成功: {url}")
+            return response
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"GET请求失败: {url}, 错误: {str(e)}")
+            raise
+    
+    async def post(self, url: str, data: dict = None, json: dict = None,
+                   headers: dict = None, **kwargs) -> AsyncResponse:
+        """
+        发送异步POST请求
+        
+        Args:
+            url (str): 请求URL
+            data (dict, optional): 请求数据. Defaults to None.
+            json (dict, optional): JSON数据. Defaults to None.
+            headers (dict, optional): 请求头. Defaults to None.
+            **kwargs: 其他请求参数
+        
+        Returns:
+            AsyncResponse: 请求响应
+        
+        Raises:
+            aiohttp.ClientError: 请求异常
+        """
+        try:
+            response = await self._request(
+                "POST", url, data=data, json=json, headers=headers, **kwargs
+            )
+            logger.info(f"POST请求成功: {url}")
+            return response
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"POST请求失败: {url}, 错误: {str(e)}")
+            raise
+    
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        """
+        导出本实例的请求指标
+        
+        Returns:
+            Dict[str, Any]: 包含elapsed、totals和按端点的统计（延迟直方图、字节数、状态码、重试、限速等待）
+        """
+        return self.metrics.snapshot()
+    
+    def log_metrics_summary(self) -> List[str]:
+        """
+        把请求指标汇总写入日志，通常在一次爬取结束时调用
+        
+        Returns:
+            List[str]: 汇总文本行
+        """
+        lines = self.metrics.summary_lines()
+        for line in lines:
+            logger.info(line)
+        return lines
+    
+    async def close(self):
+        """
+        关闭session并输出请求指标汇总
+        """
+        self.log_metrics_summary()
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+            logger.info("异步Session已关闭")
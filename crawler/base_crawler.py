@@ -1,13 +1,24 @@
 """
 基础爬虫类，定义通用爬虫功能
 """
+import time
+from typing import Any, Dict, List
 import requests
-from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from crawler.adaptive import get_adaptive_controller
+from crawler.connection_pool import (DEFAULT_POOL_CONNECTIONS, get_connection_stats, record_response_encoding,
+                                     resolve_accept_encoding, resolve_pool_maxsize)
+from crawler.http_cache import HttpCache
+from crawler.metrics import CrawlMetrics
+from crawler.rate_limiter import get_host_limiter
+from crawler.transport import build_adapter
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# 可重试的状态码，与urllib3 Retry的status_forcelist一致
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
 
 class BaseCrawler:
     """
@@ -15,7 +26,10 @@ class BaseCrawler:
     """
     
     def __init__(self, base_url: str, user_agent: str, cookie: str, max_retries: int = 3,
-                 timeout: int = 10, download_delay: float = 1.0):
+                 timeout: int = 10, download_delay: float = 1.0, rate_limit: float = None,
+                 rate_burst: int = 1, http_cache: HttpCache = None, transport: Dict[str, Any] = None,
+                 concurrent_requests: int = 4, adaptive: Dict[str, Any] = None,
+                 connection_pool: Dict[str, Any] = None):
         """
         初始化基础爬虫
         
@@ -26,6 +40,13 @@ class BaseCrawler:
             max_retries (int, optional): 最大重试次数. Defaults to 3.
             timeout (int, optional): 请求超时时间. Defaults to 10.
             download_delay (float, optional): 下载延迟. Defaults to 1.0.
+            rate_limit (float, optional): 每个主机每秒允许的请求数，未指定时按1/download_delay计算. Defaults to None.
+            rate_burst (int, optional): 每个主机允许的瞬时突发请求数. Defaults to 1.
+            http_cache (HttpCache, optional): GET响应的磁盘缓存，为None时不缓存. Defaults to None.
+            transport (Dict[str, Any], optional): 传输层配置（live/record/replay/stub），为None时直连. Defaults to None.
+            concurrent_requests (int, optional): 初始并发请求数，供自适应控制器使用. Defaults to 4.
+            adaptive (Dict[str, Any], optional): 自适应限速（AIMD）配置，未启用时使用固定速率. Defaults to None.
+            connection_pool (Dict[str, Any], optional): 连接池配置，为None时使用进程内共享连接池的默认设置. Defaults to None.
         """
         self.base_url = base_url
         self.user_agent = user_agent
@@ -33,6 +54,17 @@ class BaseCrawler:
         self.max_retries = max_retries
         self.timeout = timeout
         self.download_delay = download_delay
+        if rate_limit is None and download_delay and download_delay > 0:
+            rate_limit = 1.0 / download_delay
+        self.rate_limit = rate_limit
+        self.rate_burst = rate_burst
+        self.http_cache = http_cache
+        self.transport = transport
+        self.concurrent_requests = max(1, concurrent_requests)
+        self.adaptive = adaptive if adaptive and adaptive.get('ENABLED') else None
+        self.connection_pool = connection_pool or {}
+        # 请求指标：按端点统计延迟分布、流量、状态码、重试与限速等待
+        self.metrics = CrawlMetrics()
         
         # 初始化session
         self.session = self._init_session()
@@ -46,15 +78,23 @@ class BaseCrawler:
         """
         session = requests.Session()
         
-        # 配置重试策略
+        # 配置重试策略，启用自适应限速时状态码重试由_send处理，以便控制器观察到每个429/503
         retry_strategy = Retry(
             total=self.max_retries,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=[] if self.adaptive else RETRY_STATUS_CODES,
             backoff_factor=1,
             allowed_methods=["HEAD", "GET", "OPTIONS"]
         )
         
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        # 连接池按主机在进程内共享，新实例可直接复用已建立的keep-alive连接，省去TCP/TLS握手
+        adapter = build_adapter(
+            self.transport,
+            max_retries=retry_strategy,
+            shared=self.connection_pool.get('SHARED', True),
+            pool_connections=self.connection_pool.get('POOL_CONNECTIONS', DEFAULT_POOL_CONNECTIONS),
+            pool_maxsize=resolve_pool_maxsize(self.connection_pool, self.concurrent_requests, self.adaptive),
+            pool_block=self.connection_pool.get('POOL_BLOCK', False)
+        )
         session.mount("https://", adapter)
         session.mount("http://", adapter)
         
@@ -63,11 +103,117 @@ class BaseCrawler:
             "User-Agent": self.user_agent,
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
             "Accept-Language": "zh-CN,zh;q=0.9",
+            "Accept-Encoding": resolve_accept_encoding(self.connection_pool),
             "Cookie": self.cookie
         })
         
+        # 统计各主机的压缩响应比例
+        session.hooks['response'].append(record_response_encoding)
+        
         return session
     
+    def _throttle(self, url: str) -> float:
+        """
+        按请求主机获取共享令牌，进程内所有爬虫实例和线程共用同一限速额度
+        
+        Args:
+            url (str): 请求URL
+        
+        Returns:
+            float: 因限速等待的秒数
+        """
+        limiter = get_host_limiter(url, self.rate_limit, self.rate_burst)
+        if limiter is None:
+            return 0.0
+        return limiter.acquire()
+    
+    def _timed_request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        发送一次请求并记录指标：延迟、解压前后的响应字节数、状态码，以及urllib3内部完成的重试次数
+        
+        Args:
+            method (str): 请求方法
+            url (str): 请求URL
+            **kwargs: 其他请求参数
+        
+        Returns:
+            requests.Response: 请求响应
+        
+        Raises:
+            requests.exceptions.RequestException: 请求异常
+        """
+        start = time.monotonic()
+        try:
+            response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+        except requests.exceptions.RequestException as e:
+            self.metrics.record_error(url, e, time.monotonic() - start)
+            raise
+        latency = time.monotonic() - start
+        
+        # 流式响应的正文尚未读取，按Content-Length估计
+        raw = getattr(response, 'raw', None)
+        if kwargs.get('stream'):
+            bytes_in = int(response.headers.get('Content-Length') or 0)
+            wire_bytes_in = None
+        else:
+            bytes_in = len(response.content)
+            try:
+                wire_bytes_in = raw.tell() if hasattr(raw, 'tell') else None
+            except (OSError, ValueError):
+                wire_bytes_in = None
+        self.metrics.record_response(url, response.status_code, latency, bytes_in, wire_bytes_in)
+        
+        retries = getattr(raw, 'retries', None)
+        if retries is not None and getattr(retries, 'history', None):
+            self.metrics.record_retry(url, len(retries.history))
+        return response
+    
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        发送请求：未启用自适应限速时按固定速率限速；启用时由主机的AIMD控制器决定发送时机，
+        并把每个响应的状态码、耗时和Retry-After反馈给控制器，可重试状态码在这里重试
+        
+        Args:
+            method (str): 请求方法
+            url (str): 请求URL
+            **kwargs: 其他请求参数
+        
+        Returns:
+            requests.Response: 请求响应（未调用raise_for_status）
+        """
+        controller = get_adaptive_controller(url, self.adaptive, self.rate_limit, self.rate_burst,
+                                             self.concurrent_requests)
+        if controller is None:
+            self.metrics.record_throttle(url, self._throttle(url))
+            return self._timed_request(method, url, **kwargs)
+        
+        retryable = method in ("GET", "HEAD", "OPTIONS")
+        attempt = 0
+        while True:
+            self.metrics.record_throttle(url, controller.acquire())
+            start = time.monotonic()
+            response = None
+            try:
+                response = self._timed_request(method, url, **kwargs)
+            finally:
+                controller.release(
+                    response.status_code if response is not None else None,
+                    time.monotonic() - start,
+                    response.headers.get('Retry-After') if response is not None else None
+                )
+            
+            if not retryable or response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                return response
+            
+            attempt += 1
+            self.metrics.record_retry(url)
+            logger.warning(f"{method}请求重试({attempt}/{self.max_retries}): {url}, 状态码: {response.status_code}")
+            # 过载状态码由控制器降速并按Retry-After暂停，其他5xx按指数退避
+            if response.status_code not in controller.decrease_status:
+                backoff = 2 ** (attempt - 1)
+                time.sleep(backoff)
+                self.metrics.record_backoff(url, backoff)
+    
     def get(self, url: str, params: dict = None, headers: dict = None,
            **kwargs) -> requests.Response:
         """
@@ -86,10 +232,34 @@ class BaseCrawler:
             requests.exceptions.RequestException: 请求异常
         """
         try:
-            response = self.session.get(
-                url, params=params, headers=headers, timeout=self.timeout, **kwargs
-            )
+            # 查询缓存：TTL内直接返回，过期则改为条件请求
+            cache_entry = None
+            request_headers = headers
+            if self.http_cache is not None and not kwargs.get('stream'):
+                cache_entry = self.http_cache.lookup(url, params)
+                if cache_entry is not None:
+                    if self.http_cache.is_fresh(cache_entry):
+                        cached = self.http_cache.to_response(cache_entry)
+                        if cached is not None:
+                            self.metrics.record_cache_hit(url)
+                            logger.info(f"GET命中缓存: {url}")
+                            return cached
+                    headers = {**(headers or {}), **self.http_cache.conditional_headers(cache_entry)}
+            
+            response = self._send('GET', url, params=params, headers=headers, **kwargs)
+            
+            if cache_entry is not None and response.status_code == 304:
+                cached = self.http_cache.revalidated(cache_entry, response)
+                if cached is not None:
+                    logger.info(f"GET缓存重新验证成功(304): {url}")
+                    return cached
+                # 缓存正文已丢失（条目已被删除），304没有正文可用，去掉条件请求头重新获取完整响应
+                logger.warning(f"GET缓存正文丢失，重新请求: {url}")
+                response = self._send('GET', url, params=params, headers=request_headers, **kwargs)
+            
             response.raise_for_status()
+            if self.http_cache is not None and not kwargs.get('stream'):
+                self.http_cache.store(url, params, response)
             logger.info(f"GET请求成功: {url}")
             return response
         except requests.exceptions.RequestException as e:
@@ -115,9 +285,7 @@ class BaseCrawler:
             requests.exceptions.RequestException: 请求异常
         """
         try:
-            response = self.session.post(
-                url, data=data, json=json, headers=headers, timeout=self.timeout, **kwargs
-            )
+            response = self._send('POST', url, data=data, json=json, headers=headers, **kwargs)
             response.raise_for_status()
             logger.info(f"POST请求成功: {url}")
             return response
@@ -125,9 +293,40 @@ class BaseCrawler:
             logger.error(f"POST请求失败: {url}, 错误: {str(e)}")
             raise
     
+    def connection_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取进程内共享连接池的复用统计，新建连接数即TCP/TLS握手次数
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: 主机到统计的映射
+        """
+        return get_connection_stats()
+    
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        """
+        导出本实例的请求指标
+        
+        Returns:
+            Dict[str, Any]: 包含elapsed、totals和按端点的统计（延迟直方图、字节数、状态码、重试、限速等待）
+        """
+        return self.metrics.snapshot()
+    
+    def log_metrics_summary(self) -> List[str]:
+        """
+        把请求指标汇总写入日志，通常在一次爬取结束时调用
+        
+        Returns:
+            List[str]: 汇总文本行
+        """
+        lines = self.metrics.summary_lines()
+        for line in lines:
+            logger.info(line)
+        return lines
+    
     def close(self):
         """
-        关闭session
+        关闭session并输出请求指标汇总（共享连接池保持打开，供其他实例继续复用）
         """
+        self.log_metrics_summary()
         self.session.close()
         logger.info("Session已关闭")
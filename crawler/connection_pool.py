@@ -0,0 +1,220 @@
+"""
+连接池模块，进程内所有爬虫实例共享按主机划分的keep-alive连接池，并统计连接复用与压缩协商情况
+"""
+import threading
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+from urllib3 import PoolManager
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 未配置时缓存的主机连接池数量，与requests默认值一致
+DEFAULT_POOL_CONNECTIONS = 10
+
+# 进程内共享的PoolManager，按（主机数, 每主机连接数, 是否阻塞）索引；
+# PoolManager内部再按协议、主机和端口维护各自的连接池
+_pool_managers: Dict[Tuple[int, int, bool], PoolManager] = {}
+_pool_lock = threading.Lock()
+
+# 被PoolManager淘汰的连接池的累计计数，按主机索引，避免淘汰后统计丢失
+_retired_counts: Dict[str, Dict[str, int]] = {}
+# 响应压缩统计，按主机索引
+_encoding_counts: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+def _pool_host(pool) -> str:
+    """
+    获取连接池对应的主机标识
+    
+    Args:
+        pool (urllib3.HTTPConnectionPool): 连接池
+    
+    Returns:
+        str: 如 https://www.zhihu.com:443
+    """
+    return f"{pool.scheme}://{pool.host}:{pool.port}"
+
+
+def _retire_pool(pool):
+    """
+    PoolManager淘汰连接池时的回调：累计其计数后关闭连接
+    
+    Args:
+        pool (urllib3.HTTPConnectionPool): 被淘汰的连接池
+    """
+    with _stats_lock:
+        counts = _retired_counts.setdefault(_pool_host(pool), {'requests': 0, 'new_connections': 0})
+        counts['requests'] += pool.num_requests
+        counts['new_connections'] += pool.num_connections
+    pool.close()
+
+
+def get_shared_pool_manager(num_pools: int, maxsize: int, block: bool = False,
+                            **pool_kwargs) -> PoolManager:
+    """
+    获取进程内共享的PoolManager，相同尺寸的适配器共用同一组主机连接池
+    
+    Args:
+        num_pools (int): 缓存的主机连接池数量
+        maxsize (int): 每个主机保持的最大连接数
+        block (bool, optional): 连接数达到上限时是否阻塞等待. Defaults to False.
+        **pool_kwargs: 传给PoolManager的其他参数
+    
+    Returns:
+        PoolManager: 共享的PoolManager
+    """
+    key = (num_pools, maxsize, block)
+    manager = _pool_managers.get(key)
+    if manager is None:
+        with _pool_lock:
+            manager = _pool_managers.get(key)
+            if manager is None:
+                manager = PoolManager(num_pools=num_pools, maxsize=maxsize, block=block, **pool_kwargs)
+                manager.pools.dispose_func = _retire_pool
+                _pool_managers[key] = manager
+                logger.debug(f"创建共享连接池: 主机数 {num_pools}，每主机连接数 {maxsize}")
+    return manager
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    可共享连接池的HTTPAdapter：shared为True时使用进程内共享的PoolManager，
+    不同爬虫实例的session可复用已建立的TCP/TLS连接，重试策略等仍按适配器各自配置
+    """
+    
+    __attrs__ = HTTPAdapter.__attrs__ + ['shared']
+    
+    def __init__(self, shared: bool = True, **kwargs):
+        """
+        初始化适配器
+        
+        Args:
+            shared (bool, optional): 是否使用进程内共享的连接池. Defaults to True.
+            **kwargs: HTTPAdapter的参数，如max_retries、pool_connections、pool_maxsize
+        """
+        self.shared = shared
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if not self.shared:
+            super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+            return
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = get_shared_pool_manager(connections, maxsize, block, **pool_kwargs)
+    
+    def close(self):
+        if not self.shared:
+            super().close()
+            return
+        # 共享连接池由close_shared_pools统一关闭，这里只关闭本适配器自己的代理连接池
+        for proxy in self.proxy_manager.values():
+            proxy.clear()
+
+
+def resolve_pool_maxsize(pool_config: Optional[Dict[str, Any]], concurrent_requests: int,
+                         adaptive: Optional[Dict[str, Any]] = None) -> int:
+    """
+    计算每个主机的连接池大小：优先使用POOL_MAXSIZE，否则按并发设置推算，
+    启用自适应限速时取其并发上限，保证并发请求不会因连接池过小而反复新建连接
+    
+    Args:
+        pool_config (Optional[Dict[str, Any]]): CONNECTION_POOL配置
+        concurrent_requests (int): 并发请求数
+        adaptive (Optional[Dict[str, Any]], optional): 已启用的ADAPTIVE配置. Defaults to None.
+    
+    Returns:
+        int: 每个主机的最大连接数
+    """
+    configured = (pool_config or {}).get('POOL_MAXSIZE')
+    if configured:
+        return max(1, configured)
+    return max(1, concurrent_requests, (adaptive or {}).get('MAX_CONCURRENCY', 0))
+
+
+def resolve_accept_encoding(pool_config: Optional[Dict[str, Any]]) -> str:
+    """
+    获取请求头Accept-Encoding：未配置时按已安装的解码器协商（gzip、deflate，安装brotli/zstandard后追加br/zstd）
+    
+    Args:
+        pool_config (Optional[Dict[str, Any]]): CONNECTION_POOL配置
+    
+    Returns:
+        str: Accept-Encoding的值
+    """
+    return (pool_config or {}).get('ACCEPT_ENCODING') or DEFAULT_ACCEPT_ENCODING
+
+
+def record_response_encoding(response: requests.Response, *args, **kwargs):
+    """
+    session的response钩子：按主机统计响应数和压缩响应数
+    
+    Args:
+        response (requests.Response): 响应
+    """
+    parts = urlsplit(response.url)
+    host = f"{parts.scheme}://{parts.hostname}:{parts.port or (443 if parts.scheme == 'https' else 80)}"
+    encoding = response.headers.get('Content-Encoding', '').lower()
+    with _stats_lock:
+        counts = _encoding_counts.setdefault(host, {'responses': 0, 'compressed_responses': 0})
+        counts['responses'] += 1
+        if encoding and encoding != 'identity':
+            counts['compressed_responses'] += 1
+
+
+def get_connection_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    获取各主机的连接复用与压缩统计
+    
+    Returns:
+        Dict[str, Dict[str, Any]]: 主机到统计的映射，包括请求数、新建连接数（即TCP/TLS握手次数）、
+            复用连接数、复用率、响应数和压缩响应数
+    """
+    totals: Dict[str, Dict[str, int]] = {}
+    with _stats_lock:
+        for host, counts in _retired_counts.items():
+            totals[host] = dict(counts)
+        encodings = {host: dict(counts) for host, counts in _encoding_counts.items()}
+    
+    for manager in list(_pool_managers.values()):
+        for key in manager.pools.keys():
+            pool = manager.pools.get(key)
+            if pool is None:
+                continue
+            counts = totals.setdefault(_pool_host(pool), {'requests': 0, 'new_connections': 0})
+            counts['requests'] += pool.num_requests
+            counts['new_connections'] += pool.num_connections
+    
+    stats = {}
+    for host in sorted(set(totals) | set(encodings)):
+        counts = totals.get(host, {'requests': 0, 'new_connections': 0})
+        reused = max(0, counts['requests'] - counts['new_connections'])
+        stats[host] = {
+            'requests': counts['requests'],
+            'new_connections': counts['new_connections'],
+            'reused_connections': reused,
+            'reuse_ratio': round(reused / counts['requests'], 4) if counts['requests'] else None,
+            **encodings.get(host, {'responses': 0, 'compressed_responses': 0}),
+        }
+    return stats
+
+
+def close_shared_pools():
+    """
+    关闭所有共享连接池并清空统计，通常在进程退出前调用
+    """
+    with _pool_lock:
+        managers = list(_pool_managers.values())
+        _pool_managers.clear()
+    for manager in managers:
+        manager.clear()
+    with _stats_lock:
+        _retired_counts.clear()
+        _encoding_counts.clear()
+    logger.info("共享连接池已关闭")
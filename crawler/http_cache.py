@@ -0,0 +1,383 @@
+"""
+HTTP响应缓存模块，提供带条件请求重新验证的磁盘缓存
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+import requests
+from requests.structures import CaseInsensitiveDict
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 随缓存一起保存的响应头，正文以解码后的形式保存，因此不保留Content-Encoding/Content-Length
+_STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Date', 'Cache-Control', 'Expires')
+
+
+class HttpCache:
+    """
+    磁盘HTTP缓存，按URL和参数建立索引
+    
+    - TTL内的条目直接从磁盘返回，不发出请求
+    - 过期条目携带If-None-Match/If-Modified-Since发出条件请求，304时从磁盘返回正文
+    - 总大小超过上限时按最近最少使用（LRU）顺序淘汰
+    """
+    
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024, default_ttl: int = 0,
+                 ttls: Optional[Dict[str, int]] = None):
+        """
+        初始化HTTP缓存
+        
+        Args:
+            cache_dir (str): 缓存目录
+            max_bytes (int, optional): 缓存正文总大小上限（字节）. Defaults to 256MB.
+            default_ttl (int, optional): 未匹配到端点规则时的TTL（秒），0表示每次都重新验证. Defaults to 0.
+            ttls (Optional[Dict[str, int]], optional): URL路径前缀到TTL（秒）的映射. Defaults to None.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        # 按前缀长度倒序排列，保证最长前缀优先匹配
+        self.ttls = sorted((ttls or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        
+        self._lock = threading.Lock()
+        self._index: Optional["OrderedDict[str, int]"] = None
+        self._total_bytes = 0
+        
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    @staticmethod
+    def make_key(url: str, params: Optional[dict] = None) -> str:
+        """
+        根据URL和参数计算缓存键
+        
+        Args:
+            url (str): 请求URL
+            params (Optional[dict], optional): 请求参数. Defaults to None.
+        
+        Returns:
+            str: 缓存键
+        """
+        full_url = requests.Request('GET', url, params=params).prepare().url
+        return hashlib.sha256(full_url.encode('utf-8')).hexdigest()
+    
+    def ttl_for(self, url: str) -> int:
+        """
+        获取URL对应端点的TTL
+        
+        Args:
+            url (str): 请求URL
+        
+        Returns:
+            int: TTL（秒）
+        """
+        path = urlparse(url).path
+        for prefix, ttl in self.ttls:
+            if path.startswith(prefix):
+                return ttl
+        return self.default_ttl
+    
+    def _paths(self, key: str):
+        """
+        获取缓存条目的元数据与正文文件路径
+        
+        Args:
+            key (str): 缓存键
+        
+        Returns:
+            Tuple[str, str]: 元数据路径、正文路径
+        """
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return base + '.json', base + '.body'
+    
+    def _load_index(self):
+        """
+        扫描缓存目录建立LRU索引（按正文文件mtime排序，命中时会刷新mtime），只在首次使用时执行
+        """
+        if self._index is not None:
+            return
+        
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.body'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, name[:-len('.body')], stat.st_size))
+        
+        entries.sort()
+        self._index = OrderedDict((key, size) for _, key, size in entries)
+        self._total_bytes = sum(self._index.values())
+    
+    def _touch(self, key: str):
+        """
+        将条目标记为最近使用
+        
+        Args:
+            key (str): 缓存键
+        """
+        self._index.move_to_end(key)
+        try:
+            os.utime(self._paths(key)[1])
+        except OSError:
+            pass
+    
+    def _remove(self, key: str):
+        """
+        删除缓存条目
+        
+        Args:
+            key (str): 缓存键
+        """
+        self._total_bytes -= self._index.pop(key, 0)
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    def _evict(self):
+        """
+        淘汰最久未使用的条目，直到总大小不超过上限
+        """
+        while self._total_bytes > self.max_bytes and self._index:
+            key = next(iter(self._index))
+            self._remove(key)
+            logger.debug(f"HTTP缓存淘汰条目: {key}")
+    
+    def lookup(self, url: str, params: Optional[dict] = None) -> Optional[Dict[str, Any]]:
+        """
+        查找缓存条目
+        
+        Args:
+            url (str): 请求URL
+            params (Optional[dict], optional): 请求参数. Defaults to None.
+        
+        Returns:
+            Optional[Dict[str, Any]]: 缓存条目元数据，未命中时返回None
+        """
+        key = self.make_key(url, params)
+        meta_path, _ = self._paths(key)
+        
+        with self._lock:
+            self._load_index()
+            if key not in self._index:
+                return None
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                self._remove(key)
+                return None
+            meta['key'] = key
+            return meta
+    
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """
+        判断条目是否仍在TTL内
+        
+        Args:
+            entry (Dict[str, Any]): 缓存条目元数据
+        
+        Returns:
+            bool: 是否可以不经验证直接使用
+        """
+        ttl = self.ttl_for(entry['url'])
+        return ttl > 0 and time.time() - entry['stored_at'] < ttl
+    
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        """
+        构建条件请求头
+        
+        Args:
+            entry (Dict[str, Any]): 缓存条目元数据
+        
+        Returns:
+            Dict[str, str]: If-None-Match/If-Modified-Since请求头
+        """
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def _write_meta(self, key: str, meta: Dict[str, Any]):
+        """
+        原子写入条目元数据
+        
+        Args:
+            key (str): 缓存键
+            meta (Dict[str, Any]): 元数据
+        """
+        meta_path, _ = self._paths(key)
+        tmp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({k: v for k, v in meta.items() if k != 'key'}, f, ensure_ascii=False)
+        os.replace(tmp_path, meta_path)
+    
+    def store(self, url: str, params: Optional[dict], response: requests.Response) -> bool:
+        """
+        保存响应到缓存，仅缓存200响应，且要求有验证器或端点TTL大于0
+        
+        Args:
+            url (str): 请求URL
+            params (Optional[dict]): 请求参数
+            response (requests.Response): 响应
+        
+        Returns:
+            bool: 是否已缓存
+        """
+        if response.status_code != 200:
+            return False
+        
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified and self.ttl_for(url) <= 0:
+            return False
+        
+        body = response.content
+        if len(body) > self.max_bytes:
+            return False
+        
+        key = self.make_key(url, params)
+        meta_path, body_path = self._paths(key)
+        meta = {
+            'url': url,
+            'final_url': response.url,
+            'headers': {k: response.headers[k] for k in _STORED_HEADERS if k in response.headers},
+            'encoding': response.encoding,
+            'etag': etag,
+            'last_modified': last_modified,
+            'stored_at': time.time(),
+        }
+        
+        with self._lock:
+            self._load_index()
+            try:
+                os.makedirs(os.path.dirname(body_path), exist_ok=True)
+                tmp_path = f"{body_path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(body)
+                os.replace(tmp_path, body_path)
+                self._write_meta(key, meta)
+            except OSError as e:
+                logger.warning(f"写入HTTP缓存失败: {url}, 错误: {str(e)}")
+                return False
+            
+            self._total_bytes += len(body) - self._index.get(key, 0)
+            self._index[key] = len(body)
+            self._index.move_to_end(key)
+            self._evict()
+        return True
+    
+    def revalidated(self, entry: Dict[str, Any], response: requests.Response) -> Optional[requests.Response]:
+        """
+        处理304响应：刷新条目的验证时间，并返回由缓存正文构建的响应
+        
+        Args:
+            entry (Dict[str, Any]): 缓存条目元数据
+            response (requests.Response): 304响应
+        
+        Returns:
+            Optional[requests.Response]: 由缓存构建的200响应，正文文件已丢失时删除条目并返回None
+        """
+        entry['stored_at'] = time.time()
+        # 服务器可能在304中下发新的验证器
+        if response.headers.get('ETag'):
+            entry['etag'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            entry['last_modified'] = response.headers['Last-Modified']
+        
+        with self._lock:
+            try:
+                self._write_meta(entry['key'], entry)
+            except OSError as e:
+                logger.warning(f"更新HTTP缓存失败: {entry['url']}, 错误: {str(e)}")
+        return self.to_response(entry)
+    
+    def to_response(self, entry: Dict[str, Any]) -> Optional[requests.Response]:
+        """
+        由缓存条目构建requests.Response
+        
+        Args:
+            entry (Dict[str, Any]): 缓存条目元数据
+        
+        Returns:
+            Optional[requests.Response]: 响应对象，正文文件丢失时返回None
+        """
+        _, body_path = self._paths(entry['key'])
+        try:
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except OSError:
+            with self._lock:
+                self._remove(entry['key'])
+            return None
+        
+        with self._lock:
+            if entry['key'] in self._index:
+                self._touch(entry['key'])
+        
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response._content = body
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.url = entry.get('final_url') or entry['url']
+        response.encoding = entry.get('encoding')
+        response.from_cache = True
+        return response
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        获取缓存统计
+        
+        Returns:
+            Dict[str, int]: 条目数与总字节数
+        """
+        with self._lock:
+            self._load_index()
+            return {'entries': len(self._index), 'bytes': self._total_bytes}
+
+
+# 进程内共享的缓存实例，按缓存目录索引
+_caches: Dict[str, HttpCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_http_cache(cache_config: Optional[Dict[str, Any]]) -> Optional[HttpCache]:
+    """
+    按配置获取进程内共享的HTTP缓存
+    
+    Args:
+        cache_config (Optional[Dict[str, Any]]): HTTP_CACHE配置
+    
+    Returns:
+        Optional[HttpCache]: 缓存实例，未启用时返回None
+    """
+    if not cache_config or not cache_config.get('ENABLED'):
+        return None
+    
+    cache_dir = cache_config['DIR']
+    with _caches_lock:
+        cache = _caches.get(cache_dir)
+        if cache is None:
+            cache = HttpCache(
+                cache_dir=cache_dir,
+                max_bytes=cache_config.get('MAX_BYTES', 256 * 1024 * 1024),
+                default_ttl=cache_config.get('DEFAULT_TTL', 0),
+                ttls=cache_config.get('TTLS')
+            )
+            _caches[cache_dir] = cache
+    return cache
@@ -0,0 +1,99 @@
+"""
+JSON解码模块：安装orjson时直接从响应字节解码，否则回退到标准库json；
+并提供按字段规格裁剪解码结果的投影函数，只保留解析用到的字段
+"""
+import json
+from typing import Any, Callable, Dict, Optional, Union
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# 可选的解码器：auto优先使用orjson，不可用时回退到json
+JSON_DECODERS = ('auto', 'orjson', 'json')
+
+# 字段规格：键为需要保留的字段，值为None表示原样保留，为字典表示继续按子规格裁剪（列表逐项裁剪）
+FieldSpec = Dict[str, Optional['FieldSpec']]
+
+
+def _stdlib_loads(content: bytes) -> Any:
+    """
+    标准库解码，json.loads可直接接受UTF-8/16/32编码的字节
+    
+    Args:
+        content (bytes): 响应正文
+    
+    Returns:
+        Any: 解码结果
+    """
+    return json.loads(content)
+
+
+def get_json_loads(name: str = 'auto') -> Callable[[bytes], Any]:
+    """
+    按名称获取JSON解码函数
+    
+    Args:
+        name (str, optional): 解码器名称，"auto"、"orjson"或"json". Defaults to 'auto'.
+    
+    Returns:
+        Callable[[bytes], Any]: 接受字节或字符串的解码函数，解码失败时抛出json.JSONDecodeError
+    
+    Raises:
+        ValueError: 解码器名称不支持
+    """
+    if name not in JSON_DECODERS:
+        raise ValueError(f"不支持的JSON解码器: {name}，可选: {', '.join(JSON_DECODERS)}")
+    if name == 'json':
+        return _stdlib_loads
+    if ORJSON_AVAILABLE:
+        # orjson.JSONDecodeError是json.JSONDecodeError的子类，调用方的异常处理无需区分
+        return orjson.loads
+    if name == 'orjson':
+        logger.warning("orjson不可用，回退到标准库json解码")
+    return _stdlib_loads
+
+
+def decode_json(content: bytes, decoder: Union[str, Callable[[bytes], Any]] = 'auto') -> Any:
+    """
+    解码JSON响应正文，跳过requests先把字节解码为文本的步骤
+    
+    Args:
+        content (bytes): 响应正文
+        decoder (Union[str, Callable[[bytes], Any]], optional): 解码器名称，或已由get_json_loads解析好的解码函数
+            （逐页解码时应传入解码函数，避免每次重新解析名称）. Defaults to 'auto'.
+    
+    Returns:
+        Any: 解码结果
+    """
+    loads = get_json_loads(decoder) if isinstance(decoder, str) else decoder
+    return loads(content)
+
+
+def project(data: Any, spec: FieldSpec) -> Any:
+    """
+    按字段规格裁剪解码结果：字典只保留规格中的字段，列表逐项裁剪，其他值原样返回
+    
+    Args:
+        data (Any): 解码结果
+        spec (FieldSpec): 字段规格
+    
+    Returns:
+        Any: 裁剪后的数据
+    """
+    if isinstance(data, list):
+        return [project(item, spec) for item in data]
+    if not isinstance(data, dict):
+        return data
+    projected = {}
+    for key, sub_spec in spec.items():
+        if key in data:
+            value = data[key]
+            projected[key] = value if sub_spec is None or value is None else project(value, sub_spec)
+    return projected
@@ -0,0 +1,317 @@
+"""
+爬虫请求指标模块，按端点统计延迟分布、流量、状态码、重试、限速等待和退避等待，
+用于分析爬取耗时究竟花在哪里
+"""
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+# 延迟直方图的桶上界（秒），最后一个桶收纳所有更慢的请求
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+# 路径中的数字ID段，归并为同一端点，如/api/v4/answers/123 -> /api/v4/answers/{id}
+_ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+
+def endpoint_key(url: str) -> str:
+    """
+    把请求URL归并为端点标识：主机加路径，路径中的数字ID替换为{id}，忽略查询参数
+    
+    Args:
+        url (str): 请求URL
+    
+    Returns:
+        str: 端点标识，如 www.zhihu.com/api/v4/answers/{id}
+    """
+    parts = urlsplit(url)
+    return f"{parts.netloc}{_ID_SEGMENT.sub('/{id}', parts.path) or '/'}"
+
+
+class LatencyHistogram:
+    """
+    固定分桶的延迟直方图，记录次数、总和与最值，分位数按桶上界估计
+    """
+    
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        """
+        初始化直方图
+        
+        Args:
+            buckets (tuple, optional): 桶上界（秒），需升序且以inf结尾. Defaults to LATENCY_BUCKETS.
+        """
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+    
+    def observe(self, value: float):
+        """
+        记录一次延迟
+        
+        Args:
+            value (float): 延迟秒数
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        估计分位数：返回累计次数首次达到q的桶的上界，落在最后一个桶时返回最大值
+        
+        Args:
+            q (float): 分位点，如0.95
+        
+        Returns:
+            Optional[float]: 延迟秒数，没有数据时返回None
+        """
+        if not self.count:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return min(bound, self.max)
+        return self.max
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        导出直方图
+        
+        Returns:
+            Dict[str, Any]: 包含count、mean、min、max、p50、p95、p99和各桶计数（键为桶上界，如"0.1"、"inf"）
+        """
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': {('inf' if bound == float('inf') else f"{bound:g}"): count
+                        for bound, count in zip(self.buckets, self.counts)},
+        }
+
+
+class _EndpointStats:
+    """
+    单个端点的累计统计
+    """
+    
+    def __init__(self):
+        """
+        初始化端点统计
+        """
+        self.latency = LatencyHistogram()
+        self.requests = 0
+        self.status_codes: Dict[int, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.bytes_in = 0
+        self.wire_bytes_in = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.throttle_wait = 0.0
+        self.backoff_wait = 0.0
+
+
+class CrawlMetrics:
+    """
+    爬虫请求指标，线程安全，同一爬虫实例的所有请求共用一份
+    """
+    
+    def __init__(self):
+        """
+        初始化指标
+        """
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, _EndpointStats] = {}
+        self.started_at = time.monotonic()
+    
+    def _stats(self, url: str) -> _EndpointStats:
+        """
+        获取URL所属端点的统计，调用方需持有锁
+        
+        Args:
+            url (str): 请求URL
+        
+        Returns:
+            _EndpointStats: 端点统计
+        """
+        key = endpoint_key(url)
+        stats = self._endpoints.get(key)
+        if stats is None:
+            stats = self._endpoints[key] = _EndpointStats()
+        return stats
+    
+    def record_response(self, url: str, status_code: int, latency: float, bytes_in: int = 0,
+                        wire_bytes_in: Optional[int] = None):
+        """
+        记录一次完成的请求（含错误状态码）
+        
+        Args:
+            url (str): 请求URL
+            status_code (int): HTTP状态码
+            latency (float): 从发出请求到读完响应的秒数
+            bytes_in (int, optional): 解压后的响应体字节数. Defaults to 0.
+            wire_bytes_in (Optional[int], optional): 网络上实际接收的响应体字节数（压缩后），未知时按bytes_in计. Defaults to None.
+        """
+        with self._lock:
+            stats = self._stats(url)
+            stats.requests += 1
+            stats.latency.observe(latency)
+            stats.status_codes[status_code] = stats.status_codes.get(status_code, 0) + 1
+            stats.bytes_in += bytes_in
+            stats.wire_bytes_in += bytes_in if wire_bytes_in is None else wire_bytes_in
+    
+    def record_error(self, url: str, error: BaseException, latency: float):
+        """
+        记录一次没有得到响应的请求（连接失败、超时等）
+        
+        Args:
+            url (str): 请求URL
+            error (BaseException): 异常
+            latency (float): 从发出请求到失败的秒数
+        """
+        name = type(error).__name__
+        with self._lock:
+            stats = self._stats(url)
+            stats.requests += 1
+            stats.latency.observe(latency)
+            stats.errors[name] = stats.errors.get(name, 0) + 1
+    
+    def record_retry(self, url: str, count: int = 1):
+        """
+        记录重试次数
+        
+        Args:
+            url (str): 请求URL
+            count (int, optional): 重试次数. Defaults to 1.
+        """
+        if count:
+            with self._lock:
+                self._stats(url).retries += count
+    
+    def record_throttle(self, url: str, wait: float):
+        """
+        记录限速等待（令牌桶、自适应控制器或并发槽位）
+        
+        Args:
+            url (str): 请求URL
+            wait (float): 等待秒数
+        """
+        if wait > 0:
+            with self._lock:
+                self._stats(url).throttle_wait += wait
+    
+    def record_backoff(self, url: str, wait: float):
+        """
+        记录重试前的退避等待
+        
+        Args:
+            url (str): 请求URL
+            wait (float): 等待秒数
+        """
+        if wait > 0:
+            with self._lock:
+                self._stats(url).backoff_wait += wait
+    
+    def record_cache_hit(self, url: str):
+        """
+        记录一次HTTP缓存命中（未发出请求）
+        
+        Args:
+            url (str): 请求URL
+        """
+        with self._lock:
+            self._stats(url).cache_hits += 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        导出指标
+        
+        Returns:
+            Dict[str, Any]: 包含elapsed（自创建或重置以来的秒数）、totals（全部端点汇总）和endpoints
+                （端点到requests、status_codes、errors、bytes_in、wire_bytes_in、retries、cache_hits、
+                throttle_wait、backoff_wait、request_time和latency直方图的映射）；
+                等待时间和请求耗时是各请求之和，并发爬取时可能超过elapsed
+        """
+        with self._lock:
+            endpoints = {}
+            totals = {'requests': 0, 'errors': 0, 'bytes_in': 0, 'wire_bytes_in': 0, 'retries': 0,
+                      'cache_hits': 0, 'throttle_wait': 0.0, 'backoff_wait': 0.0, 'request_time': 0.0,
+                      'status_codes': {}}
+            for key, stats in sorted(self._endpoints.items()):
+                endpoints[key] = {
+                    'requests': stats.requests,
+                    'status_codes': dict(sorted(stats.status_codes.items())),
+                    'errors': dict(stats.errors),
+                    'bytes_in': stats.bytes_in,
+                    'wire_bytes_in': stats.wire_bytes_in,
+                    'retries': stats.retries,
+                    'cache_hits': stats.cache_hits,
+                    'throttle_wait': stats.throttle_wait,
+                    'backoff_wait': stats.backoff_wait,
+                    'request_time': stats.latency.total,
+                    'latency': stats.latency.snapshot(),
+                }
+                for field in ('requests', 'bytes_in', 'wire_bytes_in', 'retries', 'cache_hits',
+                              'throttle_wait', 'backoff_wait', 'request_time'):
+                    totals[field] += endpoints[key][field]
+                totals['errors'] += sum(stats.errors.values())
+                for status_code, count in stats.status_codes.items():
+                    totals['status_codes'][status_code] = totals['status_codes'].get(status_code, 0) + count
+            totals['status_codes'] = dict(sorted(totals['status_codes'].items()))
+            return {
+                'elapsed': time.monotonic() - self.started_at,
+                'totals': totals,
+                'endpoints': endpoints,
+            }
+    
+    def summary_lines(self) -> List[str]:
+        """
+        生成便于阅读的汇总，每个端点一行
+        
+        Returns:
+            List[str]: 汇总文本行，没有请求时返回空列表
+        """
+        snapshot = self.snapshot()
+        totals = snapshot['totals']
+        if not totals['requests'] and not totals['cache_hits']:
+            return []
+        
+        def _ms(value: Optional[float]) -> str:
+            return '-' if value is None else f"{value * 1000:.0f}ms"
+        
+        lines = [
+            f"爬取指标: 耗时 {snapshot['elapsed']:.1f}s，请求 {totals['requests']} 次，"
+            f"请求耗时合计 {totals['request_time']:.1f}s，限速等待 {totals['throttle_wait']:.1f}s，"
+            f"退避等待 {totals['backoff_wait']:.1f}s，重试 {totals['retries']} 次，错误 {totals['errors']} 次，"
+            f"缓存命中 {totals['cache_hits']} 次，接收 {totals['bytes_in'] / 1024:.1f}KB"
+            f"（网络 {totals['wire_bytes_in'] / 1024:.1f}KB），状态码 {totals['status_codes']}"
+        ]
+        for key, stats in snapshot['endpoints'].items():
+            latency = stats['latency']
+            lines.append(
+                f"  {key}: 请求 {stats['requests']} 次，p50 {_ms(latency['p50'])}，p95 {_ms(latency['p95'])}，"
+                f"最大 {_ms(latency['max'])}，限速等待 {stats['throttle_wait']:.1f}s，重试 {stats['retries']} 次，"
+                f"接收 {stats['bytes_in'] / 1024:.1f}KB，状态码 {stats['status_codes']}"
+                + (f"，错误 {stats['errors']}" if stats['errors'] else '')
+            )
+        return lines
+    
+    def reset(self):
+        """
+        清空指标并重新计时
+        """
+        with self._lock:
+            self._endpoints.clear()
+            self.started_at = time.monotonic()
@@ -0,0 +1,72 @@
+"""
+预取模块，在后台线程中提前消费迭代器，使请求与解析流水线并行
+"""
+import queue
+import threading
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar('T')
+
+# 后台线程结束的标记
+_END = object()
+
+
+def prefetch(iterable: Iterable[T], depth: int = 1, name: str = 'prefetch') -> Iterator[T]:
+    """
+    在后台线程中提前迭代iterable，最多领先调用方depth个元素
+    
+    适用于“请求下一页依赖上一页响应，但解析与请求相互独立”的场景：调用方处理第N个元素时，
+    后台线程已在获取第N+1个。后台线程抛出的异常会在调用方取到对应位置时重新抛出；
+    调用方提前结束迭代时后台线程在当前元素完成后退出
+    
+    Args:
+        iterable (Iterable[T]): 被预取的迭代器，只会在后台线程中迭代
+        depth (int, optional): 预取深度，不大于0时不启动后台线程，按原顺序同步迭代. Defaults to 1.
+        name (str, optional): 后台线程名称. Defaults to 'prefetch'.
+    
+    Yields:
+        T: iterable中的元素，顺序不变
+    """
+    if depth <= 0:
+        yield from iterable
+        return
+    
+    items = queue.Queue()
+    slots = threading.Semaphore(depth)
+    stop = threading.Event()
+    
+    def worker():
+        iterator = iter(iterable)
+        try:
+            while not stop.is_set():
+                # 已预取但未被消费的元素达到depth时等待
+                if not slots.acquire(timeout=0.1):
+                    continue
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    items.put((_END, None))
+                    return
+                except BaseException as e:
+                    items.put((_END, e))
+                    return
+                items.put((item, None))
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close:
+                close()
+    
+    thread = threading.Thread(target=worker, name=name, daemon=True)
+    thread.start()
+    
+    try:
+        while True:
+            item, error = items.get()
+            if item is _END:
+                if error is not None:
+                    raise error
+                return
+            slots.release()
+            yield item
+    finally:
+        stop.set()
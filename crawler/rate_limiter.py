@@ -0,0 +1,143 @@
+"""
+请求限速模块，提供按主机共享的令牌桶限速器
+"""
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class TokenBucket:
+    """
+    令牌桶限速器，线程安全，可同时用于同步与异步请求路径
+    
+    每次请求先预约一个令牌：令牌充足时立即放行，否则返回需要等待的时间。
+    令牌在请求往返期间持续补充，因此不会在RTT之外额外叠加固定延迟。
+    """
+    
+    def __init__(self, rate: float, burst: int = 1, clock: Callable[[], float] = time.monotonic):
+        """
+        初始化令牌桶
+        
+        Args:
+            rate (float): 每秒补充的令牌数（即每秒允许的请求数）
+            burst (int, optional): 桶容量，即允许的瞬时突发请求数. Defaults to 1.
+            clock (Callable[[], float], optional): 单调时钟，测试时可注入. Defaults to time.monotonic.
+        """
+        if rate <= 0:
+            raise ValueError(f"rate必须大于0，当前值: {rate}")
+        
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._last = clock()
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """
+        预约一个令牌，返回需要等待的秒数
+        
+        令牌数允许为负，表示已被后续请求预约的额度，保证并发调用方按到达顺序依次放行
+        
+        Returns:
+            float: 需要等待的秒数，0表示可以立即发送
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+    
+    def set_rate(self, rate: float, burst: Optional[int] = None):
+        """
+        调整补充速率，已累积的令牌按旧速率结算，供自适应控制器使用
+        
+        Args:
+            rate (float): 新的每秒令牌数
+            burst (Optional[int], optional): 新的桶容量，为None时不变，已累积的令牌不超过新容量. Defaults to None.
+        """
+        if rate <= 0:
+            raise ValueError(f"rate必须大于0，当前值: {rate}")
+        
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self.rate = float(rate)
+            if burst is not None:
+                self.burst = max(1, int(burst))
+                self._tokens = min(self._tokens, float(self.burst))
+    
+    def acquire(self) -> float:
+        """
+        同步获取令牌，必要时阻塞当前线程
+        
+        Returns:
+            float: 实际等待的秒数
+        """
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    async def acquire_async(self) -> float:
+        """
+        异步获取令牌，等待期间不阻塞事件循环
+        
+        Returns:
+            float: 实际等待的秒数
+        """
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+# 进程内共享的限速器注册表，按主机名索引
+_host_limiters: Dict[str, TokenBucket] = {}
+# 各主机限速器最近一次配置的(rate, burst)，与令牌桶当前速率分开记录，自适应控制器调整速率不视为配置变化
+_host_configs: Dict[str, Tuple[float, int]] = {}
+_registry_lock = threading.Lock()
+
+
+def get_host_limiter(url: str, rate: Optional[float], burst: int = 1) -> Optional[TokenBucket]:
+    """
+    获取URL所属主机的共享限速器，同一进程内的所有爬虫实例和线程共用同一个令牌桶
+    
+    调用方请求的rate/burst与该主机已配置的不同时，按新配置调整令牌桶并记录警告
+    
+    Args:
+        url (str): 请求URL
+        rate (Optional[float]): 每秒允许的请求数，为None或不大于0时不限速
+        burst (int, optional): 允许的瞬时突发请求数. Defaults to 1.
+    
+    Returns:
+        Optional[TokenBucket]: 主机对应的限速器，不限速时返回None
+    """
+    if not rate or rate <= 0:
+        return None
+    
+    host = urlparse(url).netloc
+    config = (float(rate), max(1, int(burst)))
+    limiter = _host_limiters.get(host)
+    if limiter is None or _host_configs.get(host) != config:
+        with _registry_lock:
+            limiter = _host_limiters.get(host)
+            if limiter is None:
+                limiter = TokenBucket(*config)
+                _host_limiters[host] = limiter
+            elif _host_configs.get(host) != config:
+                previous_rate, previous_burst = _host_configs[host]
+                logger.warning(f"主机 {host} 的限速配置从 {previous_rate}/秒（突发 {previous_burst}）"
+                               f"调整为 {config[0]}/秒（突发 {config[1]}），同一主机的所有爬虫共用新配置")
+                limiter.set_rate(*config)
+            _host_configs[host] = config
+    return limiter
@@ -0,0 +1,251 @@
+"""
+HTTP传输层模块，为BaseCrawler提供录制、回放和本地替身服务器三种离线模式
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from crawler.connection_pool import PooledHTTPAdapter
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 传输模式：live直连，record直连并录制，replay只从磁带回放，stub转发到本地替身服务器
+TRANSPORT_MODES = ('live', 'record', 'replay', 'stub')
+
+# 正文以解码后的形式保存，因此不保留与传输编码相关的响应头
+_SKIPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+
+class Cassette:
+    """
+    磁带目录，按请求方法、URL和请求体保存响应，布局与HTTP缓存一致：元数据.json + 正文.body
+    """
+    
+    def __init__(self, cassette_dir: str):
+        """
+        初始化磁带目录
+        
+        Args:
+            cassette_dir (str): 磁带目录
+        """
+        self.cassette_dir = cassette_dir
+        self._lock = threading.Lock()
+        os.makedirs(self.cassette_dir, exist_ok=True)
+    
+    @staticmethod
+    def make_key(request: requests.PreparedRequest) -> str:
+        """
+        根据请求计算磁带键
+        
+        Args:
+            request (requests.PreparedRequest): 请求
+        
+        Returns:
+            str: 磁带键
+        """
+        body = request.body or b''
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        digest = hashlib.sha256(f"{request.method} {request.url}\n".encode('utf-8'))
+        digest.update(body)
+        return digest.hexdigest()
+    
+    def _paths(self, key: str):
+        """
+        获取磁带条目的元数据与正文文件路径
+        
+        Args:
+            key (str): 磁带键
+        
+        Returns:
+            Tuple[str, str]: 元数据路径、正文路径
+        """
+        base = os.path.join(self.cassette_dir, key[:2], key)
+        return base + '.json', base + '.body'
+    
+    def save(self, request: requests.PreparedRequest, response: requests.Response):
+        """
+        保存一对请求/响应
+        
+        Args:
+            request (requests.PreparedRequest): 请求
+            response (requests.Response): 响应
+        """
+        key = self.make_key(request)
+        meta_path, body_path = self._paths(key)
+        meta = {
+            'method': request.method,
+            'url': request.url,
+            'status_code': response.status_code,
+            'reason': response.reason,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() not in _SKIPPED_HEADERS},
+            'recorded_at': time.time(),
+        }
+        
+        with self._lock:
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            suffix = f".{threading.get_ident()}.tmp"
+            with open(body_path + suffix, 'wb') as f:
+                f.write(response.content)
+            os.replace(body_path + suffix, body_path)
+            with open(meta_path + suffix, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(meta_path + suffix, meta_path)
+        logger.debug(f"已录制: {request.method} {request.url}")
+    
+    def load(self, request: requests.PreparedRequest) -> Optional[Dict[str, Any]]:
+        """
+        读取请求对应的录制响应
+        
+        Args:
+            request (requests.PreparedRequest): 请求
+        
+        Returns:
+            Optional[Dict[str, Any]]: 元数据（body字段为正文字节），未录制时返回None
+        """
+        meta_path, body_path = self._paths(self.make_key(request))
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                meta['body'] = f.read()
+        except (OSError, ValueError):
+            return None
+        return meta
+
+
+class RecordingAdapter(PooledHTTPAdapter):
+    """
+    录制适配器：正常发送请求，并把每个最终响应写入磁带
+    """
+    
+    def __init__(self, cassette: Cassette, **kwargs):
+        """
+        初始化录制适配器
+        
+        Args:
+            cassette (Cassette): 磁带目录
+            **kwargs: PooledHTTPAdapter的参数，如shared、max_retries
+        """
+        self.cassette = cassette
+        super().__init__(**kwargs)
+    
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if kwargs.get('stream'):
+            # 流式响应先读完正文再录制，之后仍可正常读取
+            response.content
+        try:
+            self.cassette.save(request, response)
+        except OSError as e:
+            logger.warning(f"录制响应失败: {request.url}, 错误: {str(e)}")
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    回放适配器：不访问网络，从磁带返回录制的响应，可注入固定延迟与随机抖动模拟网络往返
+    """
+    
+    def __init__(self, cassette: Cassette, latency: float = 0.0, jitter: float = 0.0):
+        """
+        初始化回放适配器
+        
+        Args:
+            cassette (Cassette): 磁带目录
+            latency (float, optional): 每个请求注入的固定延迟（秒）. Defaults to 0.0.
+            jitter (float, optional): 在固定延迟上叠加的最大随机抖动（秒）. Defaults to 0.0.
+        """
+        super().__init__()
+        self.cassette = cassette
+        self.latency = latency
+        self.jitter = jitter
+    
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        entry = self.cassette.load(request)
+        
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter > 0 else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        
+        if entry is None:
+            raise requests.ConnectionError(f"回放模式下磁带中没有该请求: {request.method} {request.url}",
+                                           request=request)
+        
+        response = requests.Response()
+        response.status_code = entry['status_code']
+        response.reason = entry.get('reason')
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = entry['body']
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+    
+    def close(self):
+        pass
+
+
+class StubAdapter(PooledHTTPAdapter):
+    """
+    替身适配器：把所有请求的协议和主机改写为本地替身服务器，路径与参数保持不变
+    """
+    
+    def __init__(self, stub_url: str, **kwargs):
+        """
+        初始化替身适配器
+        
+        Args:
+            stub_url (str): 替身服务器地址，如 http://127.0.0.1:8765
+            **kwargs: PooledHTTPAdapter的参数，如shared、max_retries
+        """
+        self.stub_parts = urlsplit(stub_url)
+        super().__init__(**kwargs)
+    
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = urlunsplit((self.stub_parts.scheme, self.stub_parts.netloc, parts.path, parts.query, ''))
+        return super().send(request, **kwargs)
+
+
+def build_adapter(transport_config: Optional[Dict[str, Any]], **adapter_kwargs) -> BaseAdapter:
+    """
+    按传输配置构建session使用的适配器
+    
+    Args:
+        transport_config (Optional[Dict[str, Any]]): TRANSPORT配置，为None或MODE为live时直连
+        **adapter_kwargs: 传给PooledHTTPAdapter的参数，如shared、max_retries、pool_maxsize
+    
+    Returns:
+        BaseAdapter: 适配器实例
+    """
+    mode = (transport_config or {}).get('MODE', 'live')
+    if mode not in TRANSPORT_MODES:
+        raise ValueError(f"不支持的传输模式: {mode}，可选: {', '.join(TRANSPORT_MODES)}")
+    
+    if mode == 'live':
+        return PooledHTTPAdapter(**adapter_kwargs)
+    
+    if mode == 'stub':
+        logger.info(f"传输模式: stub，请求将转发到 {transport_config['STUB_URL']}")
+        return StubAdapter(transport_config['STUB_URL'], **adapter_kwargs)
+    
+    cassette = Cassette(transport_config['CASSETTE_DIR'])
+    logger.info(f"传输模式: {mode}，磁带目录: {cassette.cassette_dir}")
+    if mode == 'record':
+        return RecordingAdapter(cassette, **adapter_kwargs)
+    return ReplayAdapter(
+        cassette,
+        latency=transport_config.get('REPLAY_LATENCY', 0.0),
+        jitter=transport_config.get('REPLAY_JITTER', 0.0)
+    )
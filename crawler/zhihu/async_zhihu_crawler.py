@@ -0,0 +1,389 @@
+"""
+知乎异步爬虫类，基于asyncio并发爬取知乎数据
+"""
+import asyncio
+import json
+from typing import List, Dict, Any, AsyncIterator, Optional
+from crawler.async_crawler import AsyncBaseCrawler
+from crawler.json_codec import get_json_loads
+from crawler.zhihu.zhihu_parser import ANSWER_FIELDS, ANSWER_LIST_FIELDS, SEARCH_PAGE_FIELDS, ZhihuParserMixin
+from data.seen_filter import get_seen_filter
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class AsyncZhihuCrawler(ZhihuParserMixin, AsyncBaseCrawler):
+    """
+    知乎异步爬虫类，同一进程内可同时保持CONCURRENT_REQUESTS个请求在途
+    """
+    
+    def __init__(self, **kwargs):
+        """
+        初始化知乎异步爬虫
+        
+        Args:
+            **kwargs: 异步基础爬虫的配置参数
+        """
+        from config.settings import CRAWLER_CONFIG
+        zhihu_config = CRAWLER_CONFIG['ZHIHU']
+        
+        super().__init__(
+            base_url=zhihu_config['BASE_URL'],
+            user_agent=zhihu_config['USER_AGENT'],
+            max_retries=zhihu_config['MAX_RETRIES'],
+            download_delay=zhihu_config['DOWNLOAD_DELAY'],
+            cookie=zhihu_config['COOKIE'],
+            concurrent_requests=zhihu_config['CONCURRENT_REQUESTS'],
+            rate_limit=zhihu_config['RATE_LIMIT'],
+            rate_burst=zhihu_config['RATE_BURST'],
+            adaptive=zhihu_config['ADAPTIVE']
+        )
+        
+        # 解析配置
+        self.parser_backend = zhihu_config['PARSER_BACKEND']
+        self.parse_workers = zhihu_config['PARSE_WORKERS']
+        self.parse_executor_type = zhihu_config['PARSE_EXECUTOR']
+        # 解码函数只在初始化时解析一次，orjson不可用的回退警告不会逐页重复
+        self.json_loads = get_json_loads(zhihu_config['JSON_DECODER'])
+        self.json_projection = zhihu_config['JSON_PROJECTION']
+        # 已见ID过滤器，启用时首次创建会从数据库预热
+        self.seen_filter = get_seen_filter(zhihu_config['SEEN_FILTER'])
+        
+        # 知乎热门问题URL
+        self.hot_list_url = f"{self.base_url}/hot"
+        # 知乎搜索API
+        self.search_url = f"{self.base_url}/api/v4/search_v3"
+    
+    async def _parse_in_executor(self, parse_func, *args):
+        """
+        在线程池中执行解析函数：清理HTML为CPU密集型操作，直接在事件循环中执行会阻塞其他在途请求
+        
+        Args:
+            parse_func (Callable): 解析函数
+            *args: 解析函数的参数
+        
+        Returns:
+            Any: 解析结果
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, parse_func, *args)
+    
+    async def get_hot_questions(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        异步获取知乎热门问题列表
+        
+        Args:
+            limit (int, optional): 返回的问题数量限制. Defaults to 50.
+        
+        Returns:
+            List[Dict[str, Any]]: 热门问题列表，每个问题包含标题、链接、热度等信息
+        """
+        logger.info(f"开始异步爬取知乎热门问题，限制数量: {limit}")
+        
+        try:
+            response = await self.get(self.hot_list_url)
+            
+            questions = await self._parse_in_executor(self._parse_hot_list, response.text, limit)
+            
+            logger.info(f"成功爬取 {len(questions)} 个知乎热门问题")
+            return questions
+        except Exception as e:
+            logger.error(f"爬取知乎热门问题失败，错误: {str(e)}")
+            return []
+    
+    async def get_question_answers(self, question_id: str, limit: int = 20,
+                                   max_pages: int = 1) -> List[Dict[str, Any]]:
+        """
+        通过回答列表API异步分页获取问题的回答列表
+        
+        Args:
+            question_id (str): 问题ID
+            limit (int, optional): 每页回答数量. Defaults to 20.
+            max_pages (int, optional): 最多爬取的页数. Defaults to 1.
+        
+        Returns:
+            List[Dict[str, Any]]: 回答列表，字段与save_zhihu_answers的输入一致
+        """
+        logger.info(f"开始异步爬取问题回答，问题ID: {question_id}，每页数量: {limit}，最大页数: {max_pages}")
+        
+        answers = []
+        current_page = 0
+        is_end = False
+        next_url = None
+        
+        while current_page < max_pages and not is_end:
+            try:
+                if next_url:
+                    response = await self.get(next_url)
+                else:
+                    answers_url = f"{self.base_url}/api/v4/questions/{question_id}/answers"
+                    response = await self.get(answers_url, params=self._build_answers_params(0, limit))
+                
+                response_data = self._load_json(response, ANSWER_LIST_FIELDS)
+                page_answers = await self._parse_in_executor(self._parse_answer_list, response_data)
+                answers.extend(page_answers)
+                current_page += 1
+                logger.debug(f"问题 {question_id} 第 {current_page} 页获取 {len(page_answers)} 个回答")
+                
+                # 检查分页信息
+                paging = response_data.get('paging', {})
+                is_end = paging.get('is_end', False)
+                next_url = paging.get('next')
+            
+            except json.JSONDecodeError as e:
+                logger.error(f"解析回答列表JSON失败，问题ID: {question_id}，页码: {current_page + 1}，错误: {str(e)}")
+                break
+            except Exception as e:
+                logger.error(f"爬取问题回答失败，问题ID: {question_id}，页码: {current_page + 1}，错误: {str(e)}")
+                break
+        
+        logger.info(f"问题 {question_id} 共获取 {len(answers)} 个回答")
+        return answers
+    
+    async def get_answers_for_questions(self, question_ids: List[str], limit: int = 20, max_pages: int = 1,
+                                        max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        并发爬取多个问题的回答，同时进行的问题数由max_workers限制，在途请求数仍由信号量和限速器约束
+        
+        Args:
+            question_ids (List[str]): 问题ID列表
+            limit (int, optional): 每页回答数量. Defaults to 20.
+            max_pages (int, optional): 每个问题最多爬取的页数. Defaults to 1.
+            max_workers (Optional[int], optional): 同时爬取的问题数，默认使用CONCURRENT_REQUESTS. Defaults to None.
+        
+        Returns:
+            List[Dict[str, Any]]: 所有问题的回答列表，按问题ID的输入顺序排列
+        """
+        question_ids = list(dict.fromkeys(qid for qid in question_ids if qid))
+        if not question_ids:
+            return []
+        
+        semaphore = asyncio.Semaphore(max(1, max_workers or self.concurrent_requests))
+        
+        async def crawl(question_id: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self.get_question_answers(question_id, limit=limit, max_pages=max_pages)
+        
+        answer_lists = await asyncio.gather(*(crawl(qid) for qid in question_ids))
+        answers = [answer for answer_list in answer_lists for answer in answer_list]
+        logger.info(f"并发爬取完成，{len(question_ids)} 个问题共获取 {len(answers)} 个回答")
+        return answers
+    
+    async def get_answer_details(self, answer_id: str) -> Dict[str, Any]:
+        """
+        通过回答API异步获取单个回答的详细信息
+        
+        Args:
+            answer_id (str): 回答ID
+        
+        Returns:
+            Dict[str, Any]: 回答的详细信息，字段与save_zhihu_answers的输入一致，失败时返回空字典
+        """
+        try:
+            answer_url = f"{self.base_url}/api/v4/answers/{answer_id}"
+            response = await self.get(answer_url, params=self._build_answer_detail_params())
+            return await self._parse_in_executor(self._parse_answer_object, self._load_json(response, ANSWER_FIELDS))
+        except Exception as e:
+            logger.error(f"爬取回答详情失败，回答ID: {answer_id}，错误: {str(e)}")
+            return {}
+    
+    async def get_answer_details_batch(self, answer_ids: List[str], skip_existing: bool = True,
+                                       storage=None, max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        批量异步获取回答详情：先用一次集合查询过滤掉数据库中已有的回答，再由固定数量的工作协程依次领取其余回答爬取，
+        协程数和在途响应数不随ID数量增长，在途请求数仍由信号量和限速器约束
+        
+        Args:
+            answer_ids (List[str]): 回答ID列表
+            skip_existing (bool, optional): 是否跳过zhihu_answers中已存在的回答. Defaults to True.
+            storage (DataStorage, optional): 数据存储实例，默认使用全局data_storage. Defaults to None.
+            max_workers (Optional[int], optional): 工作协程数，默认使用CONCURRENT_REQUESTS. Defaults to None.
+        
+        Returns:
+            List[Dict[str, Any]]: 成功获取的回答详情列表（按输入顺序），可直接传给save_zhihu_answers
+        """
+        answer_ids = list(dict.fromkeys(str(aid) for aid in answer_ids if aid))
+        
+        if skip_existing and answer_ids:
+            if storage is None:
+                from data.storage import data_storage
+                storage = data_storage
+            # 数据库查询是阻塞操作，放到线程池中执行
+            loop = asyncio.get_running_loop()
+            existing_ids = await loop.run_in_executor(None, storage.get_existing_answer_ids, answer_ids)
+            answer_ids = [aid for aid in answer_ids if aid not in existing_ids]
+            logger.info(f"跳过 {len(existing_ids)} 个已入库的回答，待爬取 {len(answer_ids)} 个")
+        
+        details = [None] * len(answer_ids)
+        pending = iter(enumerate(answer_ids))
+        
+        async def worker():
+            # 所有工作协程共用一个迭代器，取到下一个ID前不会创建新的请求
+            for index, answer_id in pending:
+                details[index] = await self.get_answer_details(answer_id)
+        
+        num_workers = min(max(1, max_workers or self.concurrent_requests), len(answer_ids))
+        await asyncio.gather(*(worker() for _ in range(num_workers)))
+        details = [detail for detail in details if detail]
+        logger.info(f"批量获取回答详情完成，成功 {len(details)} 个，失败 {len(answer_ids) - len(details)} 个")
+        return details
+    
+    async def iter_search_pages(self, query: str, max_pages: int = 10, limit: int = 20,
+                                watermark: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        逐页异步搜索知乎内容的异步生成器，每解析完一页立即产出
+        
+        单个关键词的分页依赖上一页返回的paging.next，因此页与页之间顺序执行；
+        多个关键词之间的并发请使用search_many
+        
+        Args:
+            query (str): 搜索关键词，支持多关键词查询
+            max_pages (int, optional): 最大爬取页数. Defaults to 10.
+            limit (int, optional): 每页返回数量限制. Defaults to 20.
+            watermark (Optional[Dict[str, Any]], optional): 增量水位，到达后停止翻页. Defaults to None.
+        
+        Yields:
+            Dict[str, Any]: 一页数据，包含page（页码，从1开始）、results（本页结果）、next_url、is_end、reached_watermark
+            和skipped（被已见ID过滤器跳过的条目摘要）
+        """
+        logger.info(f"开始异步搜索知乎内容，关键词: {query}，最大页数: {max_pages}，每页限制: {limit}")
+        
+        current_page = 0
+        is_end = False
+        next_url = None
+        seen_filter = self._search_seen_filter()
+        
+        while current_page < max_pages and not is_end:
+            try:
+                logger.info(f"[{query}] 正在爬取第 {current_page + 1} 页...")
+                
+                if next_url:
+                    response = await self.get(next_url)
+                else:
+                    params = self._build_search_params(query, current_page, limit)
+                    response = await self.get(self.search_url, params=params)
+                
+                response_data = self._load_json(response, SEARCH_PAGE_FIELDS)
+                skipped = []
+                page_results = await self._parse_in_executor(self._parse_search_results, response_data, skipped,
+                                                             seen_filter)
+                current_page += 1
+                
+                # 按增量水位过滤已爬取过的条目
+                page_results, reached_watermark = self._filter_new_results(page_results, watermark, skipped)
+                
+                if page_results:
+                    logger.info(f"[{query}] 第 {current_page} 页成功获取 {len(page_results)} 条结果")
+                elif not reached_watermark and not skipped:
+                    logger.warning(f"[{query}] 第 {current_page} 页未获取到有效结果")
+                
+                # 检查分页信息
+                paging = response_data.get('paging', {})
+                is_end = paging.get('is_end', False)
+                next_url = paging.get('next')
+            
+            except json.JSONDecodeError as e:
+                logger.error(f"[{query}] 解析JSON响应失败，页码: {current_page + 1}，错误: {str(e)}")
+                return
+            except Exception as e:
+                logger.error(f"[{query}] 爬取第 {current_page + 1} 页失败，错误: {str(e)}")
+                return
+            
+            yield {
+                'page': current_page,
+                'results': page_results,
+                'next_url': next_url,
+                'is_end': is_end,
+                'reached_watermark': reached_watermark,
+                'skipped': skipped
+            }
+            
+            if reached_watermark:
+                logger.info(f"[{query}] 第 {current_page} 页到达增量水位，停止翻页")
+                return
+    
+    async def search_content(self, query: str, max_pages: int = 10, limit: int = 20,
+                             watermark: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        异步搜索知乎内容，汇总iter_search_pages产出的所有页面
+        
+        Args:
+            query (str): 搜索关键词，支持多关键词查询
+            max_pages (int, optional): 最大爬取页数. Defaults to 10.
+            limit (int, optional): 每页返回数量限制. Defaults to 20.
+            watermark (Optional[Dict[str, Any]], optional): 增量水位，到达后停止翻页. Defaults to None.
+        
+        Returns:
+            List[Dict[str, Any]]: 搜索结果列表，每个结果包含标题、内容、链接等信息
+        """
+        all_results = []
+        async for page in self.iter_search_pages(query, max_pages=max_pages, limit=limit, watermark=watermark):
+            all_results.extend(page['results'])
+        
+        logger.info(f"[{query}] 搜索完成，共获取 {len(all_results)} 条结果")
+        return all_results
+    
+    async def search_many(self, queries: List[str], max_pages: int = 10,
+                          limit: int = 20) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        并发搜索多个关键词，在途请求数由信号量限制
+        
+        Args:
+            queries (List[str]): 搜索关键词列表
+            max_pages (int, optional): 每个关键词的最大爬取页数. Defaults to 10.
+            limit (int, optional): 每页返回数量限制. Defaults to 20.
+        
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: 关键词到搜索结果列表的映射
+        """
+        results = await asyncio.gather(
+            *(self.search_content(query, max_pages=max_pages, limit=limit) for query in queries)
+        )
+        return dict(zip(queries, results))
+    
+    async def close(self):
+        """
+        关闭session和解析池
+        """
+        self._shutdown_parse_executor()
+        await super().close()
+
+
+def run_search_many(queries: List[str], max_pages: int = 10,
+                    limit: int = 20) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    同步入口：创建事件循环并发搜索多个关键词
+    
+    Args:
+        queries (List[str]): 搜索关键词列表
+        max_pages (int, optional): 每个关键词的最大爬取页数. Defaults to 10.
+        limit (int, optional): 每页返回数量限制. Defaults to 20.
+    
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: 关键词到搜索结果列表的映射
+    """
+    async def _run():
+        async with AsyncZhihuCrawler() as crawler:
+            return await crawler.search_many(queries, max_pages=max_pages, limit=limit)
+    
+    return asyncio.run(_run())
+
+
+def run_question_answers(question_ids: List[str], limit: int = 20, max_pages: int = 1) -> List[Dict[str, Any]]:
+    """
+    同步入口：创建事件循环并发爬取多个问题的回答
+    
+    Args:
+        question_ids (List[str]): 问题ID列表
+        limit (int, optional): 每页回答数量. Defaults to 20.
+        max_pages (int, optional): 每个问题最多爬取的页数. Defaults to 1.
+    
+    Returns:
+        List[Dict[str, Any]]: 所有问题的回答列表
+    """
+    async def _run():
+        async with AsyncZhihuCrawler() as crawler:
+            return await crawler.get_answers_for_questions(question_ids, limit=limit, max_pages=max_pages)
+    
+    return asyncio.run(_run())
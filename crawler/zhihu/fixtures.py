@@ -0,0 +1,211 @@
+"""
+知乎合成测试数据模块，生成规模可调的热门列表HTML、search_v3与回答列表JSON，用于离线基准测试
+"""
+import random
+from typing import Any, Dict, Optional
+
+# 构造正文时循环使用的句子，覆盖中英文、实体和常见内联标签
+_SENTENCES = [
+    '如何系统地学习<em>Python</em>编程？',
+    '这是一个关于效率&amp;质量的讨论，&nbsp;值得细看。',
+    'Reading <b>English</b> articles every day helps a lot.',
+    '第一步是打好基础，<a href="https://www.zhihu.com/question/1?a=1&amp;b=2" class="internal  link">点击查看</a>更多内容。',
+    '<code>for i in range(10): print(i)</code> 这样的代码很常见。',
+    '保持耐心，&lt;坚持&gt;比天赋更重要。<br/>',
+]
+
+
+def _paragraphs(rng: random.Random, size: int) -> str:
+    """
+    生成约size个字符的HTML正文
+    
+    Args:
+        rng (random.Random): 随机数生成器
+        size (int): 目标字符数
+    
+    Returns:
+        str: HTML正文
+    """
+    parts = []
+    length = 0
+    while length < size:
+        sentences = ''.join(rng.choice(_SENTENCES) for _ in range(rng.randint(2, 5)))
+        block = rng.choice([
+            f'<p>{sentences}</p>',
+            f'<p data-pid="{rng.randint(1, 99999)}">{sentences}</p>',
+            f'<blockquote>{sentences}</blockquote>',
+            f'<ul><li>{sentences}</li><li>{rng.choice(_SENTENCES)}</li></ul>',
+            f'<figure><img src="https://pic.zhimg.com/{rng.randint(1, 99999)}.jpg" '
+            f'data-size="normal"/><figcaption>{rng.choice(_SENTENCES)}</figcaption></figure>',
+        ])
+        parts.append(block)
+        length += len(block)
+    return '\n'.join(parts)
+
+
+def build_hot_list_html(item_count: int = 50, seed: int = 0) -> str:
+    """
+    生成包含item_count个HotItem的热门列表页面
+    
+    Args:
+        item_count (int, optional): 热门条目数量. Defaults to 50.
+        seed (int, optional): 随机种子. Defaults to 0.
+    
+    Returns:
+        str: 热门列表页面HTML
+    """
+    rng = random.Random(seed)
+    items = []
+    for rank in range(1, item_count + 1):
+        question_id = 100000000 + rank
+        excerpt = rng.choice(_SENTENCES) + rng.choice(_SENTENCES)
+        items.append(
+            f'<section class="HotItem" tabindex="0">'
+            f'<div class="HotItem-index"><div class="HotItem-rank HotItem-hot">{rank}</div></div>'
+            f'<div class="HotItem-content">'
+            f'<h2 class="HotItem-title">'
+            f'<a href="https://www.zhihu.com/question/{question_id}?utm_source=hot" title="问题{rank}">'
+            f'热门问题 {rank}：{rng.choice(_SENTENCES)}</a></h2>'
+            f'<p class="HotItem-excerpt">{excerpt}</p>'
+            f'<div class="HotItem-metrics HotItem-metrics--bottom">'
+            f'<!-- metrics -->{rng.randint(100, 9999)} 万热度<span class="HotItem-share">分享</span>'
+            f'</div></div>'
+            f'<a class="HotItem-img" href="https://www.zhihu.com/question/{question_id}">'
+            f'<img src="https://pic.zhimg.com/{question_id}.jpg" alt="{rank}"></a>'
+            f'</section>'
+        )
+    
+    return (
+        '<!DOCTYPE html><html lang="zh"><head><meta charset="utf-8"><title>知乎热榜</title>'
+        '<script>window.__INITIAL_STATE__ = {"hot": true};</script>'
+        '<style>.HotItem{display:flex}</style></head>'
+        '<body><div id="root"><main><div class="HotList-list">'
+        + ''.join(items) +
+        '</div></main></div></body></html>'
+    )
+
+
+def build_search_page(query: str = 'python', offset: int = 0, limit: int = 20,
+                      content_size: int = 2000, total: int = 200, seed: Optional[int] = None,
+                      next_base_url: str = 'https://www.zhihu.com') -> Dict[str, Any]:
+    """
+    生成一页search_v3响应数据
+    
+    Args:
+        query (str, optional): 搜索关键词. Defaults to 'python'.
+        offset (int, optional): 偏移量. Defaults to 0.
+        limit (int, optional): 每页条目数. Defaults to 20.
+        content_size (int, optional): 每条回答正文的近似字符数. Defaults to 2000.
+        total (int, optional): 结果总数，决定is_end. Defaults to 200.
+        seed (Optional[int], optional): 随机种子，默认按偏移量生成以保证分页稳定. Defaults to None.
+        next_base_url (str, optional): paging.next使用的基础URL. Defaults to 'https://www.zhihu.com'.
+    
+    Returns:
+        Dict[str, Any]: search_v3格式的响应数据
+    """
+    rng = random.Random(offset if seed is None else seed)
+    data = []
+    end = min(offset + limit, total)
+    # 按创建时间倒序，与sort=created_time的线上行为一致
+    base_time = 1700000000
+    for index in range(offset, end):
+        answer_id = 2000000000 + total - index
+        question_id = 100000000 + (index % 997)
+        data.append({
+            'type': 'search_result',
+            'highlight': {'title': f'<em>{query}</em>'},
+            'object': {
+                'id': str(answer_id),
+                'type': 'answer',
+                'title': f'关于<em>{query}</em>的问题 {index}：{rng.choice(_SENTENCES)}',
+                'content': _paragraphs(rng, content_size),
+                'excerpt': rng.choice(_SENTENCES),
+                'url': f'https://api.zhihu.com/answers/{answer_id}',
+                'question': {
+                    'id': str(question_id),
+                    'url': f'https://api.zhihu.com/questions/{question_id}',
+                    'name': f'关于{query}的问题 {index}',
+                },
+                'author': {
+                    'id': f'author-{index % 50}',
+                    'name': f'作者{index % 50}',
+                    'headline': rng.choice(_SENTENCES),
+                },
+                'voteup_count': rng.randint(0, 50000),
+                'comment_count': rng.randint(0, 2000),
+                'created_time': base_time - index * 60,
+                'updated_time': base_time - index * 30,
+                'thumbnail_info': {'count': 1, 'type': 'thumbnail_info'},
+            },
+        })
+    
+    # 穿插非search_result条目，与线上响应结构一致
+    if data:
+        data.insert(len(data) // 2, {'type': 'relevant_query', 'query_list': [{'query': query}]})
+    
+    is_end = end >= total
+    return {
+        'data': data,
+        'paging': {
+            'is_end': is_end,
+            'next': None if is_end else
+            f'{next_base_url}/api/v4/search_v3?q={query}&offset={end}&limit={limit}&sort=created_time',
+        },
+    }
+
+
+def build_answers_page(question_id: str = '100000001', offset: int = 0, limit: int = 20,
+                       content_size: int = 2000, total: int = 60,
+                       next_base_url: str = 'https://www.zhihu.com') -> Dict[str, Any]:
+    """
+    生成一页问题回答列表API（/api/v4/questions/{id}/answers）响应数据
+    
+    Args:
+        question_id (str, optional): 问题ID. Defaults to '100000001'.
+        offset (int, optional): 偏移量. Defaults to 0.
+        limit (int, optional): 每页回答数量. Defaults to 20.
+        content_size (int, optional): 每条回答正文的近似字符数. Defaults to 2000.
+        total (int, optional): 回答总数，决定is_end. Defaults to 60.
+        next_base_url (str, optional): paging.next使用的基础URL. Defaults to 'https://www.zhihu.com'.
+    
+    Returns:
+        Dict[str, Any]: 回答列表API格式的响应数据
+    """
+    rng = random.Random(f'{question_id}-{offset}')
+    data = []
+    end = min(offset + limit, total)
+    for index in range(offset, end):
+        answer_id = int(question_id) * 1000 + index
+        data.append({
+            'id': answer_id,
+            'type': 'answer',
+            'url': f'https://api.zhihu.com/answers/{answer_id}',
+            'question': {
+                'id': int(question_id),
+                'type': 'question',
+                'title': f'问题 {question_id}：{rng.choice(_SENTENCES)}',
+                'url': f'https://api.zhihu.com/questions/{question_id}',
+            },
+            'author': {
+                'id': f'author-{index % 50}',
+                'name': f'作者{index % 50}',
+                'headline': rng.choice(_SENTENCES),
+            },
+            'content': _paragraphs(rng, content_size),
+            'excerpt': rng.choice(_SENTENCES),
+            'voteup_count': rng.randint(0, 50000),
+            'comment_count': rng.randint(0, 2000),
+            'created_time': 1700000000 - index * 600,
+            'updated_time': 1700000000 - index * 300,
+        })
+    
+    is_end = end >= total
+    return {
+        'data': data,
+        'paging': {
+            'is_end': is_end,
+            'totals': total,
+            'next': None if is_end else
+            f'{next_base_url}/api/v4/questions/{question_id}/answers?offset={end}&limit={limit}&sort_by=default',
+        },
+    }
@@ -0,0 +1,444 @@
+"""
+HTML解析后端模块，提供可插拔的热门列表与搜索结果HTML解析实现
+
+默认使用lxml原生后端（预编译XPath，直接提取文本），BeautifulSoup后端作为兼容回退，
+两者输出的字典字段与内容保持一致
+"""
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from bs4 import BeautifulSoup
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    etree = None
+    LXML_AVAILABLE = False
+
+# 连续空白字符
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _normalize_whitespace(text: str) -> str:
+    """
+    合并连续空白字符并去除首尾空白
+    
+    Args:
+        text (str): 原始文本
+    
+    Returns:
+        str: 处理后的文本
+    """
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def _is_plain_text(html_content: str) -> bool:
+    """
+    判断内容是否为不含标签和实体的纯文本，纯文本无需构建解析树
+    
+    Args:
+        html_content (str): 待判断的内容
+    
+    Returns:
+        bool: 是否为纯文本
+    """
+    return '<' not in html_content and '&' not in html_content
+
+
+class HtmlBackend:
+    """
+    HTML解析后端基类
+    """
+    
+    name = ''
+    
+    def clean_html(self, html_content: str) -> str:
+        """
+        清理HTML标签，提取以空格分隔的纯文本
+        
+        Args:
+            html_content (str): 包含HTML标签的内容
+        
+        Returns:
+            str: 清理后的纯文本内容
+        """
+        raise NotImplementedError
+    
+    def find_hot_items(self, html: str, limit: int) -> List[Any]:
+        """
+        从热门问题页面中查找热门条目
+        
+        Args:
+            html (str): 热门问题页面HTML
+            limit (int): 返回的条目数量限制
+        
+        Returns:
+            List[Any]: 后端相关的条目节点列表
+        """
+        raise NotImplementedError
+    
+    def parse_hot_item(self, item: Any) -> Dict[str, Any]:
+        """
+        解析单个热门问题条目
+        
+        Args:
+            item (Any): find_hot_items返回的条目节点
+        
+        Returns:
+            Dict[str, Any]: 解析后的问题信息，包含原始HTML和清理后的文本
+        """
+        raise NotImplementedError
+    
+    def item_to_html(self, item: Any) -> str:
+        """
+        将条目节点序列化为HTML片段，用于跨进程传递
+        
+        Args:
+            item (Any): 条目节点
+        
+        Returns:
+            str: HTML片段
+        """
+        raise NotImplementedError
+    
+    def parse_hot_item_html(self, item_html: str) -> Dict[str, Any]:
+        """
+        解析单个热门问题条目的HTML片段
+        
+        Args:
+            item_html (str): 条目HTML片段
+        
+        Returns:
+            Dict[str, Any]: 解析后的问题信息
+        """
+        items = self.find_hot_items(item_html, 1)
+        if not items:
+            return {}
+        return self.parse_hot_item(items[0])
+
+
+class BeautifulSoupBackend(HtmlBackend):
+    """
+    BeautifulSoup解析后端，兼容性最好，作为lxml后端的回退
+    """
+    
+    name = 'bs4'
+    
+    def clean_html(self, html_content: str) -> str:
+        if not html_content:
+            return ""
+        
+        if _is_plain_text(html_content):
+            return _normalize_whitespace(html_content)
+        
+        soup = BeautifulSoup(html_content, 'lxml')
+        return _normalize_whitespace(soup.get_text(separator=' ', strip=True))
+    
+    def find_hot_items(self, html: str, limit: int) -> List[Any]:
+        soup = BeautifulSoup(html, 'lxml')
+        return soup.find_all('section', class_='HotItem', limit=limit)
+    
+    def parse_hot_item(self, item: Any) -> Dict[str, Any]:
+        question = {}
+        
+        # 排名
+        rank_tag = item.find('div', class_='HotItem-rank')
+        rank_text = rank_tag.text.strip() if rank_tag else '0'
+        question['rank'] = int(rank_text)
+        question['rank_raw'] = str(rank_tag) if rank_tag else ''
+        
+        # 问题链接和标题
+        title_tag = item.find('h2', class_='HotItem-title')
+        if title_tag and title_tag.a:
+            title_text = title_tag.a.text.strip()
+            question['title'] = title_text
+            question['title_raw'] = str(title_tag.a)
+            question['url'] = title_tag.a['href']
+            
+            # 提取问题ID
+            question_id = question['url'].split('/')[-1].split('?')[0]
+            question['question_id'] = question_id
+        
+        # 热度
+        metrics_tag = item.find('div', class_='HotItem-metrics')
+        if metrics_tag:
+            metrics_text = metrics_tag.text.strip()
+            question['metrics'] = metrics_text
+            question['metrics_raw'] = str(metrics_tag)
+        
+        # 问题描述
+        excerpt_tag = item.find('p', class_='HotItem-excerpt')
+        if excerpt_tag:
+            excerpt_text = excerpt_tag.text.strip()
+            question['excerpt'] = excerpt_text
+            question['excerpt_raw'] = str(excerpt_tag)
+        
+        # 标记爬取时间（使用datetime对象）
+        question['crawl_time'] = datetime.now()
+        
+        return question
+    
+    def item_to_html(self, item: Any) -> str:
+        return str(item)
+
+
+def _class_xpath(tag: str, class_name: str, prefix: str = './/') -> str:
+    """
+    构建按class匹配元素的XPath表达式，语义与BeautifulSoup的class_参数一致
+    
+    Args:
+        tag (str): 标签名
+        class_name (str): class名称
+        prefix (str, optional): 路径前缀. Defaults to './/'.
+    
+    Returns:
+        str: XPath表达式
+    """
+    return f"{prefix}{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+
+
+# BeautifulSoup提取文本时跳过的标签内容（script/style/template、ruby注音rt及其括号rp，含其中嵌套的元素）和注释
+_TEXT_NODES_XPATH = ('.//text()[not(ancestor::script or ancestor::style or ancestor::template'
+                     ' or ancestor::rt or ancestor::rp)]')
+
+# BeautifulSoup输出为自闭合形式的空元素
+_VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem',
+    'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound', 'command', 'frame',
+    'image', 'isindex', 'nextid', 'spacer'
+])
+
+# BeautifulSoup视为多值属性、输出时以单个空格连接的属性
+_MULTI_VALUED_ATTRIBUTES = frozenset([
+    'class', 'rel', 'rev', 'accept-charset', 'headers', 'accesskey', 'dropzone'
+])
+
+# 内容按原样输出、不做实体转义的标签
+_RAW_TEXT_ELEMENTS = frozenset(['script', 'style'])
+
+
+def _escape_text(text: str) -> str:
+    """
+    按BeautifulSoup的minimal格式转义文本
+    
+    Args:
+        text (str): 原始文本
+    
+    Returns:
+        str: 转义后的文本
+    """
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _format_attribute(name: str, value: str) -> str:
+    """
+    按BeautifulSoup的规则格式化属性
+    
+    Args:
+        name (str): 属性名
+        value (str): 属性值
+    
+    Returns:
+        str: 格式化后的属性字符串
+    """
+    if name in _MULTI_VALUED_ATTRIBUTES:
+        value = ' '.join(value.split())
+    value = _escape_text(value)
+    if '"' in value:
+        if "'" in value:
+            value = value.replace('"', '&quot;')
+        else:
+            return f"{name}='{value}'"
+    return f'{name}="{value}"'
+
+
+class LxmlBackend(HtmlBackend):
+    """
+    lxml原生解析后端，使用预编译XPath定位元素并直接提取文本，避免构建BeautifulSoup树
+    """
+    
+    name = 'lxml'
+    
+    def __init__(self):
+        self._parser = etree.HTMLParser()
+        self._text_nodes = etree.XPath(_TEXT_NODES_XPATH, smart_strings=False)
+        self._hot_items = etree.XPath(_class_xpath('section', 'HotItem', '//'))
+        self._rank = etree.XPath(_class_xpath('div', 'HotItem-rank'))
+        self._title = etree.XPath(_class_xpath('h2', 'HotItem-title'))
+        self._link = etree.XPath('.//a')
+        self._metrics = etree.XPath(_class_xpath('div', 'HotItem-metrics'))
+        self._excerpt = etree.XPath(_class_xpath('p', 'HotItem-excerpt'))
+    
+    def _parse(self, html: str):
+        """
+        将HTML解析为lxml文档根节点
+        
+        Args:
+            html (str): HTML内容
+        
+        Returns:
+            lxml元素，空文档时返回None
+        """
+        return etree.fromstring(html, self._parser)
+    
+    def _text(self, element) -> str:
+        """
+        提取元素的全部文本，等价于BeautifulSoup的Tag.text
+        
+        Args:
+            element: lxml元素
+        
+        Returns:
+            str: 文本内容
+        """
+        return ''.join(self._text_nodes(element))
+    
+    def _serialize(self, element, parts: List[str]):
+        """
+        以与BeautifulSoup相同的格式序列化元素（不含尾随文本）
+        
+        Args:
+            element: lxml元素
+            parts (List[str]): 输出片段列表
+        """
+        tag = element.tag
+        if not isinstance(tag, str):
+            # 注释和处理指令
+            if tag is etree.Comment:
+                parts.append(f'<!--{element.text or ""}-->')
+            return
+        
+        # BeautifulSoup默认按属性名排序输出
+        attrs = ''.join(' ' + _format_attribute(k, v) for k, v in sorted(element.attrib.items()))
+        if tag in _VOID_ELEMENTS and not len(element) and not element.text:
+            parts.append(f'<{tag}{attrs}/>')
+            return
+        
+        parts.append(f'<{tag}{attrs}>')
+        raw = tag in _RAW_TEXT_ELEMENTS
+        if element.text:
+            parts.append(element.text if raw else _escape_text(element.text))
+        for child in element:
+            self._serialize(child, parts)
+            if child.tail:
+                parts.append(_escape_text(child.tail))
+        parts.append(f'</{tag}>')
+    
+    def _outer_html(self, element) -> str:
+        """
+        序列化元素，等价于BeautifulSoup的str(tag)
+        
+        Args:
+            element: lxml元素
+        
+        Returns:
+            str: 元素的HTML
+        """
+        parts = []
+        self._serialize(element, parts)
+        return ''.join(parts)
+    
+    def clean_html(self, html_content: str) -> str:
+        if not html_content:
+            return ""
+        
+        if _is_plain_text(html_content):
+            return _normalize_whitespace(html_content)
+        
+        root = self._parse(html_content)
+        if root is None:
+            return ""
+        
+        texts = [text.strip() for text in self._text_nodes(root)]
+        return _normalize_whitespace(' '.join(text for text in texts if text))
+    
+    def find_hot_items(self, html: str, limit: int) -> List[Any]:
+        root = self._parse(html)
+        if root is None:
+            return []
+        return self._hot_items(root)[:limit]
+    
+    def parse_hot_item(self, item: Any) -> Dict[str, Any]:
+        question = {}
+        
+        # 排名
+        rank_tags = self._rank(item)
+        rank_tag = rank_tags[0] if rank_tags else None
+        rank_text = self._text(rank_tag).strip() if rank_tag is not None else '0'
+        question['rank'] = int(rank_text)
+        question['rank_raw'] = self._outer_html(rank_tag) if rank_tag is not None else ''
+        
+        # 问题链接和标题
+        title_tags = self._title(item)
+        links = self._link(title_tags[0]) if title_tags else []
+        if links:
+            link = links[0]
+            question['title'] = self._text(link).strip()
+            question['title_raw'] = self._outer_html(link)
+            href = link.get('href')
+            if href is None:
+                raise KeyError('href')
+            question['url'] = href
+            
+            # 提取问题ID
+            question['question_id'] = href.split('/')[-1].split('?')[0]
+        
+        # 热度
+        metrics_tags = self._metrics(item)
+        if metrics_tags:
+            question['metrics'] = self._text(metrics_tags[0]).strip()
+            question['metrics_raw'] = self._outer_html(metrics_tags[0])
+        
+        # 问题描述
+        excerpt_tags = self._excerpt(item)
+        if excerpt_tags:
+            question['excerpt'] = self._text(excerpt_tags[0]).strip()
+            question['excerpt_raw'] = self._outer_html(excerpt_tags[0])
+        
+        # 标记爬取时间（使用datetime对象）
+        question['crawl_time'] = datetime.now()
+        
+        return question
+    
+    def item_to_html(self, item: Any) -> str:
+        return self._outer_html(item)
+
+
+# 已创建的后端实例，lxml解析器与XPath对象不宜跨线程共享，按线程缓存
+_local = threading.local()
+
+
+def get_html_backend(name: Optional[str] = None) -> HtmlBackend:
+    """
+    按名称获取HTML解析后端，lxml不可用时回退到BeautifulSoup
+    
+    Args:
+        name (Optional[str], optional): 后端名称，"lxml"或"bs4". Defaults to None（使用lxml）.
+    
+    Returns:
+        HtmlBackend: 解析后端实例
+    """
+    name = name or 'lxml'
+    if name == 'lxml' and not LXML_AVAILABLE:
+        logger.warning("lxml不可用，回退到BeautifulSoup解析后端")
+        name = 'bs4'
+    
+    backends = getattr(_local, 'backends', None)
+    if backends is None:
+        backends = _local.backends = {}
+    
+    backend = backends.get(name)
+    if backend is None:
+        if name == 'lxml':
+            backend = LxmlBackend()
+        elif name == 'bs4':
+            backend = BeautifulSoupBackend()
+        else:
+            raise ValueError(f"不支持的解析后端: {name}")
+        backends[name] = backend
+    return backend
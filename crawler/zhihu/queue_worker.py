@@ -0,0 +1,234 @@
+"""
+知乎搜索队列工作进程：从工作队列领取关键词，按租约执行增量搜索并把结果写回队列
+
+每个条目先创建（或沿用）一个搜索任务并把任务ID记到条目上，再通过resume_search执行，每次领取最多爬取max_pages页；
+搜索任务因达到max_pages暂停时条目放回队列，下一次领取从该搜索任务的分页游标继续，直到任务完成；
+工作进程中途退出时，条目在租约到期后被其他工作进程领取，同样从分页游标继续。
+执行期间由后台线程按租约时长的三分之一定期续租。限速配置按进程生效，N个工作进程的总请求速率为N倍
+
+用法:
+    uv run python -m crawler.zhihu.queue_worker enqueue Python 机器学习 --max-pages 10
+    uv run python -m crawler.zhihu.queue_worker work --workers 4
+    uv run python -m crawler.zhihu.queue_worker status
+"""
+import argparse
+import multiprocessing
+import threading
+import time
+from typing import Any, Dict, Optional
+from data.work_queue import WorkQueue, default_worker_id
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class _LeaseKeeper(threading.Thread):
+    """
+    后台续租线程，条目执行期间定期延长租约
+    """
+    
+    def __init__(self, queue: WorkQueue, item: Dict[str, Any], interval: float):
+        """
+        初始化续租线程
+        
+        Args:
+            queue (WorkQueue): 工作队列
+            item (Dict[str, Any]): 领取到的条目
+            interval (float): 续租间隔（秒）
+        """
+        super().__init__(daemon=True)
+        self.queue = queue
+        self.item = item
+        self.interval = interval
+        self.lost = False
+        self._stopped = threading.Event()
+    
+    def run(self):
+        """
+        定期续租，租约已被其他工作进程接管时停止
+        """
+        while not self._stopped.wait(self.interval):
+            if not self.queue.heartbeat(self.item['id'], self.item['lease_token']):
+                self.lost = True
+                logger.warning(f"条目 {self.item['id']} 的租约已失效，关键词: {self.item['keyword']}")
+                return
+    
+    def stop(self):
+        """
+        停止续租
+        """
+        self._stopped.set()
+
+
+def process_item(queue: WorkQueue, item: Dict[str, Any], crawler, storage) -> Dict[str, Any]:
+    """
+    执行一个队列条目：创建或沿用搜索任务，从任务的分页游标处继续搜索最多max_pages页，
+    任务完成时标记条目完成，暂停时放回队列等待下一次领取继续
+    
+    Args:
+        queue (WorkQueue): 工作队列
+        item (Dict[str, Any]): 领取到的条目
+        crawler (ZhihuCrawler): 知乎爬虫
+        storage (DataStorage): 数据存储实例
+    
+    Returns:
+        Dict[str, Any]: 搜索统计信息（与search_incremental一致），出错时status为failed并带有error
+    """
+    payload = item['payload']
+    max_pages = payload.get('max_pages', 10)
+    limit = payload.get('limit', 20)
+    keeper = _LeaseKeeper(queue, item, max(1.0, queue.visibility_timeout / 3))
+    keeper.start()
+    try:
+        search_task_id = item['search_task_id']
+        pages_done = 0
+        if not search_task_id:
+            search_task_id = storage.save_search_task(keyword=item['keyword'], status='running')
+            if not search_task_id or not queue.heartbeat(item['id'], item['lease_token'],
+                                                         search_task_id=search_task_id):
+                raise RuntimeError('无法创建搜索任务或租约已失效')
+        else:
+            search_task = storage.get_search_task(search_task_id)
+            pages_done = (search_task.page_index or 0) if search_task else 0
+            logger.info(f"条目 {item['id']} 从搜索任务 {search_task_id} 的第 {pages_done + 1} 页继续，"
+                        f"关键词: {item['keyword']}")
+        
+        # resume_search的max_pages包含已完成的页，每次领取在已完成的页之后再爬max_pages页
+        summary = crawler.resume_search(search_task_id, max_pages=pages_done + max_pages, limit=limit,
+                                        storage=storage)
+        if summary['status'] == 'completed':
+            queue.complete(item['id'], item['lease_token'], summary)
+        elif summary['status'] == 'paused':
+            # 还有未爬取的较旧页面，放回队列由下一次领取继续，不能标记完成
+            queue.requeue(item['id'], item['lease_token'], summary)
+        else:
+            queue.fail(item['id'], item['lease_token'], f"搜索任务状态: {summary['status']}")
+        return summary
+    except Exception as e:
+        logger.error(f"执行条目 {item['id']} 失败，关键词: {item['keyword']}，错误: {str(e)}")
+        queue.fail(item['id'], item['lease_token'], str(e))
+        return {'search_task_id': item['search_task_id'] or 0, 'status': 'failed', 'page_count': 0,
+                'new_results': 0, 'saved_count': 0, 'error': str(e)}
+    finally:
+        keeper.stop()
+
+
+def run_worker(worker_id: Optional[str] = None, queue_name: str = 'search', max_items: Optional[int] = None,
+               exit_when_empty: bool = True, db_url: Optional[str] = None) -> Dict[str, int]:
+    """
+    运行一个工作进程：循环领取并执行条目，直到队列为空（或达到max_items）
+    
+    Args:
+        worker_id (Optional[str], optional): 工作进程标识，默认为主机名加进程ID. Defaults to None.
+        queue_name (str, optional): 队列名称. Defaults to 'search'.
+        max_items (Optional[int], optional): 最多执行的条目数，None表示不限. Defaults to None.
+        exit_when_empty (bool, optional): 队列为空时退出，False时按POLL_INTERVAL轮询等待新条目. Defaults to True.
+        db_url (Optional[str], optional): 队列数据库连接URL. Defaults to None.
+    
+    Returns:
+        Dict[str, int]: 统计信息，包含items、completed、paused、failed、new_results和saved_count
+    """
+    # 在工作进程内创建爬虫和存储，数据库引擎与HTTP连接不跨进程共享
+    from crawler.zhihu.zhihu_crawler import ZhihuCrawler
+    from data.storage import data_storage
+    
+    worker_id = worker_id or default_worker_id()
+    queue = WorkQueue(db_url)
+    crawler = ZhihuCrawler()
+    stats = {'items': 0, 'completed': 0, 'paused': 0, 'failed': 0, 'new_results': 0, 'saved_count': 0}
+    try:
+        while max_items is None or stats['items'] < max_items:
+            items = queue.lease(worker_id, queue=queue_name)
+            if not items:
+                if exit_when_empty:
+                    break
+                time.sleep(queue.config['POLL_INTERVAL'])
+                continue
+            
+            summary = process_item(queue, items[0], crawler, data_storage)
+            stats['items'] += 1
+            stats[summary['status'] if summary['status'] in ('completed', 'paused') else 'failed'] += 1
+            stats['new_results'] += summary['new_results']
+            stats['saved_count'] += summary['saved_count']
+    finally:
+        crawler.close()
+    
+    logger.info(f"工作进程 {worker_id} 退出: 执行 {stats['items']} 个条目，完成 {stats['completed']} 个，"
+                f"暂停 {stats['paused']} 个，失败 {stats['failed']} 个，新结果 {stats['new_results']} 条，保存 {stats['saved_count']} 条")
+    return stats
+
+
+def run_workers(num_workers: int, queue_name: str = 'search', exit_when_empty: bool = True,
+                db_url: Optional[str] = None) -> int:
+    """
+    启动多个工作进程并等待全部退出
+    
+    Args:
+        num_workers (int): 工作进程数
+        queue_name (str, optional): 队列名称. Defaults to 'search'.
+        exit_when_empty (bool, optional): 队列为空时退出. Defaults to True.
+        db_url (Optional[str], optional): 队列数据库连接URL. Defaults to None.
+    
+    Returns:
+        int: 异常退出的工作进程数
+    """
+    # spawn启动，避免子进程继承父进程已打开的SQLite连接
+    context = multiprocessing.get_context('spawn')
+    processes = [
+        context.Process(target=run_worker, kwargs={'queue_name': queue_name, 'exit_when_empty': exit_when_empty,
+                                                   'db_url': db_url},
+                        name=f"queue-worker-{index}")
+        for index in range(num_workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return sum(1 for process in processes if process.exitcode != 0)
+
+
+def main():
+    """
+    工作队列命令行：入队、启动工作进程、查看状态
+    """
+    parser = argparse.ArgumentParser(description='知乎搜索工作队列')
+    parser.add_argument('--db-url', default=None, help='队列数据库连接URL，默认使用WORK_QUEUE配置')
+    parser.add_argument('--queue', default='search', help='队列名称')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    enqueue_parser = subparsers.add_parser('enqueue', help='添加关键词')
+    enqueue_parser.add_argument('keywords', nargs='*', help='搜索关键词')
+    enqueue_parser.add_argument('--file', help='关键词文件，每行一个')
+    enqueue_parser.add_argument('--max-pages', type=int, default=10, help='每次领取最多爬取的页数，未爬完的关键词放回队列继续')
+    enqueue_parser.add_argument('--limit', type=int, default=20, help='每页返回数量')
+    
+    work_parser = subparsers.add_parser('work', help='启动工作进程')
+    work_parser.add_argument('--workers', type=int, default=None, help='工作进程数，默认使用WORK_QUEUE配置')
+    work_parser.add_argument('--forever', action='store_true', help='队列为空时继续轮询等待新条目')
+    
+    subparsers.add_parser('status', help='查看各状态的条目数')
+    args = parser.parse_args()
+    
+    queue = WorkQueue(args.db_url)
+    if args.command == 'enqueue':
+        keywords = list(args.keywords)
+        if args.file:
+            with open(args.file, encoding='utf-8') as f:
+                keywords.extend(line.strip() for line in f)
+        count = queue.enqueue(keywords, queue=args.queue, payload={'max_pages': args.max_pages, 'limit': args.limit})
+        print(f"新增 {count} 个条目，队列状态: {queue.stats(args.queue)}")
+    elif args.command == 'work':
+        num_workers = args.workers or queue.config['WORKERS']
+        exit_when_empty = not args.forever
+        if num_workers == 1:
+            run_worker(queue_name=args.queue, exit_when_empty=exit_when_empty, db_url=args.db_url)
+        else:
+            run_workers(num_workers, queue_name=args.queue, exit_when_empty=exit_when_empty, db_url=args.db_url)
+        print(f"队列状态: {queue.stats(args.queue)}")
+    else:
+        queue.requeue_expired(args.queue)
+        print(f"队列状态: {queue.stats(args.queue)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+知乎本地替身服务器，基于合成测试数据提供热门列表、search_v3、回答列表和回答详情接口，
+配合传输层的stub模式在无网络环境下运行和压测爬虫
+
+用法:
+    uv run python -m crawler.zhihu.stub_server --port 8765 --latency 0.05
+"""
+import argparse
+import gzip
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+from urllib.parse import parse_qs, urlparse
+from crawler.zhihu.fixtures import build_answers_page, build_hot_list_html, build_search_page
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_ANSWERS_PATH = re.compile(r'^/api/v4/questions/(\d+)/answers$')
+_ANSWER_DETAIL_PATH = re.compile(r'^/api/v4/answers/(\d+)$')
+
+
+class ZhihuStubServer(ThreadingHTTPServer):
+    """
+    知乎替身服务器，生成数据的规模和每个请求的延迟可配置
+    """
+    
+    daemon_threads = True
+    
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765, latency: float = 0.0,
+                 hot_items: int = 50, search_total: int = 200, answers_total: int = 60,
+                 content_size: int = 2000, max_rps: float = 0.0, compress: bool = False):
+        """
+        初始化替身服务器
+        
+        Args:
+            host (str, optional): 监听地址. Defaults to '127.0.0.1'.
+            port (int, optional): 监听端口，0表示随机端口. Defaults to 8765.
+            latency (float, optional): 每个请求的模拟延迟（秒）. Defaults to 0.0.
+            hot_items (int, optional): 热门列表条目数. Defaults to 50.
+            search_total (int, optional): 每个关键词的搜索结果总数. Defaults to 200.
+            answers_total (int, optional): 每个问题的回答总数. Defaults to 60.
+            content_size (int, optional): 每条回答正文的近似字符数. Defaults to 2000.
+            max_rps (float, optional): 每秒允许的请求数，超出时返回429和Retry-After，0表示不限. Defaults to 0.0.
+            compress (bool, optional): 客户端接受gzip时是否压缩响应正文. Defaults to False.
+        """
+        super().__init__((host, port), _StubRequestHandler)
+        self.latency = latency
+        self.hot_items = hot_items
+        self.search_total = search_total
+        self.answers_total = answers_total
+        self.content_size = content_size
+        self.max_rps = max_rps
+        self.compress = compress
+        self._window_start = 0.0
+        self._window_count = 0
+        self._window_lock = threading.Lock()
+        # 热门列表HTML只生成一次
+        self.hot_list_html = build_hot_list_html(hot_items).encode('utf-8')
+    
+    @property
+    def base_url(self) -> str:
+        """
+        替身服务器的基础URL
+        
+        Returns:
+            str: 如 http://127.0.0.1:8765
+        """
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def over_limit(self) -> bool:
+        """
+        按1秒固定窗口判断当前请求是否超出max_rps
+        
+        Returns:
+            bool: 是否应返回429
+        """
+        if self.max_rps <= 0:
+            return False
+        with self._window_lock:
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start, self._window_count = now, 0
+            self._window_count += 1
+            return self._window_count > self.max_rps
+    
+    def start_background(self) -> 'ZhihuStubServer':
+        """
+        在后台线程中启动服务器
+        
+        Returns:
+            ZhihuStubServer: 服务器自身，便于链式调用
+        """
+        threading.Thread(target=self.serve_forever, name='zhihu-stub-server', daemon=True).start()
+        logger.info(f"知乎替身服务器已启动: {self.base_url}")
+        return self
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    """
+    替身服务器的请求处理器
+    """
+    
+    server: ZhihuStubServer
+    # 使用HTTP/1.1保持长连接，与真实服务器的keep-alive行为一致
+    protocol_version = 'HTTP/1.1'
+    
+    def log_message(self, format, *args):
+        logger.debug(f"替身服务器: {format % args}")
+    
+    def _send(self, status: int, body: bytes, content_type: str, headers: Dict[str, str] = None):
+        """
+        发送响应
+        
+        Args:
+            status (int): 状态码
+            body (bytes): 响应正文
+            content_type (str): Content-Type
+            headers (Dict[str, str], optional): 额外响应头. Defaults to None.
+        """
+        if self.server.compress and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=5)
+            headers = dict(headers or {}, **{'Content-Encoding': 'gzip'})
+        
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_json(self, data: Dict[str, Any], status: int = 200):
+        """
+        发送JSON响应
+        
+        Args:
+            data (Dict[str, Any]): 响应数据
+            status (int, optional): 状态码. Defaults to 200.
+        """
+        self._send(status, json.dumps(data, ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8')
+    
+    def do_GET(self):
+        if self.server.latency > 0:
+            time.sleep(self.server.latency)
+        
+        if self.server.over_limit():
+            body = json.dumps({'error': {'code': 429, 'message': '请求过于频繁'}}).encode('utf-8')
+            self._send(429, body, 'application/json; charset=utf-8', {'Retry-After': '1'})
+            return
+        
+        parsed = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        offset = int(query.get('offset', 0))
+        limit = int(query.get('limit', 20))
+        
+        if parsed.path == '/hot':
+            self._send(200, self.server.hot_list_html, 'text/html; charset=utf-8')
+            return
+        
+        if parsed.path == '/api/v4/search_v3':
+            self._send_json(build_search_page(
+                query=query.get('q', ''), offset=offset, limit=limit, content_size=self.server.content_size,
+                total=self.server.search_total, next_base_url=self.server.base_url
+            ))
+            return
+        
+        match = _ANSWERS_PATH.match(parsed.path)
+        if match:
+            self._send_json(build_answers_page(
+                question_id=match.group(1), offset=offset, limit=limit, content_size=self.server.content_size,
+                total=self.server.answers_total, next_base_url=self.server.base_url
+            ))
+            return
+        
+        match = _ANSWER_DETAIL_PATH.match(parsed.path)
+        if match:
+            # 回答ID由问题ID*1000+序号构成，与build_answers_page一致
+            answer_id = int(match.group(1))
+            page = build_answers_page(question_id=str(answer_id // 1000), offset=answer_id % 1000, limit=1,
+                                      content_size=self.server.content_size, total=answer_id % 1000 + 1)
+            self._send_json(page['data'][0])
+            return
+        
+        self._send_json({'error': {'code': 404, 'message': f'未知路径: {parsed.path}'}}, status=404)
+
+
+def main():
+    """
+    启动知乎替身服务器
+    """
+    parser = argparse.ArgumentParser(description='知乎本地替身服务器')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址')
+    parser.add_argument('--port', type=int, default=8765, help='监听端口')
+    parser.add_argument('--latency', type=float, default=0.0, help='每个请求的模拟延迟（秒）')
+    parser.add_argument('--hot-items', type=int, default=50, help='热门列表条目数')
+    parser.add_argument('--search-total', type=int, default=200, help='每个关键词的搜索结果总数')
+    parser.add_argument('--answers-total', type=int, default=60, help='每个问题的回答总数')
+    parser.add_argument('--content-size', type=int, default=2000, help='每条回答正文的近似字符数')
+    parser.add_argument('--compress', action='store_true', help='客户端接受gzip时压缩响应正文')
+    parser.add_argument('--max-rps', type=float, default=0.0, help='每秒允许的请求数，超出时返回429，0表示不限')
+    args = parser.parse_args()
+    
+    server = ZhihuStubServer(
+        host=args.host, port=args.port, latency=args.latency, hot_items=args.hot_items,
+        search_total=args.search_total, answers_total=args.answers_total, content_size=args.content_size,
+        max_rps=args.max_rps, compress=args.compress
+    )
+    logger.info(f"知乎替身服务器监听 {server.base_url}，按Ctrl+C退出")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
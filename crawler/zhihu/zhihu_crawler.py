@@ -1,18 +1,21 @@
 """
 知乎爬虫类，实现知乎数据的爬取
 """
-import time
 import json
-from datetime import datetime
-from typing import List, Dict, Any
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional
 from crawler.base_crawler import BaseCrawler
+from crawler.http_cache import get_http_cache
+from crawler.json_codec import get_json_loads
+from crawler.prefetch import prefetch
+from crawler.zhihu.zhihu_parser import ANSWER_FIELDS, ANSWER_LIST_FIELDS, SEARCH_PAGE_FIELDS, ZhihuParserMixin
+from data.seen_filter import get_seen_filter
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 
-class ZhihuCrawler(BaseCrawler):
+class ZhihuCrawler(ZhihuParserMixin, BaseCrawler):
     """
     知乎爬虫类，用于爬取知乎热门问题、回答等数据
     """
@@ -32,38 +35,31 @@ class ZhihuCrawler(BaseCrawler):
             user_agent=zhihu_config['USER_AGENT'],
             max_retries=zhihu_config['MAX_RETRIES'],
             download_delay=zhihu_config['DOWNLOAD_DELAY'],
-            cookie=zhihu_config['COOKIE']
+            cookie=zhihu_config['COOKIE'],
+            rate_limit=zhihu_config['RATE_LIMIT'],
+            rate_burst=zhihu_config['RATE_BURST'],
+            http_cache=get_http_cache(zhihu_config['HTTP_CACHE']),
+            transport=zhihu_config['TRANSPORT'],
+            concurrent_requests=zhihu_config['CONCURRENT_REQUESTS'],
+            adaptive=zhihu_config['ADAPTIVE'],
+            connection_pool=zhihu_config['CONNECTION_POOL']
         )
         
+        # 解析配置
+        self.parser_backend = zhihu_config['PARSER_BACKEND']
+        self.parse_workers = zhihu_config['PARSE_WORKERS']
+        self.parse_executor_type = zhihu_config['PARSE_EXECUTOR']
+        self.search_prefetch_depth = zhihu_config['SEARCH_PREFETCH_DEPTH']
+        # 解码函数只在初始化时解析一次，orjson不可用的回退警告不会逐页重复
+        self.json_loads = get_json_loads(zhihu_config['JSON_DECODER'])
+        self.json_projection = zhihu_config['JSON_PROJECTION']
+        # 已见ID过滤器，启用时首次创建会从数据库预热
+        self.seen_filter = get_seen_filter(zhihu_config['SEEN_FILTER'])
+        
         # 知乎热门问题URL
         self.hot_list_url = f"{self.base_url}/hot"
-    
-    def _clean_html_content(self, html_content: str) -> str:
-        """
-        清理HTML标签，提取纯文本内容
-        
-        Args:
-            html_content (str): 包含HTML标签的内容
-        
-        Returns:
-            str: 清理后的纯文本内容
-        """
-        if not html_content:
-            return ""
-        
-        try:
-            # 使用BeautifulSoup解析HTML并提取纯文本
-            soup = BeautifulSoup(html_content, 'lxml')
-            text = soup.get_text(separator=' ', strip=True)
-            
-            # 清理多余的空白字符
-            import re
-            text = re.sub(r'\s+', ' ', text).strip()
-            
-            return text
-        except Exception as e:
-            logger.error(f"清理HTML内容失败，错误: {str(e)}")
-            return html_content
+        # 知乎搜索API
+        self.search_url = f"{self.base_url}/api/v4/search_v3"
     
     def get_hot_questions(self, limit: int = 50) -> List[Dict[str, Any]]:
         """
@@ -78,30 +74,11 @@ class ZhihuCrawler(BaseCrawler):
         logger.info(f"开始爬取知乎热门问题，限制数量: {limit}")
         
         try:
-            # 请求热门问题页面
+            # 阶段一：抓取热门问题页面（整页一次请求，受限速器约束）
             response = self.get(self.hot_list_url)
-            soup = BeautifulSoup(response.text, 'lxml')
             
-            # 解析热门问题列表
-            hot_items = soup.find_all('section', class_='HotItem')
-            questions = []
-            
-            for i, item in enumerate(hot_items):
-                if i >= limit:
-                    break
-                
-                try:
-                    # 提取问题信息
-                    question = self._parse_hot_item(item)
-                    if question:
-                        questions.append(question)
-                        logger.info(f"成功解析热门问题: {question['title']}")
-                    
-                    # 添加下载延迟
-                    time.sleep(self.download_delay)
-                except Exception as e:
-                    logger.error(f"解析热门问题失败，索引: {i}, 错误: {str(e)}")
-                    continue
+            # 阶段二：在解析线程/进程池中并行解析所有条目，不再有任何等待
+            questions = self._parse_hot_list(response.text, limit)
             
             logger.info(f"成功爬取 {len(questions)} 个知乎热门问题")
             return questions
@@ -109,312 +86,430 @@ class ZhihuCrawler(BaseCrawler):
             logger.error(f"爬取知乎热门问题失败，错误: {str(e)}")
             return []
     
-    def _parse_hot_item(self, item: BeautifulSoup) -> Dict[str, Any]:
+    def get_question_answers(self, question_id: str, limit: int = 20, max_pages: int = 1) -> List[Dict[str, Any]]:
         """
-        解析单个热门问题项
+        通过回答列表API分页获取问题的回答列表
         
         Args:
-            item (BeautifulSoup): 热门问题的BeautifulSoup对象
+            question_id (str): 问题ID
+            limit (int, optional): 每页回答数量. Defaults to 20.
+            max_pages (int, optional): 最多爬取的页数. Defaults to 1.
         
         Returns:
-            Dict[str, Any]: 解析后的问题信息，包含原始HTML和清理后的文本
+            List[Dict[str, Any]]: 回答列表，字段与save_zhihu_answers的输入一致
         """
-        question = {}
+        logger.info(f"开始爬取问题回答，问题ID: {question_id}，每页数量: {limit}，最大页数: {max_pages}")
         
-        try:
-            # 排名
-            rank_tag = item.find('div', class_='HotItem-rank')
-            rank_text = rank_tag.text.strip() if rank_tag else '0'
-            question['rank'] = int(rank_text)
-            question['rank_raw'] = str(rank_tag) if rank_tag else ''
-            
-            # 问题链接和标题
-            title_tag = item.find('h2', class_='HotItem-title')
-            if title_tag and title_tag.a:
-                title_text = title_tag.a.text.strip()
-                question['title'] = title_text
-                question['title_raw'] = str(title_tag.a)
-                question['url'] = title_tag.a['href']
+        answers = []
+        current_page = 0
+        is_end = False
+        next_url = None
+        
+        while current_page < max_pages and not is_end:
+            try:
+                if next_url:
+                    response = self.get(next_url)
+                else:
+                    answers_url = f"{self.base_url}/api/v4/questions/{question_id}/answers"
+                    response = self.get(answers_url, params=self._build_answers_params(0, limit))
                 
-                # 提取问题ID
-                question_id = question['url'].split('/')[-1].split('?')[0]
-                question['question_id'] = question_id
-            
-            # 热度
-            metrics_tag = item.find('div', class_='HotItem-metrics')
-            if metrics_tag:
-                metrics_text = metrics_tag.text.strip()
-                question['metrics'] = metrics_text
-                question['metrics_raw'] = str(metrics_tag)
-            
-            # 问题描述
-            excerpt_tag = item.find('p', class_='HotItem-excerpt')
-            if excerpt_tag:
-                excerpt_text = excerpt_tag.text.strip()
-                question['excerpt'] = excerpt_text
-                question['excerpt_raw'] = str(excerpt_tag)
-            
-            # 标记爬取时间（使用datetime对象）
-            question['crawl_time'] = datetime.now()
+                response_data = self._load_json(response, ANSWER_LIST_FIELDS)
+                page_answers = self._parse_answer_list(response_data)
+                answers.extend(page_answers)
+                current_page += 1
+                logger.debug(f"问题 {question_id} 第 {current_page} 页获取 {len(page_answers)} 个回答")
+                
+                # 检查分页信息
+                paging = response_data.get('paging', {})
+                is_end = paging.get('is_end', False)
+                next_url = paging.get('next')
             
-            return question
-        except Exception as e:
-            logger.error(f"解析热门问题项失败，错误: {str(e)}")
-            return {}
+            except json.JSONDecodeError as e:
+                logger.error(f"解析回答列表JSON失败，问题ID: {question_id}，页码: {current_page + 1}，错误: {str(e)}")
+                break
+            except Exception as e:
+                logger.error(f"爬取问题回答失败，问题ID: {question_id}，页码: {current_page + 1}，错误: {str(e)}")
+                break
+        
+        logger.info(f"问题 {question_id} 共获取 {len(answers)} 个回答")
+        return answers
     
-    def get_question_answers(self, question_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+    def get_answers_for_questions(self, question_ids: List[str], limit: int = 20, max_pages: int = 1,
+                                  max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
         """
-        获取问题的回答列表
+        并发爬取多个问题的回答，例如get_hot_questions返回的全部问题
+        
+        并发数受max_workers限制，请求频率仍受按主机共享的限速器约束
         
         Args:
-            question_id (str): 问题ID
-            limit (int, optional): 返回的回答数量限制. Defaults to 20.
+            question_ids (List[str]): 问题ID列表
+            limit (int, optional): 每页回答数量. Defaults to 20.
+            max_pages (int, optional): 每个问题最多爬取的页数. Defaults to 1.
+            max_workers (Optional[int], optional): 最大并发数，默认使用CONCURRENT_REQUESTS. Defaults to None.
         
         Returns:
-            List[Dict[str, Any]]: 回答列表，每个回答包含作者、内容、点赞数等信息
+            List[Dict[str, Any]]: 所有问题的回答列表，按问题ID的输入顺序排列
         """
-        logger.info(f"开始爬取问题回答，问题ID: {question_id}，限制数量: {limit}")
-        
-        try:
-            # 知乎问题回答API (实际中需要找到正确的API或使用Selenium)
-            # 这里使用问题页面URL作为示例
-            question_url = f"{self.base_url}/question/{question_id}"
-            response = self.get(question_url)
-            soup = BeautifulSoup(response.text, 'lxml')
-            
-            # 解析回答列表（实际中知乎回答是动态加载的，需要使用Selenium或API）
-            answers = []
-            
-            # TODO: 实现知乎回答的动态加载和解析
-            # 这里返回空列表，后续需要完善
-            logger.warning(f"知乎回答爬取功能待完善，问题ID: {question_id}")
-            
-            return answers
-        except Exception as e:
-            logger.error(f"爬取问题回答失败，问题ID: {question_id}，错误: {str(e)}")
+        question_ids = list(dict.fromkeys(qid for qid in question_ids if qid))
+        if not question_ids:
             return []
+        
+        max_workers = max(1, min(max_workers or self.concurrent_requests, len(question_ids)))
+        logger.info(f"开始并发爬取 {len(question_ids)} 个问题的回答，并发数: {max_workers}")
+        
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='zhihu-answers') as executor:
+            answer_lists = executor.map(
+                lambda qid: self.get_question_answers(qid, limit=limit, max_pages=max_pages),
+                question_ids
+            )
+            answers = [answer for answer_list in answer_lists for answer in answer_list]
+        
+        logger.info(f"并发爬取完成，{len(question_ids)} 个问题共获取 {len(answers)} 个回答")
+        return answers
     
     def get_answer_details(self, answer_id: str) -> Dict[str, Any]:
         """
-        获取单个回答的详细信息
+        通过回答API获取单个回答的详细信息
         
         Args:
             answer_id (str): 回答ID
         
         Returns:
-            Dict[str, Any]: 回答的详细信息
+            Dict[str, Any]: 回答的详细信息，字段与save_zhihu_answers的输入一致，失败时返回空字典
         """
-        logger.info(f"开始爬取回答详情，回答ID: {answer_id}")
+        logger.debug(f"开始爬取回答详情，回答ID: {answer_id}")
         
         try:
-            answer_url = f"{self.base_url}/answer/{answer_id}"
-            response = self.get(answer_url)
-            
-            # TODO: 实现回答详情的解析
-            # 这里返回空字典，后续需要完善
-            logger.warning(f"知乎回答详情爬取功能待完善，回答ID: {answer_id}")
-            
-            return {}
+            answer_url = f"{self.base_url}/api/v4/answers/{answer_id}"
+            response = self.get(answer_url, params=self._build_answer_detail_params())
+            return self._parse_answer_object(self._load_json(response, ANSWER_FIELDS))
         except Exception as e:
             logger.error(f"爬取回答详情失败，回答ID: {answer_id}，错误: {str(e)}")
             return {}
     
-    def search_content(self, query: str, max_pages: int = 10, limit: int = 20) -> List[Dict[str, Any]]:
+    def get_answer_details_batch(self, answer_ids: List[str], skip_existing: bool = True,
+                                 max_workers: Optional[int] = None, storage=None) -> List[Dict[str, Any]]:
+        """
+        批量获取回答详情：先用一次集合查询过滤掉数据库中已有的回答，再并发爬取其余回答
+        
+        并发数受max_workers限制，请求频率仍受按主机共享的限速器约束
+        
+        Args:
+            answer_ids (List[str]): 回答ID列表
+            skip_existing (bool, optional): 是否跳过zhihu_answers中已存在的回答. Defaults to True.
+            max_workers (Optional[int], optional): 最大并发数，默认使用CONCURRENT_REQUESTS. Defaults to None.
+            storage (DataStorage, optional): 数据存储实例，默认使用全局data_storage. Defaults to None.
+        
+        Returns:
+            List[Dict[str, Any]]: 成功获取的回答详情列表，可直接传给save_zhihu_answers
+        """
+        answer_ids = list(dict.fromkeys(str(aid) for aid in answer_ids if aid))
+        
+        if skip_existing and answer_ids:
+            if storage is None:
+                from data.storage import data_storage
+                storage = data_storage
+            existing_ids = storage.get_existing_answer_ids(answer_ids)
+            answer_ids = [aid for aid in answer_ids if aid not in existing_ids]
+            logger.info(f"跳过 {len(existing_ids)} 个已入库的回答，待爬取 {len(answer_ids)} 个")
+        
+        if not answer_ids:
+            return []
+        
+        max_workers = max(1, min(max_workers or self.concurrent_requests, len(answer_ids)))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='zhihu-answer-details') as executor:
+            details = [detail for detail in executor.map(self.get_answer_details, answer_ids) if detail]
+        
+        logger.info(f"批量获取回答详情完成，成功 {len(details)} 个，失败 {len(answer_ids) - len(details)} 个")
+        return details
+    
+    def iter_search_pages(self, query: str, max_pages: int = 10, limit: int = 20,
+                          watermark: Optional[Dict[str, Any]] = None, start_url: Optional[str] = None,
+                          start_page: int = 0, storage=None) -> Iterator[Dict[str, Any]]:
         """
-        搜索知乎内容
+        逐页搜索知乎内容的生成器，每解析完一页立即产出，调用方可以边爬边保存，内存占用与页数无关
+        
+        结果按创建时间倒序返回，传入watermark时只保留水位之后的新条目，并在到达水位的页面后停止翻页
         
         Args:
             query (str): 搜索关键词，支持多关键词查询
             max_pages (int, optional): 最大爬取页数. Defaults to 10.
             limit (int, optional): 每页返回数量限制. Defaults to 20.
+            watermark (Optional[Dict[str, Any]], optional): 增量水位，包含create_time和answer_id. Defaults to None.
+            start_url (Optional[str], optional): 续爬时的分页游标（上次的paging.next）. Defaults to None.
+            start_page (int, optional): 续爬时已完成的页数，max_pages包含这些页. Defaults to 0.
+            storage (DataStorage, optional): 保存结果的存储实例，已见ID过滤器按该实例的数据库预热和更新；
+                未启用过滤器时每页查询该实例中已入库回答的内容指纹，内容未变化的回答不再清理HTML，
+                为None时过滤器使用全局data_storage且不查询指纹. Defaults to None.
         
-        Returns:
-            List[Dict[str, Any]]: 搜索结果列表，每个结果包含标题、内容、链接等信息
+        Yields:
+            Dict[str, Any]: 一页数据，包含page（页码，从1开始）、results（本页结果）、next_url、is_end、reached_watermark
+            和skipped（被已见ID过滤器跳过的条目摘要）
         """
         logger.info(f"开始搜索知乎内容，关键词: {query}，最大页数: {max_pages}，每页限制: {limit}")
         
-        all_results = []
-        current_page = 0
-        is_end = False
-        next_url = None
+        current_page = start_page
+        self.last_search_page_count = current_page
+        self.last_search_failed = False
+        seen_filter = self._search_seen_filter(storage)
+        
+        # 后台线程获取第N+1页时，当前线程解析第N页
+        pages = prefetch(self._fetch_search_pages(query, max_pages, limit, start_url, start_page),
+                         depth=self.search_prefetch_depth, name=f'search-prefetch-{query}')
         
         try:
-            while current_page < max_pages and not is_end:
+            while True:
                 try:
-                    # 构建请求URL
-                    if next_url:
-                        search_url = next_url
-                    else:
-                        search_url = f"{self.base_url}/api/v4/search_v3"
-                        params = {
-                            'gk_version': 'gz-gaokao',
-                            't': 'general',
-                            'q': query,
-                            'correction': 1,
-                            'offset': current_page * limit,
-                            'limit': limit,
-                            'filter_fields': '',
-                            'lc_idx': 0,
-                            'show_all_topics': 0,
-                            'search_source': 'Filter',
-                            'sort': 'created_time'
-                        }
-                    
-                    logger.info(f"正在爬取第 {current_page + 1} 页...")
-                    
-                    # 发送请求
-                    if next_url:
-                        response = self.get(next_url)
-                    else:
-                        response = self.get(search_url, params=params)
-                    
-                    # 解析JSON响应
-                    response_data = response.json()
+                    response_data = next(pages, None)
+                    if response_data is None:
+                        return
                     
                     # 解析搜索结果
-                    page_results = self._parse_search_results(response_data)
+                    skipped = []
+                    known_hashes = None
+                    if storage is not None and seen_filter is None:
+                        known_hashes = self._search_known_hashes(response_data, storage)
+                    page_results = self._parse_search_results(response_data, skipped, seen_filter, known_hashes)
+                    current_page += 1
+                    self.last_search_page_count = current_page
+                    
+                    # 按增量水位过滤已爬取过的条目
+                    page_results, reached_watermark = self._filter_new_results(page_results, watermark, skipped)
                     
                     if page_results:
-                        all_results.extend(page_results)
-                        logger.info(f"第 {current_page + 1} 页成功获取 {len(page_results)} 条结果")
-                    else:
-                        logger.warning(f"第 {current_page + 1} 页未获取到有效结果")
+                        logger.info(f"第 {current_page} 页成功获取 {len(page_results)} 条结果")
+                    elif not reached_watermark and not skipped:
+                        logger.warning(f"第 {current_page} 页未获取到有效结果")
                     
                     # 检查分页信息
                     paging = response_data.get('paging', {})
                     is_end = paging.get('is_end', False)
                     next_url = paging.get('next')
-                    
-                    current_page += 1
-                    
-                    # 添加下载延迟
-                    if current_page < max_pages and not is_end:
-                        time.sleep(self.download_delay)
-                        
+                
                 except json.JSONDecodeError as e:
                     logger.error(f"解析JSON响应失败，页码: {current_page + 1}，错误: {str(e)}")
-                    break
+                    self.last_search_failed = True
+                    return
                 except Exception as e:
                     logger.error(f"爬取第 {current_page + 1} 页失败，错误: {str(e)}")
-                    break
+                    self.last_search_failed = True
+                    return
+                
+                yield {
+                    'page': current_page,
+                    'results': page_results,
+                    'next_url': next_url,
+                    'is_end': is_end,
+                    'reached_watermark': reached_watermark,
+                    'skipped': skipped
+                }
+                
+                # 结果按创建时间倒序，本页出现已知条目说明后续页面均已爬取过
+                if reached_watermark:
+                    logger.info(f"第 {current_page} 页到达增量水位，停止翻页")
+                    return
+        finally:
+            # 调用方提前结束迭代时通知预取线程退出
+            pages.close()
+    
+    def _fetch_search_pages(self, query: str, max_pages: int, limit: int, start_url: Optional[str],
+                            start_page: int) -> Iterator[Dict[str, Any]]:
+        """
+        按paging.next顺序获取搜索结果页的JSON数据，不做条目解析，供iter_search_pages预取
+        
+        Args:
+            query (str): 搜索关键词
+            max_pages (int): 最大爬取页数（包含已完成的页）
+            limit (int): 每页返回数量限制
+            start_url (Optional[str]): 起始分页游标
+            start_page (int): 已完成的页数
+        
+        Yields:
+            Dict[str, Any]: 一页search_v3响应数据
+        """
+        current_page = start_page
+        is_end = False
+        next_url = start_url
+        
+        while current_page < max_pages and not is_end:
+            logger.info(f"正在爬取第 {current_page + 1} 页...")
+            
+            # 发送请求
+            if next_url:
+                response = self.get(next_url)
+            else:
+                params = self._build_search_params(query, current_page, limit)
+                response = self.get(self.search_url, params=params)
+            
+            # 解析JSON响应，取出分页信息后即可请求下一页
+            response_data = self._load_json(response, SEARCH_PAGE_FIELDS)
+            paging = response_data.get('paging', {})
+            is_end = paging.get('is_end', False)
+            next_url = paging.get('next')
+            current_page += 1
+            
+            yield response_data
+    
+    def search_content(self, query: str, max_pages: int = 10, limit: int = 20,
+                       watermark: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        搜索知乎内容，汇总iter_search_pages产出的所有页面
+        
+        Args:
+            query (str): 搜索关键词，支持多关键词查询
+            max_pages (int, optional): 最大爬取页数. Defaults to 10.
+            limit (int, optional): 每页返回数量限制. Defaults to 20.
+            watermark (Optional[Dict[str, Any]], optional): 增量水位，包含create_time和answer_id. Defaults to None.
+        
+        Returns:
+            List[Dict[str, Any]]: 搜索结果列表，每个结果包含标题、内容、链接等信息
+        """
+        all_results = []
+        
+        try:
+            for page in self.iter_search_pages(query, max_pages=max_pages, limit=limit, watermark=watermark):
+                all_results.extend(page['results'])
             
             logger.info(f"搜索完成，共获取 {len(all_results)} 条结果")
             return all_results
-            
+        
         except Exception as e:
             logger.error(f"搜索知乎内容失败，错误: {str(e)}")
             return all_results
     
-    def _parse_search_results(self, response_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _run_search_task(self, storage, search_task, max_pages: int, limit: int,
+                         watermark: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """
-        解析搜索结果
+        执行（或继续执行）一个搜索任务：从任务记录的游标处开始翻页，每页保存结果后
+        立即把游标、页数、统计和状态写回SearchTask，进程中断或网络错误后可由resume_search继续
         
         Args:
-            response_data (Dict[str, Any]): API响应数据
+            storage (DataStorage): 数据存储实例
+            search_task (SearchTask): 搜索任务记录
+            max_pages (int): 任务总页数上限（包含已完成的页）
+            limit (int): 每页返回数量限制
+            watermark (Optional[Dict[str, Any]]): 增量水位
         
         Returns:
-            List[Dict[str, Any]]: 解析后的搜索结果列表
+            Dict[str, Any]: 本次执行的统计信息，包含任务ID、状态、累计页数、本次新结果数和保存数量
         """
-        results = []
+        search_task_id = search_task.id
+        summary = {'search_task_id': search_task_id, 'status': 'running', 'page_count': search_task.page_index or 0,
+                   'new_results': 0, 'saved_count': 0}
+        total_results = search_task.total_results or 0
+        # 本任务已爬取条目中最新的一条，任务完成后作为下一次增量搜索的水位
+        new_watermark = watermark
+        if search_task.last_create_time:
+            new_watermark = {'create_time': search_task.last_create_time, 'answer_id': search_task.last_answer_id}
+        last_page = None
         
-        try:
-            data_list = response_data.get('data', [])
-            
-            for item in data_list:
-                # 只处理类型为search_result的条目
-                if item.get('type') != 'search_result':
-                    continue
-                
-                try:
-                    object_data = item.get('object', {})
-                    
-                    # 提取标题
-                    title = object_data.get('title', '')
-                    
-                    # 提取内容（原始HTML）
-                    content = object_data.get('content', '')
-                    
-                    # 提取答案链接
-                    url = object_data.get('url', '')
-                    
-                    # 提取问题链接
-                    question_data = object_data.get('question', {})
-                    question_url = question_data.get('url', '') if question_data else ''
-                    
-                    # 提取问题ID
-                    question_id = ''
-                    if question_url:
-                        try:
-                            question_id = question_url.split('/')[-1].split('?')[0]
-                        except Exception:
-                            pass
-                    
-                    # 提取作者信息
-                    author_data = object_data.get('author', {})
-                    author_name = author_data.get('name', '') if author_data else ''
-                    
-                    # 提取点赞数
-                    vote_up_count = object_data.get('voteup_count', 0)
-                    
-                    # 提取评论数
-                    comment_count = object_data.get('comment_count', 0)
-                    
-                    # 提取创建时间
-                    create_time = None
-                    raw_create_time = object_data.get('created_time') or object_data.get('created')
-                    if raw_create_time:
-                        try:
-                            # 尝试将时间戳转换为datetime对象
-                            if isinstance(raw_create_time, (int, float)):
-                                create_time = datetime.fromtimestamp(raw_create_time)
-                            elif isinstance(raw_create_time, str):
-                                # 尝试解析ISO格式的时间字符串
-                                try:
-                                    from dateutil import parser
-                                    create_time = parser.parse(raw_create_time)
-                                except Exception:
-                                    # 如果解析失败，尝试其他格式
-                                    try:
-                                        create_time = datetime.strptime(raw_create_time, '%Y-%m-%d %H:%M:%S')
-                                    except Exception:
-                                        create_time = None
-                        except Exception as e:
-                            logger.warning(f"解析create_time失败: {str(e)}，使用当前时间")
-                            create_time = None
-                    
-                    # 如果没有获取到create_time，使用当前时间
-                    if not create_time:
-                        create_time = datetime.now()
-                    
-                    # 清理HTML标签，提取纯文本
-                    title_clean = self._clean_html_content(title)
-                    content_clean = self._clean_html_content(content)
-                    
-                    # 构建结果字典，包含原始数据和清理后的文本
-                    result = {
-                        'title': title_clean,
-                        'title_raw': title,
-                        'content': content_clean,
-                        'content_raw': content,
-                        'url': url,
-                        'question_url': question_url,
-                        'question_id': question_id,
-                        'author': author_name,
-                        'vote_up_count': vote_up_count,
-                        'comment_count': comment_count,
-                        'crawl_time': datetime.now(),
-                        'create_time': create_time
-                    }
-                    
-                    results.append(result)
-                    logger.debug(f"成功解析搜索结果: {title[:50]}...")
-                    
-                except Exception as e:
-                    logger.error(f"解析单个搜索结果失败，错误: {str(e)}")
-                    continue
-            
-            return results
+        for page in self.iter_search_pages(search_task.keyword, max_pages=max_pages, limit=limit, watermark=watermark,
+                                           start_url=search_task.next_cursor, start_page=summary['page_count'],
+                                           storage=storage):
+            if page['results']:
+                summary['saved_count'] += storage.save_zhihu_answers(page['results'], search_task_id)
+            summary['page_count'] = page['page']
+            summary['new_results'] += len(page['results'])
+            total_results += len(page['results'])
+            new_watermark = self._search_watermark(page['results'] + page['skipped'], new_watermark)
+            last_page = page
             
-        except Exception as e:
-            logger.error(f"解析搜索结果失败，错误: {str(e)}")
-            return results
+            # 每页落库后记录游标，续爬时从下一页开始
+            storage.update_search_task(
+                search_task_id,
+                next_cursor=page['next_url'],
+                page_index=page['page'],
+                page_count=page['page'],
+                total_results=total_results,
+                last_create_time=(new_watermark or {}).get('create_time'),
+                last_answer_id=(new_watermark or {}).get('answer_id')
+            )
+        
+        if self.last_search_failed:
+            summary['status'] = 'failed'
+        elif last_page and (last_page['is_end'] or last_page['reached_watermark']):
+            summary['status'] = 'completed'
+        else:
+            # 达到max_pages但还有后续页面，可以用更大的max_pages继续
+            summary['status'] = 'paused'
+        storage.update_search_task(search_task_id, status=summary['status'])
+        
+        logger.info(f"搜索任务 {search_task_id} 结束，状态: {summary['status']}，关键词: {search_task.keyword}，"
+                    f"累计 {summary['page_count']} 页，本次新结果 {summary['new_results']} 条，保存 {summary['saved_count']} 条")
+        return summary
+    
+    def search_incremental(self, query: str, max_pages: int = 10, limit: int = 20,
+                           storage=None) -> Dict[str, Any]:
+        """
+        增量搜索：从数据库读取关键词上次的水位，只爬取水位之后的新回答，
+        每爬完一页立即批量保存并记录分页游标，中断后可通过resume_search继续
+        
+        关键词有因达到max_pages暂停的任务时先续爬该任务（本次最多再爬max_pages页），
+        暂停任务完成后才会开始新的任务，保证暂停任务与上一个水位之间的较旧页面不会漏爬
+        
+        Args:
+            query (str): 搜索关键词
+            max_pages (int, optional): 本次最大爬取页数. Defaults to 10.
+            limit (int, optional): 每页返回数量限制. Defaults to 20.
+            storage (DataStorage, optional): 数据存储实例，默认使用全局data_storage. Defaults to None.
+        
+        Returns:
+            Dict[str, Any]: 本次搜索的统计信息，包含任务ID、状态、爬取页数、新结果数和保存数量
+        """
+        if storage is None:
+            from data.storage import data_storage
+            storage = data_storage
+        
+        paused_task = storage.get_paused_search_task(query)
+        if paused_task:
+            logger.info(f"关键词 {query} 有暂停的搜索任务 {paused_task.id}，先续爬该任务")
+            return self.resume_search(paused_task.id, max_pages=(paused_task.page_index or 0) + max_pages,
+                                      limit=limit, storage=storage)
+        
+        watermark = storage.get_search_watermark(query)
+        search_task_id = storage.save_search_task(keyword=query, status='running')
+        search_task = storage.get_search_task(search_task_id)
+        if not search_task:
+            return {'search_task_id': 0, 'status': 'failed', 'page_count': 0, 'new_results': 0, 'saved_count': 0}
+        
+        return self._run_search_task(storage, search_task, max_pages, limit, watermark)
+    
+    def resume_search(self, task_id: int, max_pages: int = 10, limit: int = 20, storage=None) -> Dict[str, Any]:
+        """
+        从搜索任务记录的分页游标处继续爬取，不会重新下载已完成的页面
+        
+        Args:
+            task_id (int): 搜索任务ID
+            max_pages (int, optional): 任务总页数上限（包含已完成的页）. Defaults to 10.
+            limit (int, optional): 每页返回数量限制，游标丢失时用于按偏移量重建请求. Defaults to 20.
+            storage (DataStorage, optional): 数据存储实例，默认使用全局data_storage. Defaults to None.
+        
+        Returns:
+            Dict[str, Any]: 本次执行的统计信息，任务不存在时status为missing
+        """
+        if storage is None:
+            from data.storage import data_storage
+            storage = data_storage
+        
+        search_task = storage.get_search_task(task_id)
+        if not search_task:
+            logger.error(f"搜索任务不存在，无法续爬，任务ID: {task_id}")
+            return {'search_task_id': task_id, 'status': 'missing', 'page_count': 0, 'new_results': 0, 'saved_count': 0}
+        
+        if search_task.status == 'completed':
+            logger.info(f"搜索任务 {task_id} 已完成，无需续爬")
+            return {'search_task_id': task_id, 'status': 'completed', 'page_count': search_task.page_index or 0,
+                    'new_results': 0, 'saved_count': 0}
+        
+        logger.info(f"续爬搜索任务 {task_id}，关键词: {search_task.keyword}，从第 {(search_task.page_index or 0) + 1} 页开始")
+        storage.update_search_task(task_id, status='running')
+        # 水位只取该任务之前的任务，与任务首次执行时一致
+        watermark = storage.get_search_watermark(search_task.keyword, before_task_id=task_id)
+        return self._run_search_task(storage, search_task, max_pages, limit, watermark)
+    
+    def close(self):
+        """
+        关闭session和解析池
+        """
+        self._shutdown_parse_executor()
+        super().close()
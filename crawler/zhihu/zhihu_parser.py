@@ -0,0 +1,545 @@
+"""
+知乎页面解析模块，提供同步与异步爬虫共用的解析逻辑
+"""
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import List, Dict, Any, Optional, Tuple
+from config.settings import STORAGE_CONFIG
+from crawler.json_codec import FieldSpec, decode_json, get_json_loads, project
+from crawler.zhihu.html_backends import HtmlBackend, get_html_backend
+from data.records import (AnswerRecord, QuestionRecord, answer_fingerprint, extract_id_from_url, normalize_answers,
+                          normalize_questions, parse_timestamp)
+from data.seen_filter import SeenIdFilter, get_seen_filter
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# _parse_answer_object读取的回答字段，其余字段（excerpt、highlight、thumbnail_info等）在解码后立即丢弃
+ANSWER_FIELDS: FieldSpec = {
+    'id': None,
+    'type': None,
+    'title': None,
+    'content': None,
+    'url': None,
+    'question': {'id': None, 'url': None, 'title': None, 'name': None},
+    'author': {'name': None},
+    'voteup_count': None,
+    'comment_count': None,
+    'created_time': None,
+    'created': None,
+}
+
+# 翻页只需要is_end和next
+_PAGING_FIELDS: FieldSpec = {'is_end': None, 'next': None}
+
+# search_v3响应中用到的字段
+SEARCH_PAGE_FIELDS: FieldSpec = {
+    'paging': _PAGING_FIELDS,
+    'data': {'type': None, 'object': ANSWER_FIELDS},
+}
+
+# 问题回答列表API响应中用到的字段
+ANSWER_LIST_FIELDS: FieldSpec = {
+    'paging': _PAGING_FIELDS,
+    'data': ANSWER_FIELDS,
+}
+
+
+class ZhihuParserMixin:
+    """
+    知乎解析混入类，封装热门问题、搜索结果的解析和HTML清理
+    """
+    
+    # 解析配置，由具体爬虫在初始化时按CRAWLER_CONFIG覆盖
+    parser_backend = 'lxml'
+    parse_workers = 1
+    parse_executor_type = 'thread'
+    json_loads = staticmethod(get_json_loads('auto'))
+    json_projection = False
+    # 已见ID过滤器（SeenIdFilter），为None时不在解析前跳过已入库的条目
+    seen_filter = None
+    _parse_executor: Optional[Executor] = None
+    _parse_executor_lock = threading.Lock()
+    
+    @property
+    def html_backend(self) -> HtmlBackend:
+        """
+        当前线程使用的HTML解析后端
+        
+        Returns:
+            HtmlBackend: 解析后端实例
+        """
+        return get_html_backend(self.parser_backend)
+    
+    def _get_parse_executor(self) -> Optional[Executor]:
+        """
+        获取解析池，首次使用时按配置创建
+        
+        Returns:
+            Optional[Executor]: 解析池，parse_workers不大于1时返回None表示顺序解析
+        """
+        if self.parse_workers <= 1:
+            return None
+        
+        if self._parse_executor is None:
+            with self._parse_executor_lock:
+                if self._parse_executor is None:
+                    if self.parse_executor_type == 'process':
+                        self._parse_executor = ProcessPoolExecutor(max_workers=self.parse_workers)
+                    else:
+                        self._parse_executor = ThreadPoolExecutor(
+                            max_workers=self.parse_workers, thread_name_prefix='zhihu-parse'
+                        )
+                    logger.info(f"创建解析池，类型: {self.parse_executor_type}，工作数: {self.parse_workers}")
+        return self._parse_executor
+    
+    def _shutdown_parse_executor(self):
+        """
+        关闭解析池
+        """
+        if self._parse_executor is not None:
+            self._parse_executor.shutdown(wait=True)
+            self._parse_executor = None
+    
+    def _build_search_params(self, query: str, page: int, limit: int) -> Dict[str, Any]:
+        """
+        构建搜索API的首页请求参数
+        
+        Args:
+            query (str): 搜索关键词
+            page (int): 页码（从0开始）
+            limit (int): 每页返回数量
+        
+        Returns:
+            Dict[str, Any]: 请求参数
+        """
+        return {
+            'gk_version': 'gz-gaokao',
+            't': 'general',
+            'q': query,
+            'correction': 1,
+            'offset': page * limit,
+            'limit': limit,
+            'filter_fields': '',
+            'lc_idx': 0,
+            'show_all_topics': 0,
+            'search_source': 'Filter',
+            'sort': 'created_time'
+        }
+    
+    def _build_answers_params(self, offset: int, limit: int) -> Dict[str, Any]:
+        """
+        构建问题回答列表API的请求参数
+        
+        Args:
+            offset (int): 偏移量
+            limit (int): 每页回答数量
+        
+        Returns:
+            Dict[str, Any]: 请求参数
+        """
+        return {
+            'include': 'data[*].content,voteup_count,comment_count,created_time,updated_time',
+            'offset': offset,
+            'limit': limit,
+            'sort_by': 'default'
+        }
+    
+    def _build_answer_detail_params(self) -> Dict[str, Any]:
+        """
+        构建回答详情API（/api/v4/answers/{id}）的请求参数
+        
+        Returns:
+            Dict[str, Any]: 请求参数
+        """
+        return {'include': 'content,voteup_count,comment_count,created_time,updated_time,question'}
+    
+    def _load_json(self, response, fields: Optional[FieldSpec] = None) -> Any:
+        """
+        从响应字节解码JSON（安装orjson时使用orjson），并按字段规格只保留解析用到的字段
+        
+        Args:
+            response: 同步或异步响应，需要有content字节属性
+            fields (Optional[FieldSpec], optional): 字段规格，为None或关闭JSON_PROJECTION时不裁剪. Defaults to None.
+        
+        Returns:
+            Any: 解码结果
+        
+        Raises:
+            json.JSONDecodeError: 响应不是合法JSON
+        """
+        data = decode_json(response.content, self.json_loads)
+        if fields is not None and self.json_projection:
+            data = project(data, fields)
+        return data
+    
+    def _clean_html_content(self, html_content: str) -> str:
+        """
+        清理HTML标签，提取纯文本内容
+        
+        Args:
+            html_content (str): 包含HTML标签的内容
+        
+        Returns:
+            str: 清理后的纯文本内容
+        """
+        if not html_content:
+            return ""
+        
+        try:
+            return self.html_backend.clean_html(html_content)
+        except Exception as e:
+            logger.error(f"清理HTML内容失败，错误: {str(e)}")
+            return html_content
+    
+    def _parse_hot_item(self, item: Any) -> Dict[str, Any]:
+        """
+        解析单个热门问题项
+        
+        Args:
+            item (Any): 解析后端返回的热门问题节点
+        
+        Returns:
+            Dict[str, Any]: 解析后的问题信息，包含原始HTML和清理后的文本
+        """
+        try:
+            return self.html_backend.parse_hot_item(item)
+        except Exception as e:
+            logger.error(f"解析热门问题项失败，错误: {str(e)}")
+            return {}
+    
+    def _parse_hot_list(self, html: str, limit: int) -> List[QuestionRecord]:
+        """
+        解析热门问题页面，条目解析在解析池中并行执行
+        
+        Args:
+            html (str): 热门问题页面HTML
+            limit (int): 返回的问题数量限制
+        
+        Returns:
+            List[QuestionRecord]: 规范化后的热门问题列表，顺序与页面一致
+        """
+        backend = self.html_backend
+        
+        # 解析热门问题列表
+        hot_items = backend.find_hot_items(html, limit)
+        
+        executor = self._get_parse_executor()
+        if executor is None:
+            parsed = [self._parse_hot_item(item) for item in hot_items]
+        else:
+            # lxml文档和XPath对象不宜跨线程/进程共享，工作者只接收HTML片段并使用各自的解析后端
+            parsed = list(executor.map(
+                partial(parse_hot_item_html, backend_name=backend.name),
+                [backend.item_to_html(item) for item in hot_items]
+            ))
+        
+        questions = []
+        for i, question in enumerate(parsed):
+            if question:
+                questions.append(question)
+                logger.info(f"成功解析热门问题: {question.get('title', '')}")
+            else:
+                logger.error(f"解析热门问题失败，索引: {i}")
+        
+        return normalize_questions(questions)
+    
+    def _is_known_result(self, result: Dict[str, Any], watermark: Dict[str, Any]) -> bool:
+        """
+        判断搜索结果是否在增量水位之前（即上次爬取时已见过）
+        
+        Args:
+            result (Dict[str, Any]): 解析后的搜索结果
+            watermark (Dict[str, Any]): 增量水位，包含create_time和answer_id
+        
+        Returns:
+            bool: 是否为已知条目
+        """
+        if watermark.get('answer_id') and result.get('answer_id') == watermark['answer_id']:
+            return True
+        
+        # 创建时间为估计值时无法判断，按新条目处理
+        if result.get('create_time_estimated') or not watermark.get('create_time'):
+            return False
+        return result['create_time'] < watermark['create_time']
+    
+    def _filter_new_results(self, page_results: List[Dict[str, Any]], watermark: Optional[Dict[str, Any]],
+                            skipped: Optional[List[Dict[str, Any]]] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        按增量水位过滤一页搜索结果
+        
+        Args:
+            page_results (List[Dict[str, Any]]): 一页解析后的搜索结果
+            watermark (Optional[Dict[str, Any]]): 增量水位，为None时不过滤
+            skipped (Optional[List[Dict[str, Any]]], optional): 解析前被已见ID过滤器跳过的条目摘要，
+                同样参与水位判断. Defaults to None.
+        
+        Returns:
+            Tuple[List[Dict[str, Any]], bool]: 新条目列表，以及该页是否已到达水位（出现已知条目）
+        """
+        if not watermark:
+            return page_results, False
+        
+        new_results = [result for result in page_results if not self._is_known_result(result, watermark)]
+        reached_watermark = len(new_results) < len(page_results) or \
+            any(self._is_known_result(item, watermark) for item in skipped or ())
+        return new_results, reached_watermark
+    
+    def _search_watermark(self, results: List[Dict[str, Any]],
+                          previous: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        计算搜索结果的增量水位：创建时间最新的条目的create_time和answer_id
+        
+        Args:
+            results (List[Dict[str, Any]]): 搜索结果列表
+            previous (Optional[Dict[str, Any]], optional): 上一次的水位. Defaults to None.
+        
+        Returns:
+            Optional[Dict[str, Any]]: 新的水位，没有可用条目时返回previous
+        """
+        watermark = previous
+        for result in results:
+            if result.get('create_time_estimated') or not result.get('answer_id'):
+                continue
+            if watermark is None or not watermark.get('create_time') \
+                    or result['create_time'] > watermark['create_time']:
+                watermark = {'create_time': result['create_time'], 'answer_id': result['answer_id']}
+        return watermark
+    
+    def _object_answer_id(self, object_data: Dict[str, Any]) -> str:
+        """
+        从回答对象中取出回答ID，优先使用url末尾的ID
+        
+        Args:
+            object_data (Dict[str, Any]): 回答对象
+        
+        Returns:
+            str: 回答ID，无法获取时返回空字符串
+        """
+        answer_id = extract_id_from_url(object_data.get('url') or '')
+        if not answer_id and object_data.get('id'):
+            answer_id = str(object_data['id'])
+        return answer_id
+    
+    def _extract_answer_fields(self, object_data: Dict[str, Any], content_hash: Optional[str] = None,
+                               clean: bool = True) -> Dict[str, Any]:
+        """
+        从回答对象中取出原始字段并清理HTML，时间解析、类型转换和ID补全留给批量规范化阶段
+        
+        Args:
+            object_data (Dict[str, Any]): 回答对象，搜索结果的object与回答列表API的data条目结构一致
+            content_hash (Optional[str], optional): 已计算好的内容指纹，为None时按正文原始HTML计算. Defaults to None.
+            clean (bool, optional): 是否清理标题和正文的HTML，已入库且内容指纹未变化的回答入库时只比较指纹和互动数据，
+                不需要清理结果，此时title和content为空字符串. Defaults to True.
+        
+        Returns:
+            Dict[str, Any]: 未规范化的回答字典
+        """
+        # 提取问题信息
+        question_data = object_data.get('question') or {}
+        
+        # 提取标题，回答列表API中的回答没有title，使用问题标题
+        title = object_data.get('title') or question_data.get('title') or question_data.get('name') or ''
+        
+        # 提取内容（原始HTML）
+        content = object_data.get('content') or ''
+        
+        # 提取答案链接，只有回答ID时构造API链接
+        url = object_data.get('url') or ''
+        answer_id = self._object_answer_id(object_data)
+        if answer_id and not url:
+            url = f"https://api.zhihu.com/answers/{answer_id}"
+        
+        # 提取作者信息
+        author_data = object_data.get('author') or {}
+        
+        return {
+            'title': self._clean_html_content(title) if clean else '',
+            'title_raw': title,
+            'content': self._clean_html_content(content) if clean else '',
+            'content_raw': content,
+            'content_hash': content_hash or answer_fingerprint(content),
+            'content_cleaned': clean,
+            'url': url,
+            'answer_id': answer_id,
+            'question_url': question_data.get('url', ''),
+            'question_id': question_data.get('id'),
+            'author': author_data.get('name', ''),
+            'vote_up_count': object_data.get('voteup_count', 0),
+            'comment_count': object_data.get('comment_count', 0),
+            'create_time': object_data.get('created_time') or object_data.get('created'),
+        }
+    
+    def _parse_answer_object(self, object_data: Dict[str, Any]) -> AnswerRecord:
+        """
+        解析单个回答对象
+        
+        Args:
+            object_data (Dict[str, Any]): 回答对象
+        
+        Returns:
+            AnswerRecord: 规范化后的回答，可直接传给save_zhihu_answers
+        """
+        return normalize_answers([self._extract_answer_fields(object_data)])[0]
+    
+    def _search_seen_filter(self, storage=None) -> Optional[SeenIdFilter]:
+        """
+        获取搜索结果入库前使用的已见ID过滤器，过滤器绑定到实际保存结果的存储实例
+        
+        开启REFRESH_ANSWER_METRICS时不使用过滤器：被跳过的回答不会进入保存流程，点赞数和评论数无法刷新
+        
+        Args:
+            storage (DataStorage, optional): 保存搜索结果的存储实例，为None时使用初始化时绑定全局data_storage的过滤器.
+                Defaults to None.
+        
+        Returns:
+            Optional[SeenIdFilter]: 过滤器，未启用或需要刷新互动数据时返回None
+        """
+        if self.seen_filter is None or STORAGE_CONFIG.get('REFRESH_ANSWER_METRICS', False):
+            return None
+        if storage is None:
+            return self.seen_filter
+        return get_seen_filter(self.seen_filter.config, storage)
+    
+    def _search_known_hashes(self, response_data: Dict[str, Any], storage) -> Dict[str, Optional[str]]:
+        """
+        用一次IN查询取出搜索结果页中已入库回答的内容指纹
+        
+        Args:
+            response_data (Dict[str, Any]): API响应数据
+            storage (DataStorage): 保存搜索结果的存储实例
+        
+        Returns:
+            Dict[str, Optional[str]]: 已入库的回答ID到内容指纹的映射
+        """
+        answer_ids = [
+            self._object_answer_id(item.get('object') or {})
+            for item in response_data.get('data') or []
+            if item.get('type') == 'search_result'
+        ]
+        return storage.get_answer_content_hashes(answer_ids)
+    
+    def _parse_search_results(self, response_data: Dict[str, Any],
+                              skipped: Optional[List[Dict[str, Any]]] = None,
+                              seen_filter: Optional[SeenIdFilter] = None,
+                              known_hashes: Optional[Dict[str, Optional[str]]] = None) -> List[AnswerRecord]:
+        """
+        解析搜索结果
+        
+        传入已见ID过滤器时，已入库的回答在清理HTML和规范化之前就被跳过，只保留水位判断需要的摘要；
+        过滤器按内容匹配时先计算正文原始HTML的指纹，只跳过内容未变化的回答。
+        传入已入库回答的内容指纹时，先计算正文原始HTML的指纹，未变化的回答不再清理HTML（title和content为空），
+        仍然返回以便入库时刷新互动数据和判断水位
+        
+        Args:
+            response_data (Dict[str, Any]): API响应数据
+            skipped (Optional[List[Dict[str, Any]]], optional): 传入列表时追加被跳过条目的摘要
+                （answer_id、create_time、create_time_estimated）. Defaults to None.
+            seen_filter (Optional[SeenIdFilter], optional): 已见ID过滤器（见_search_seen_filter），为None时不跳过.
+                Defaults to None.
+            known_hashes (Optional[Dict[str, Optional[str]]], optional): 已入库回答ID到内容指纹的映射
+                （见_search_known_hashes），为None时全部清理. Defaults to None.
+        
+        Returns:
+            List[AnswerRecord]: 规范化后的搜索结果列表
+        """
+        results = []
+        skipped_count = 0
+        
+        try:
+            data_list = response_data.get('data', [])
+            
+            for item in data_list:
+                # 只处理类型为search_result的条目
+                if item.get('type') != 'search_result':
+                    continue
+                
+                try:
+                    object_data = item.get('object') or {}
+                    
+                    # 已入库的条目不再清理HTML和解析，只保留水位判断需要的字段
+                    content_hash = None
+                    if seen_filter is not None:
+                        answer_id = self._object_answer_id(object_data)
+                        if seen_filter.match_content:
+                            content_hash = answer_fingerprint(object_data.get('content') or '')
+                        if seen_filter.contains('answer', seen_filter.key(answer_id, content_hash)):
+                            skipped_count += 1
+                            if skipped is not None:
+                                raw_create_time = object_data.get('created_time') or object_data.get('created')
+                                create_time = parse_timestamp(raw_create_time)
+                                skipped.append({
+                                    'answer_id': answer_id,
+                                    'create_time': create_time,
+                                    'create_time_estimated': create_time is None
+                                })
+                            continue
+                    
+                    clean = True
+                    if known_hashes:
+                        answer_id = self._object_answer_id(object_data)
+                        if answer_id in known_hashes:
+                            content_hash = content_hash or answer_fingerprint(object_data.get('content') or '')
+                            clean = known_hashes[answer_id] != content_hash
+                    
+                    result = self._extract_answer_fields(object_data, content_hash, clean)
+                    results.append(result)
+                    logger.debug(f"成功解析搜索结果: {result['title_raw'][:50]}...")
+                
+                except Exception as e:
+                    logger.error(f"解析单个搜索结果失败，错误: {str(e)}")
+                    continue
+        
+        except Exception as e:
+            logger.error(f"解析搜索结果失败，错误: {str(e)}")
+        
+        if skipped_count:
+            seen_filter.record_skipped('answer', skipped_count)
+            logger.debug(f"跳过 {skipped_count} 条已入库的搜索结果")
+        
+        # 整页一起规范化：时间解析有缓存，爬取时间整页共用
+        return normalize_answers(results)
+    
+    def _parse_answer_list(self, response_data: Dict[str, Any]) -> List[AnswerRecord]:
+        """
+        解析问题回答列表API（/api/v4/questions/{id}/answers）的一页数据
+        
+        Args:
+            response_data (Dict[str, Any]): API响应数据
+        
+        Returns:
+            List[AnswerRecord]: 规范化后的回答列表
+        """
+        answers = []
+        
+        for item in response_data.get('data', []):
+            # 回答列表中可能混入广告等其他类型的条目
+            if item.get('type', 'answer') != 'answer':
+                continue
+            
+            try:
+                answers.append(self._extract_answer_fields(item))
+            except Exception as e:
+                logger.error(f"解析单个回答失败，错误: {str(e)}")
+                continue
+        
+        return normalize_answers(answers)
+
+
+def parse_hot_item_html(item_html: str, backend_name: str = 'lxml') -> Dict[str, Any]:
+    """
+    解析单个热门问题条目的HTML片段，供解析池调用（必须是可pickle的模块级函数）
+    
+    Args:
+        item_html (str): 热门问题条目的HTML片段
+        backend_name (str, optional): 解析后端名称. Defaults to 'lxml'.
+    
+    Returns:
+        Dict[str, Any]: 解析后的问题信息，解析失败时返回空字典
+    """
+    try:
+        return get_html_backend(backend_name).parse_hot_item_html(item_html)
+    except Exception as e:
+        logger.error(f"解析热门问题项失败，错误: {str(e)}")
+        return {}
@@ -0,0 +1,163 @@
+"""
+热榜快照模块，计算相邻两次热榜轮询之间的排名与热度变化，并按变化记录回放重建任意时刻的热榜
+
+每次轮询只记录变化的条目：新上榜、下榜、排名变化，以及热度相对上次记录值的变化超过阈值的条目；
+每隔KEYFRAME_INTERVAL次轮询记录一次完整热榜作为关键帧，重建时从最近的关键帧开始回放，回放长度有上限
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+# 未配置时使用的默认参数
+DEFAULT_HOT_LIST_SNAPSHOT_CONFIG = {
+    "KEYFRAME_INTERVAL": 48,
+    "HEAT_CHANGE_THRESHOLD": 0.02,
+}
+
+# 热度文本中的数值与单位，如"4342 万热度"、"1.2 亿热度"
+_HEAT_PATTERN = re.compile(r'([\d.,]+)\s*(万|亿)?')
+_HEAT_UNITS = {'万': 10_000, '亿': 100_000_000}
+
+# 热榜状态：问题ID到{'rank': int, 'heat': int}的映射
+HotListState = Dict[str, Dict[str, int]]
+
+
+def parse_heat(metrics: str) -> int:
+    """
+    把热度文本解析为整数热度值
+    
+    Args:
+        metrics (str): 热度文本，如"4342 万热度分享"
+    
+    Returns:
+        int: 热度值，无法解析时返回0
+    """
+    match = _HEAT_PATTERN.search(metrics or '')
+    if not match:
+        return 0
+    try:
+        value = float(match.group(1).replace(',', ''))
+    except ValueError:
+        return 0
+    return int(value * _HEAT_UNITS.get(match.group(2), 1))
+
+
+def build_hot_state(questions: Iterable[Dict[str, Any]]) -> HotListState:
+    """
+    从一次轮询的热门问题构建热榜状态，同一问题出现多次时保留排名靠前的一条
+    
+    Args:
+        questions (Iterable[Dict[str, Any]]): 规范化后的热门问题（QuestionRecord）
+    
+    Returns:
+        HotListState: 热榜状态
+    """
+    state: HotListState = {}
+    for question in questions:
+        question_id = question.get('question_id')
+        if not question_id or question_id in state:
+            continue
+        state[question_id] = {'rank': question.get('rank') or 0, 'heat': parse_heat(question.get('metrics'))}
+    return state
+
+
+def _heat_changed(previous: int, current: int, threshold: float) -> bool:
+    """
+    判断热度变化是否需要记录
+    
+    Args:
+        previous (int): 上次记录的热度
+        current (int): 本次热度
+        threshold (float): 相对变化阈值，0表示任何变化都记录
+    
+    Returns:
+        bool: 是否需要记录
+    """
+    if previous == current:
+        return False
+    if not previous:
+        return True
+    return abs(current - previous) / previous >= threshold
+
+
+def diff_hot_states(previous: HotListState, current: HotListState, heat_threshold: float = 0.0,
+                    keyframe: bool = False) -> List[Dict[str, Any]]:
+    """
+    计算两次热榜状态之间需要记录的条目
+    
+    Args:
+        previous (HotListState): 上次快照重建出的热榜状态（热度为上次记录的值）
+        current (HotListState): 本次轮询的热榜状态
+        heat_threshold (float, optional): 热度相对变化阈值，排名未变且热度变化低于阈值的条目不记录. Defaults to 0.0.
+        keyframe (bool, optional): 是否为关键帧，关键帧记录全部在榜条目. Defaults to False.
+    
+    Returns:
+        List[Dict[str, Any]]: 条目列表，包含question_id、rank、heat、rank_delta、heat_delta和removed，
+            热度未达阈值的条目沿用上次记录的热度，保证重建结果与记录一致
+    """
+    entries = []
+    for question_id, item in current.items():
+        before = previous.get(question_id)
+        if before is None:
+            entries.append({'question_id': question_id, 'rank': item['rank'], 'heat': item['heat'],
+                            'rank_delta': None, 'heat_delta': None, 'removed': False})
+            continue
+        
+        heat_changed = _heat_changed(before['heat'], item['heat'], heat_threshold)
+        if not keyframe and not heat_changed and before['rank'] == item['rank']:
+            continue
+        heat = item['heat'] if heat_changed else before['heat']
+        entries.append({'question_id': question_id, 'rank': item['rank'], 'heat': heat,
+                        'rank_delta': before['rank'] - item['rank'], 'heat_delta': heat - before['heat'],
+                        'removed': False})
+    
+    for question_id, before in previous.items():
+        if question_id not in current:
+            entries.append({'question_id': question_id, 'rank': before['rank'], 'heat': before['heat'],
+                            'rank_delta': None, 'heat_delta': None, 'removed': True})
+    return entries
+
+
+def apply_hot_entries(state: HotListState, entries: Iterable[Any]) -> HotListState:
+    """
+    把一次快照的条目回放到热榜状态上（原地修改）
+    
+    Args:
+        state (HotListState): 热榜状态
+        entries (Iterable[Any]): 条目，字典或具有question_id/rank/heat/removed属性的HotListEntry
+    
+    Returns:
+        HotListState: 回放后的热榜状态
+    """
+    for entry in entries:
+        get = entry.get if isinstance(entry, dict) else lambda key: getattr(entry, key)
+        if get('removed'):
+            state.pop(get('question_id'), None)
+        else:
+            state[get('question_id')] = {'rank': get('rank'), 'heat': get('heat')}
+    return state
+
+
+def state_to_list(state: HotListState, changes: Optional[Dict[str, Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    把热榜状态转换为按排名排序的列表
+    
+    Args:
+        state (HotListState): 热榜状态
+        changes (Optional[Dict[str, Dict[str, Any]]], optional): 该快照记录的条目，按问题ID索引，
+            用于填充rank_delta/heat_delta，未记录的条目变化为0. Defaults to None.
+    
+    Returns:
+        List[Dict[str, Any]]: 包含question_id、rank、heat、rank_delta、heat_delta的列表
+    """
+    items = []
+    for question_id, item in state.items():
+        change = (changes or {}).get(question_id)
+        items.append({
+            'question_id': question_id,
+            'rank': item['rank'],
+            'heat': item['heat'],
+            'rank_delta': change['rank_delta'] if change else 0,
+            'heat_delta': change['heat_delta'] if change else 0,
+        })
+    items.sort(key=lambda item: (item['rank'], item['question_id']))
+    return items
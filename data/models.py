@@ -1,14 +1,30 @@
 """
 数据模型模块，定义数据库表结构
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float
+from sqlalchemy import Boolean, Column, Integer, String, Text, DateTime, Float, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
+from config.settings import STORAGE_CONFIG
 
 # 创建基础模型类
 Base = declarative_base()
 
 
+def sqlite_connect_args(db_url: str) -> dict:
+    """
+    生成数据库连接参数：SQLite在SQLITE_BUSY_TIMEOUT内等待其他进程释放写锁，而不是立即报database is locked
+    
+    Args:
+        db_url (str): 数据库连接URL
+    
+    Returns:
+        dict: 传给create_engine的connect_args，非SQLite数据库返回空字典
+    """
+    if not db_url.startswith('sqlite'):
+        return {}
+    return {'timeout': STORAGE_CONFIG.get('SQLITE_BUSY_TIMEOUT', 30)}
+
+
 class ZhihuQuestion(Base):
     """
     知乎问题数据模型
@@ -26,6 +42,7 @@ class ZhihuQuestion(Base):
     metrics_raw = Column(Text, comment='热度指标原始HTML')
     excerpt = Column(Text, comment='问题描述')
     excerpt_raw = Column(Text, comment='问题描述原始HTML')
+    content_hash = Column(String(32), comment='内容指纹（标题和描述原始HTML的摘要），未变化时跳过更新和评估')
     search_task_id = Column(Integer, comment='关联的搜索任务ID')
     crawl_time = Column(DateTime, default=func.now(), comment='爬取时间')
     created_at = Column(DateTime, default=func.now(), comment='创建时间')
@@ -49,6 +66,7 @@ class ZhihuAnswer(Base):
     author = Column(String(200), comment='回答作者')
     content = Column(Text, comment='回答内容')
     content_raw = Column(Text, comment='回答内容原始HTML')
+    content_hash = Column(String(32), comment='内容指纹（回答正文原始HTML的摘要），未变化时跳过更新和评估')
     url = Column(String(500), comment='回答链接')
     question_url = Column(String(500), comment='问题链接')
     vote_up = Column(Integer, default=0, comment='点赞数')
@@ -74,6 +92,11 @@ class SearchTask(Base):
     crawl_time = Column(DateTime, default=func.now(), comment='爬取时间')
     page_count = Column(Integer, default=0, comment='爬取页数')
     total_results = Column(Integer, default=0, comment='总结果数')
+    last_create_time = Column(DateTime, comment='已爬取的最新回答创建时间（增量水位）')
+    last_answer_id = Column(String(50), comment='已爬取的最新回答ID（增量水位）')
+    next_cursor = Column(Text, comment='下一页的分页游标（paging.next），用于断点续爬')
+    page_index = Column(Integer, default=0, comment='已完成的页数，用于断点续爬')
+    status = Column(String(20), default='completed', comment='任务状态：running/paused/failed/completed')
     created_at = Column(DateTime, default=func.now(), comment='创建时间')
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), comment='更新时间')
     
@@ -86,6 +109,10 @@ class ContentScore(Base):
     内容评分数据模型，用于存储Agent对内容的评估结果
     """
     __tablename__ = 'content_scores'
+    # 每个内容只保留一条评分，批量保存时按该唯一索引upsert；已有数据库运行migrate_database.py去重并创建
+    __table_args__ = (
+        Index('uq_content_scores_content', 'content_id', 'content_type', unique=True),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     content_id = Column(String(50), nullable=False, comment='内容ID')
@@ -96,8 +123,72 @@ class ContentScore(Base):
     total_score = Column(Float, default=0.0, comment='总评分')
     evaluation_time = Column(DateTime, default=func.now(), comment='评估时间')
     evaluation_details = Column(Text, comment='评估详情')
+    content_hash = Column(String(32), comment='评估时内容的指纹，与内容当前指纹一致时无需重新评估')
     created_at = Column(DateTime, default=func.now(), comment='创建时间')
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), comment='更新时间')
     
     def __repr__(self):
         return f"<ContentScore(content_id='{self.content_id}', total_score={self.total_score})>"
+
+
+class HotListSnapshot(Base):
+    """
+    热榜快照头数据模型，每次轮询热榜记录一条，具体排名与热度只在hot_list_entries中记录变化
+    """
+    __tablename__ = 'hot_list_snapshots'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    snapshot_time = Column(DateTime, nullable=False, index=True, comment='快照时间（轮询时间）')
+    item_count = Column(Integer, default=0, comment='热榜条目数')
+    entry_count = Column(Integer, default=0, comment='本次记录的条目数（变化条目，关键帧为全部条目）')
+    is_keyframe = Column(Boolean, default=False, comment='是否为关键帧（记录完整热榜，重建时从最近的关键帧开始回放）')
+    created_at = Column(DateTime, default=func.now(), comment='创建时间')
+    
+    def __repr__(self):
+        return f"<HotListSnapshot(id={self.id}, snapshot_time='{self.snapshot_time}', entry_count={self.entry_count})>"
+
+
+class HotListEntry(Base):
+    """
+    热榜快照条目数据模型，记录问题相对上一次快照的排名与热度变化
+    """
+    __tablename__ = 'hot_list_entries'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    snapshot_id = Column(Integer, nullable=False, index=True, comment='关联的热榜快照ID')
+    question_id = Column(String(50), nullable=False, index=True, comment='知乎问题ID')
+    rank = Column(Integer, default=0, comment='排名（下榜条目为下榜前的排名）')
+    heat = Column(Integer, default=0, comment='热度值（如"4342 万热度"记为43420000）')
+    rank_delta = Column(Integer, comment='排名变化（上次排名减本次排名，正数为上升），新上榜为空')
+    heat_delta = Column(Integer, comment='热度变化，新上榜为空')
+    removed = Column(Boolean, default=False, comment='是否下榜')
+    
+    def __repr__(self):
+        return f"<HotListEntry(snapshot_id={self.snapshot_id}, question_id='{self.question_id}', rank={self.rank})>"
+
+
+class CrawlQueueItem(Base):
+    """
+    爬取工作队列条目数据模型，多个工作进程（可在共享存储卷的多台机器上）按租约领取关键词搜索任务
+    """
+    __tablename__ = 'crawl_queue'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    queue = Column(String(50), nullable=False, default='search', index=True, comment='队列名称')
+    keyword = Column(String(200), nullable=False, comment='搜索关键词')
+    payload = Column(Text, comment='任务参数（JSON），如max_pages、limit')
+    status = Column(String(20), nullable=False, default='pending', index=True,
+                    comment='状态：pending/leased/done/failed')
+    attempts = Column(Integer, default=0, comment='已领取次数')
+    lease_owner = Column(String(200), comment='持有租约的工作进程标识')
+    lease_token = Column(String(32), comment='租约令牌，续租、完成和失败时校验')
+    lease_expires_at = Column(DateTime, comment='租约到期时间（UTC），到期未完成的条目可被其他工作进程重新领取')
+    available_at = Column(DateTime, comment='最早可领取时间（UTC），失败重试时用于延迟')
+    search_task_id = Column(Integer, comment='关联的搜索任务ID，重新领取时从该任务的分页游标继续')
+    result = Column(Text, comment='执行结果（JSON）')
+    last_error = Column(Text, comment='最近一次失败的错误信息')
+    created_at = Column(DateTime, default=func.now(), comment='创建时间')
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), comment='更新时间')
+    
+    def __repr__(self):
+        return f"<CrawlQueueItem(id={self.id}, keyword='{self.keyword}', status='{self.status}')>"
@@ -0,0 +1,295 @@
+"""
+记录规范化模块，爬虫与存储层共用的批量规范化阶段
+
+爬虫解析出的原始字典在这里统一完成时间解析（带缓存的epoch/ISO快速路径）、类型转换和ID提取，
+输出QuestionRecord/AnswerRecord，存储层收到这两种记录时直接按列写入，不再逐行检查类型和重新解析时间；
+每条记录带有原始HTML的内容指纹（content_hash），指纹未变的条目可以跳过清理、入库和评估
+"""
+import hashlib
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+from dateutil import parser as date_parser
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 字符串时间的常见格式，按命中频率排列；fromisoformat无法处理时依次尝试，最后回退到dateutil
+_TIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y/%m/%d %H:%M:%S', '%Y-%m-%d')
+
+
+class QuestionRecord(dict):
+    """
+    规范化后的知乎问题记录，键与ZhihuQuestion的列一致（search_task_id除外），值的类型已确定：
+    
+    question_id/title/title_raw/url/rank_raw/metrics/metrics_raw/excerpt/excerpt_raw/content_hash为str，
+    rank为int，crawl_time为datetime
+    """
+
+
+class AnswerRecord(dict):
+    """
+    规范化后的知乎回答记录，值的类型已确定：
+    
+    answer_id/question_id/title/title_raw/author/content/content_raw/url/question_url/content_hash为str，
+    vote_up_count/comment_count为int，crawl_time为datetime，create_time为datetime，
+    create_time_estimated为bool（原始数据没有创建时间时create_time取爬取时间并标记为估计值），
+    content_cleaned为bool（内容指纹与已入库一致、未清理HTML的回答为False，title和content为空）
+    """
+
+
+QUESTION_STR_FIELDS = ('question_id', 'title', 'title_raw', 'url', 'rank_raw', 'metrics', 'metrics_raw',
+                       'excerpt', 'excerpt_raw', 'content_hash')
+ANSWER_STR_FIELDS = ('answer_id', 'question_id', 'title', 'title_raw', 'author', 'content', 'content_raw',
+                     'url', 'question_url', 'content_hash')
+
+
+def extract_id_from_url(url: str) -> str:
+    """
+    从知乎URL中提取末尾的ID，如 https://api.zhihu.com/answers/123?x=1 -> 123
+    
+    Args:
+        url (str): 知乎URL
+    
+    Returns:
+        str: ID，无法提取时返回空字符串
+    """
+    if not url:
+        return ''
+    return url.rstrip('/').split('/')[-1].split('?')[0]
+
+
+def content_fingerprint(*parts: str) -> str:
+    """
+    计算内容指纹：原始HTML的blake2b摘要，各部分之间加分隔符，避免拼接歧义
+    
+    Args:
+        *parts (str): 参与计算的原始HTML片段
+    
+    Returns:
+        str: 32个字符的十六进制摘要
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update((part or '').encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+def question_fingerprint(question: Dict[str, Any]) -> str:
+    """
+    计算问题的内容指纹，取标题和描述的原始HTML（热度和排名经常变化，不参与计算）
+    
+    Args:
+        question (Dict[str, Any]): 问题字典
+    
+    Returns:
+        str: 内容指纹
+    """
+    return content_fingerprint(question.get('title_raw') or question.get('title'),
+                               question.get('excerpt_raw') or question.get('excerpt'))
+
+
+def answer_fingerprint(content_raw: str) -> str:
+    """
+    计算回答的内容指纹，只取正文原始HTML（搜索结果的标题带有随关键词变化的高亮标签，不参与计算）
+    
+    Args:
+        content_raw (str): 回答正文原始HTML
+    
+    Returns:
+        str: 内容指纹
+    """
+    return content_fingerprint(content_raw)
+
+
+@lru_cache(maxsize=65536)
+def _parse_epoch(value: float) -> datetime:
+    """
+    解析Unix时间戳，同一批数据中重复的时间戳只转换一次
+    
+    Args:
+        value (float): 秒级时间戳（毫秒级会自动换算）
+    
+    Returns:
+        datetime: 本地时间
+    """
+    if value > 1e11:
+        value /= 1000.0
+    return datetime.fromtimestamp(value)
+
+
+@lru_cache(maxsize=65536)
+def _parse_time_string(value: str) -> Optional[datetime]:
+    """
+    解析时间字符串：纯数字按时间戳处理，其余依次尝试fromisoformat、常见格式和dateutil，结果按字符串缓存
+    
+    Args:
+        value (str): 时间字符串
+    
+    Returns:
+        Optional[datetime]: 本地时间（带时区的结果转换为本地时间后去掉时区），无法解析时返回None
+    """
+    value = value.strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return _parse_epoch(float(value))
+    
+    parsed = None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        for time_format in _TIME_FORMATS:
+            try:
+                parsed = datetime.strptime(value, time_format)
+                break
+            except ValueError:
+                continue
+        else:
+            try:
+                parsed = date_parser.parse(value)
+            except (ValueError, OverflowError) as e:
+                logger.warning(f"无法解析时间字符串: {value}，错误: {str(e)}")
+                return None
+    
+    # 统一为本地naive时间，避免与fromtimestamp得到的时间比较时报错
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """
+    把epoch时间戳、时间字符串或datetime统一解析为datetime
+    
+    Args:
+        value (Any): 原始时间值
+    
+    Returns:
+        Optional[datetime]: 解析结果，为空或无法解析时返回None
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        try:
+            return _parse_epoch(float(value))
+        except (ValueError, OverflowError, OSError):
+            logger.warning(f"无法解析时间戳: {value}")
+            return None
+    if isinstance(value, str):
+        return _parse_time_string(value)
+    logger.warning(f"不支持的时间类型: {type(value)}")
+    return None
+
+
+def _to_int(value: Any) -> int:
+    """
+    转换为整数，兼容"1,234"这类字符串，无法转换时返回0
+    
+    Args:
+        value (Any): 原始值
+    
+    Returns:
+        int: 整数值
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(float(value.replace(',', '').strip()))
+        except ValueError:
+            return 0
+    return 0
+
+
+def _to_str(value: Any) -> str:
+    """
+    转换为字符串，None转换为空字符串
+    
+    Args:
+        value (Any): 原始值
+    
+    Returns:
+        str: 字符串值
+    """
+    if isinstance(value, str):
+        return value
+    return '' if value is None else str(value)
+
+
+def normalize_questions(questions: Iterable[Dict[str, Any]],
+                        crawl_time: Optional[datetime] = None) -> List[QuestionRecord]:
+    """
+    批量规范化知乎问题，已规范化的记录原样返回
+    
+    Args:
+        questions (Iterable[Dict[str, Any]]): 原始问题字典
+        crawl_time (Optional[datetime], optional): 缺少crawl_time时使用的爬取时间，默认取当前时间（整批共用）. Defaults to None.
+    
+    Returns:
+        List[QuestionRecord]: 规范化后的问题记录
+    """
+    batch_time = crawl_time or datetime.now()
+    records = []
+    for question in questions:
+        if isinstance(question, QuestionRecord):
+            records.append(question)
+            continue
+        record = QuestionRecord((field, _to_str(question.get(field))) for field in QUESTION_STR_FIELDS)
+        if not record['question_id']:
+            record['question_id'] = extract_id_from_url(record['url'])
+        if not record['content_hash']:
+            record['content_hash'] = question_fingerprint(record)
+        record['rank'] = _to_int(question.get('rank'))
+        record['crawl_time'] = parse_timestamp(question.get('crawl_time')) or batch_time
+        records.append(record)
+    return records
+
+
+def normalize_answers(answers: Iterable[Dict[str, Any]],
+                      crawl_time: Optional[datetime] = None) -> List[AnswerRecord]:
+    """
+    批量规范化知乎回答，已规范化的记录原样返回
+    
+    - answer_id缺失时从url提取，question_id缺失时从question_url提取
+    - content_hash缺失时按正文原始HTML计算
+    - vote_up_count/comment_count转换为整数（也接受vote_up列名）
+    - create_time支持epoch秒/毫秒、纯数字字符串、ISO及常见格式字符串，缺失时取爬取时间并标记为估计值
+    
+    Args:
+        answers (Iterable[Dict[str, Any]]): 原始回答字典
+        crawl_time (Optional[datetime], optional): 缺少crawl_time时使用的爬取时间，默认取当前时间（整批共用）. Defaults to None.
+    
+    Returns:
+        List[AnswerRecord]: 规范化后的回答记录
+    """
+    batch_time = crawl_time or datetime.now()
+    records = []
+    for answer in answers:
+        if isinstance(answer, AnswerRecord):
+            records.append(answer)
+            continue
+        record = AnswerRecord((field, _to_str(answer.get(field))) for field in ANSWER_STR_FIELDS)
+        if not record['answer_id']:
+            record['answer_id'] = extract_id_from_url(record['url'])
+        if not record['question_id']:
+            record['question_id'] = extract_id_from_url(record['question_url'])
+        if not record['content_hash']:
+            record['content_hash'] = answer_fingerprint(record['content_raw'] or record['content'])
+        record['vote_up_count'] = _to_int(answer.get('vote_up_count', answer.get('vote_up')))
+        record['comment_count'] = _to_int(answer.get('comment_count'))
+        record['crawl_time'] = parse_timestamp(answer.get('crawl_time')) or batch_time
+        
+        create_time = parse_timestamp(answer.get('create_time'))
+        record['create_time_estimated'] = create_time is None or bool(answer.get('create_time_estimated'))
+        record['create_time'] = create_time or record['crawl_time']
+        record['content_cleaned'] = bool(answer.get('content_cleaned', True))
+        records.append(record)
+    return records
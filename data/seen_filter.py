@@ -0,0 +1,274 @@
+"""
+已见ID过滤器模块，进程内缓存已入库的问题ID和回答ID，爬虫在清理HTML、解析时间之前即可跳过已知条目
+
+支持两种模式：set（精确，内存随ID数量线性增长）和bloom（布隆过滤器，内存固定，
+有ERROR_RATE概率把新条目误判为已见），启动时从数据库预热，入库时由存储层更新；
+MATCH为content时按（ID, 内容指纹）匹配，只跳过内容未变化的条目，内容变化的条目重新清理并更新
+"""
+import hashlib
+import math
+import threading
+from typing import Any, Dict, Iterable, Optional
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 过滤器区分的ID类型
+SEEN_KINDS = ('question', 'answer')
+
+# 未配置时使用的默认参数
+DEFAULT_SEEN_FILTER_CONFIG = {
+    "MODE": "set",
+    "MATCH": "id",
+    "BLOOM_CAPACITY": 10_000_000,
+    "BLOOM_ERROR_RATE": 0.001,
+    "WARM_BATCH_SIZE": 10000,
+}
+
+
+class BloomFilter:
+    """
+    布隆过滤器，按预期容量和误判率计算位数组大小与哈希次数，使用双重哈希生成各位置
+    """
+    
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        初始化布隆过滤器
+        
+        Args:
+            capacity (int): 预期元素数量，超出后误判率上升
+            error_rate (float, optional): 容量内的目标误判率. Defaults to 0.001.
+        """
+        capacity = max(1, capacity)
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+    
+    def _positions(self, item: str):
+        """
+        计算元素对应的位位置
+        
+        Args:
+            item (str): 元素
+        
+        Yields:
+            int: 位位置
+        """
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+    
+    def add(self, item: str):
+        """
+        添加元素
+        
+        Args:
+            item (str): 元素
+        """
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self._count += 1
+    
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+    
+    def __len__(self) -> int:
+        # 添加次数（含重复添加），仅用于统计
+        return self._count
+    
+    @property
+    def memory_bytes(self) -> int:
+        """
+        位数组占用的字节数
+        
+        Returns:
+            int: 字节数
+        """
+        return len(self._bits)
+
+
+class SeenIdFilter:
+    """
+    按ID类型（question/answer）分别维护的已见ID过滤器，线程安全
+    """
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        初始化过滤器
+        
+        Args:
+            config (Optional[Dict[str, Any]], optional): SEEN_FILTER配置. Defaults to None.
+        
+        Raises:
+            ValueError: MODE或MATCH不支持
+        """
+        self.config = {**DEFAULT_SEEN_FILTER_CONFIG, **(config or {})}
+        self.mode = self.config['MODE']
+        if self.mode not in ('set', 'bloom'):
+            raise ValueError(f"不支持的已见ID过滤器模式: {self.mode}，可选: set、bloom")
+        self.match = self.config['MATCH']
+        if self.match not in ('id', 'content'):
+            raise ValueError(f"不支持的已见ID过滤器匹配方式: {self.match}，可选: id、content")
+        
+        self._lock = threading.Lock()
+        self._stores = {kind: self._new_store() for kind in SEEN_KINDS}
+        self._skipped = {kind: 0 for kind in SEEN_KINDS}
+        self.warmed = False
+    
+    def _new_store(self):
+        """
+        创建单个ID类型的存储
+        
+        Returns:
+            Union[set, BloomFilter]: 集合或布隆过滤器
+        """
+        if self.mode == 'bloom':
+            return BloomFilter(self.config['BLOOM_CAPACITY'], self.config['BLOOM_ERROR_RATE'])
+        return set()
+    
+    @property
+    def match_content(self) -> bool:
+        """
+        是否按内容指纹匹配
+        
+        Returns:
+            bool: MATCH为content时返回True
+        """
+        return self.match == 'content'
+    
+    def key(self, item_id: str, content_hash: Optional[str] = None) -> str:
+        """
+        生成过滤器中的键：按ID匹配时为ID，按内容匹配时为"ID:指纹"
+        
+        Args:
+            item_id (str): ID
+            content_hash (Optional[str], optional): 内容指纹. Defaults to None.
+        
+        Returns:
+            str: 键，ID为空时返回空字符串
+        """
+        if not item_id or not self.match_content:
+            return item_id or ''
+        return f"{item_id}:{content_hash or ''}"
+    
+    def contains(self, kind: str, item_id: str) -> bool:
+        """
+        判断键是否已见
+        
+        Args:
+            kind (str): ID类型，question或answer
+            item_id (str): 键，按内容匹配时应先用key()生成
+        
+        Returns:
+            bool: 是否已见，ID为空时返回False
+        """
+        return bool(item_id) and item_id in self._stores[kind]
+    
+    def add(self, kind: str, item_ids: Iterable[str]) -> int:
+        """
+        批量添加ID
+        
+        Args:
+            kind (str): ID类型，question或answer
+            item_ids (Iterable[str]): ID列表
+        
+        Returns:
+            int: 添加的ID数量（不含空ID）
+        """
+        store = self._stores[kind]
+        count = 0
+        with self._lock:
+            for item_id in item_ids:
+                if item_id:
+                    store.add(item_id)
+                    count += 1
+        return count
+    
+    def record_skipped(self, kind: str, count: int):
+        """
+        记录因已见而跳过的条目数
+        
+        Args:
+            kind (str): ID类型，question或answer
+            count (int): 跳过的条目数
+        """
+        with self._lock:
+            self._skipped[kind] += count
+    
+    def warm(self, storage, batch_size: Optional[int] = None) -> Dict[str, int]:
+        """
+        从数据库预热：流式读取zhihu_questions与zhihu_answers的ID和内容指纹
+        
+        Args:
+            storage (DataStorage): 存储实例
+            batch_size (Optional[int], optional): 每批读取的行数，默认使用WARM_BATCH_SIZE. Defaults to None.
+        
+        Returns:
+            Dict[str, int]: 各ID类型预热的数量
+        """
+        batch_size = batch_size or self.config['WARM_BATCH_SIZE']
+        counts = {
+            kind: self.add(kind, (self.key(item_id, content_hash)
+                                  for item_id, content_hash in storage.iter_known_ids(kind, batch_size)))
+            for kind in SEEN_KINDS
+        }
+        self.warmed = True
+        logger.info(f"已见ID过滤器预热完成（{self.mode}模式）: 问题 {counts['question']} 个，回答 {counts['answer']} 个")
+        return counts
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        获取过滤器状态
+        
+        Returns:
+            Dict[str, Any]: 模式、各类型的ID数量与跳过数量
+        """
+        with self._lock:
+            stats = {'mode': self.mode, 'match': self.match}
+            for kind in SEEN_KINDS:
+                store = self._stores[kind]
+                stats[kind] = {'ids': len(store), 'skipped': self._skipped[kind]}
+                if isinstance(store, BloomFilter):
+                    stats[kind]['memory_bytes'] = store.memory_bytes
+            return stats
+
+
+# 进程内共享的过滤器，按数据库连接URL索引
+_seen_filters: Dict[str, SeenIdFilter] = {}
+_seen_filter_lock = threading.Lock()
+
+
+def get_seen_filter(config: Optional[Dict[str, Any]], storage=None) -> Optional[SeenIdFilter]:
+    """
+    获取存储实例所用数据库对应的已见ID过滤器，每个数据库首次调用时创建并从该数据库预热，
+    并挂到存储实例上以便入库时更新（同一数据库的多个存储实例共用一个过滤器）
+    
+    Args:
+        config (Optional[Dict[str, Any]]): SEEN_FILTER配置，未启用时返回None
+        storage (DataStorage, optional): 预热和更新使用的存储实例，默认使用全局data_storage. Defaults to None.
+    
+    Returns:
+        Optional[SeenIdFilter]: 过滤器，未启用时返回None
+    """
+    if not config or not config.get('ENABLED'):
+        return None
+    if storage is None:
+        from data.storage import data_storage
+        storage = data_storage
+    
+    seen_filter = _seen_filters.get(storage.db_url)
+    if seen_filter is not None and storage.seen_filter is seen_filter:
+        return seen_filter
+    with _seen_filter_lock:
+        seen_filter = _seen_filters.get(storage.db_url)
+        if seen_filter is None:
+            seen_filter = SeenIdFilter(config)
+            storage.attach_seen_filter(seen_filter)
+            seen_filter.warm(storage)
+            _seen_filters[storage.db_url] = seen_filter
+        elif storage.seen_filter is not seen_filter:
+            storage.attach_seen_filter(seen_filter)
+    return seen_filter
@@ -1,16 +1,76 @@
 """
 数据存储管理模块，处理数据库连接和数据操作
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func, insert, inspect, or_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker, Session
-from typing import List, Dict, Any, Type, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Set, Tuple, Type, Optional, Union
 from datetime import datetime
-from data.models import Base, ZhihuQuestion, ZhihuAnswer, ContentScore, SearchTask
-from config.settings import DATABASE_URL
+from data.models import (Base, ZhihuQuestion, ZhihuAnswer, ContentScore, SearchTask, HotListSnapshot, HotListEntry,
+                         sqlite_connect_args)
+from data.hot_list import (DEFAULT_HOT_LIST_SNAPSHOT_CONFIG, HotListState, apply_hot_entries, build_hot_state,
+                           diff_hot_states, state_to_list)
+from data.records import AnswerRecord, normalize_answers, normalize_questions
+from config.settings import DATABASE_URL, STORAGE_CONFIG
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# 内容指纹变化时需要更新的列
+_QUESTION_CONTENT_COLUMNS = ('title', 'title_raw', 'excerpt', 'excerpt_raw', 'content_hash')
+_ANSWER_CONTENT_COLUMNS = ('title', 'title_raw', 'content', 'content_raw', 'content_hash')
+# 刷新互动数据时更新的回答列
+_ANSWER_METRIC_COLUMNS = ('vote_up', 'comment_count')
+
+# 支持INSERT ... ON CONFLICT的方言，其他数据库退回普通多行INSERT
+_UPSERT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+
+def _chunked(items: List[Any], size: int) -> Iterator[List[Any]]:
+    """
+    把列表按固定大小分块
+    
+    Args:
+        items (List[Any]): 列表
+        size (int): 每块大小
+    
+    Yields:
+        List[Any]: 分块
+    """
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _answer_columns(record: AnswerRecord, search_task_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    把规范化后的回答记录映射为ZhihuAnswer的列
+    
+    Args:
+        record (AnswerRecord): 规范化后的回答记录
+        search_task_id (Optional[int], optional): 关联的搜索任务ID. Defaults to None.
+    
+    Returns:
+        Dict[str, Any]: 列名到值的映射
+    """
+    return {
+        'answer_id': record['answer_id'],
+        'question_id': record['question_id'],
+        'title': record['title'],
+        'title_raw': record['title_raw'],
+        'author': record['author'],
+        'content': record['content'],
+        'content_raw': record['content_raw'],
+        'url': record['url'],
+        'question_url': record['question_url'],
+        'vote_up': record['vote_up_count'],
+        'comment_count': record['comment_count'],
+        'content_hash': record['content_hash'],
+        'create_time': record['create_time'],
+        'crawl_time': record['crawl_time'],
+        'search_task_id': search_task_id
+    }
+
 
 class DataStorage:
     """
@@ -27,6 +87,12 @@ class DataStorage:
         self.db_url = db_url
         self.engine = None
         self.SessionLocal = None
+        # 已见ID过滤器，挂上后每次入库都会把新ID加入过滤器
+        self.seen_filter = None
+        # 热榜快照配置
+        self.hot_list_config = {**DEFAULT_HOT_LIST_SNAPSHOT_CONFIG, **STORAGE_CONFIG.get('HOT_LIST_SNAPSHOT', {})}
+        # 批量入库时每块的行数，同时是IN查询的参数个数
+        self.bulk_chunk_size = STORAGE_CONFIG.get('BULK_CHUNK_SIZE', 500)
         
         # 初始化数据库连接
         self._init_db()
@@ -37,11 +103,17 @@ class DataStorage:
         """
         try:
             # 创建数据库引擎
-            self.engine = create_engine(self.db_url, echo=False)
+            self.engine = create_engine(self.db_url, echo=False, connect_args=sqlite_connect_args(self.db_url))
             
             # 创建表结构
             Base.metadata.create_all(bind=self.engine)
             
+            # 旧数据库的content_scores没有唯一索引时，批量保存评分退回先查询再插入/更新
+            self.content_score_upsert = self._has_content_score_unique_index()
+            if not self.content_score_upsert:
+                logger.warning("content_scores表缺少(content_id, content_type)唯一索引，"
+                               "请运行migrate_database.py去重并创建索引")
+            
             # 创建Session工厂
             self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
             
@@ -50,6 +122,17 @@ class DataStorage:
             logger.error(f"数据库初始化失败，错误: {str(e)}")
             raise
     
+    def _has_content_score_unique_index(self) -> bool:
+        """
+        检查content_scores表是否有(content_id, content_type)唯一索引
+        
+        Returns:
+            bool: 是否存在唯一索引
+        """
+        indexes = inspect(self.engine).get_indexes(ContentScore.__tablename__)
+        return any(index['unique'] and set(index['column_names']) == {'content_id', 'content_type'}
+                   for index in indexes)
+    
     def get_db(self) -> Session:
         """
         获取数据库会话
@@ -63,16 +146,22 @@ class DataStorage:
         finally:
             db.close()
     
-    def save_zhihu_questions(self, questions: List[Dict[str, Any]], search_task_id: int = None) -> int:
+    def save_zhihu_questions(self, questions: List[Dict[str, Any]], search_task_id: int = None,
+                             retry_on_conflict: bool = True) -> int:
         """
         保存知乎问题列表到数据库
         
         Args:
             questions (List[Dict[str, Any]]): 知乎问题列表
             search_task_id (int, optional): 关联的搜索任务ID. Defaults to None.
+            retry_on_conflict (bool, optional): 多个进程同时插入相同ID导致唯一约束冲突时重试一次，
+                重试时对方已提交的问题按已存在处理. Defaults to True.
+        
+        按BULK_CHUNK_SIZE分块，每块用一次IN查询取出已存在问题的内容指纹，新问题用一条多行INSERT写入，
+        已存在的问题内容指纹未变化时跳过，变化时按主键批量只更新标题、描述和指纹；同一批中重复的问题只保存第一条
         
         Returns:
-            int: 成功保存的问题数量
+            int: 成功保存的问题数量（新增，不含内容更新的已有问题）
         """
         if not questions:
             return 0
@@ -80,48 +169,64 @@ class DataStorage:
         db = next(self.get_db())
         saved_count = 0
         duplicate_count = 0
+        updated_count = 0
+        known_ids = []
         
         try:
-            for question_data in questions:
-                # 处理crawl_time字段，确保是datetime对象
-                crawl_time = question_data.get('crawl_time')
-                if crawl_time is not None:
-                    if isinstance(crawl_time, str):
-                        try:
-                            question_data['crawl_time'] = datetime.strptime(crawl_time, '%Y-%m-%d %H:%M:%S')
-                        except Exception as e:
-                            logger.warning(f"解析crawl_time字符串失败: {str(e)}，使用当前时间")
-                            question_data['crawl_time'] = datetime.now()
-                    elif not isinstance(crawl_time, datetime):
-                        logger.warning(f"crawl_time类型不支持: {type(crawl_time)}，使用当前时间")
-                        question_data['crawl_time'] = datetime.now()
-                else:
-                    question_data['crawl_time'] = datetime.now()
-                
-                # 添加搜索任务ID
-                if search_task_id:
-                    question_data['search_task_id'] = search_task_id
-                
-                # 检查问题是否已存在（去重逻辑）
-                existing = db.query(ZhihuQuestion).filter(
-                    ZhihuQuestion.question_id == question_data['question_id']
-                ).first()
-                
-                if existing:
-                    # 已存在，跳过保存
+            records = {}
+            for record in normalize_questions(questions):
+                if not record['question_id']:
+                    logger.warning(f"问题缺少question_id，跳过该条记录: {record['title'][:50]}")
+                    continue
+                if record['question_id'] in records:
                     duplicate_count += 1
-                    logger.debug(f"问题已存在，跳过保存: {question_data['question_id']}")
                     continue
+                records[record['question_id']] = record
+            
+            for chunk in _chunked(list(records.values()), self.bulk_chunk_size):
+                # 一次查询取出本块中已存在的问题
+                existing = {
+                    question_id: (row_id, content_hash)
+                    for row_id, question_id, content_hash in db.query(
+                        ZhihuQuestion.id, ZhihuQuestion.question_id, ZhihuQuestion.content_hash
+                    ).filter(ZhihuQuestion.question_id.in_([record['question_id'] for record in chunk]))
+                }
+                
+                new_rows = []
+                changed_rows = []
+                for record in chunk:
+                    known_ids.append((record['question_id'], record['content_hash']))
+                    found = existing.get(record['question_id'])
+                    if found is None:
+                        # 规范化记录的键即模型列，类型已确定，直接作为插入参数
+                        new_rows.append(dict(record, search_task_id=search_task_id))
+                    elif found[1] == record['content_hash']:
+                        # 已存在且内容未变化，跳过保存
+                        duplicate_count += 1
+                    else:
+                        # 内容指纹变化，只更新内容相关的列
+                        changed_rows.append({'id': found[0], **{column: record[column]
+                                                                for column in _QUESTION_CONTENT_COLUMNS}})
                 
-                # 创建新问题
-                question = ZhihuQuestion(**question_data)
-                db.add(question)
-                logger.debug(f"新增知乎问题: {question_data['title']}")
-                saved_count += 1
+                inserted = self._insert_new(db, ZhihuQuestion, 'question_id', new_rows)
+                saved_count += len(inserted)
+                duplicate_count += len(new_rows) - len(inserted)
+                if changed_rows:
+                    db.execute(update(ZhihuQuestion), changed_rows)
+                    updated_count += len(changed_rows)
             
             db.commit()
-            logger.info(f"成功保存 {saved_count} 个知乎问题，跳过 {duplicate_count} 个重复问题")
+            self._mark_seen('question', known_ids)
+            logger.info(f"成功保存 {saved_count} 个知乎问题，更新 {updated_count} 个内容变化的问题，"
+                        f"跳过 {duplicate_count} 个重复问题")
             return saved_count
+        except IntegrityError as e:
+            db.rollback()
+            if retry_on_conflict:
+                logger.warning("保存知乎问题时与其他进程写入冲突，重试一次")
+                return self.save_zhihu_questions(questions, search_task_id, retry_on_conflict=False)
+            logger.error(f"保存知乎问题失败，错误: {str(e)}")
+            return 0
         except Exception as e:
             db.rollback()
             logger.error(f"保存知乎问题失败，错误: {str(e)}")
@@ -129,109 +234,177 @@ class DataStorage:
         finally:
             db.close()
     
-    def save_zhihu_answers(self, answers: List[Dict[str, Any]], search_task_id: int = None) -> int:
+    def _insert_new(self, db: Session, model: Type[Base], key: str, rows: List[Dict[str, Any]]) -> Set[str]:
+        """
+        用一条多行INSERT写入新记录，SQLite/PostgreSQL上唯一键冲突的行（其他进程刚写入）直接忽略
+        
+        Args:
+            db (Session): 数据库会话
+            model (Type[Base]): 模型类
+            key (str): 唯一键列名，如question_id
+            rows (List[Dict[str, Any]]): 列名到值的映射，各行的键相同
+        
+        Returns:
+            Set[str]: 实际插入的唯一键
+        """
+        if not rows:
+            return set()
+        
+        # 使用表级Core语句，绕过ORM逐行收集参数的开销
+        table = model.__table__
+        dialect = self.engine.dialect.name
+        if dialect not in _UPSERT_INSERTS:
+            db.execute(insert(table), rows)
+            return {row[key] for row in rows}
+        
+        column = table.c[key]
+        statement = _UPSERT_INSERTS[dialect](table).on_conflict_do_nothing(index_elements=[column]).returning(column)
+        return set(db.execute(statement, rows).scalars())
+    
+    def _upsert_rows(self, db: Session, model: Type[Base], key: Union[str, Tuple[str, ...]], rows: List[Dict[str, Any]],
+                     update_columns: Tuple[str, ...]) -> bool:
+        """
+        用一条INSERT ... ON CONFLICT DO UPDATE写入记录：唯一键不存在时插入，存在时只更新update_columns和updated_at
+        
+        Args:
+            db (Session): 数据库会话
+            model (Type[Base]): 模型类
+            key (Union[str, Tuple[str, ...]]): 唯一键列名，如answer_id，组合唯一键传列名元组
+            rows (List[Dict[str, Any]]): 列名到值的映射，各行的键相同
+            update_columns (Tuple[str, ...]): 冲突时更新的列
+        
+        Returns:
+            bool: 是否已写入，数据库不支持ON CONFLICT时返回False，由调用方分别插入和更新
+        """
+        dialect = self.engine.dialect.name
+        if dialect not in _UPSERT_INSERTS:
+            return False
+        if not rows:
+            return True
+        
+        table = model.__table__
+        statement = _UPSERT_INSERTS[dialect](table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c[column] for column in ((key,) if isinstance(key, str) else key)],
+            set_={**{column: statement.excluded[column] for column in update_columns}, 'updated_at': func.now()}
+        )
+        db.execute(statement, rows)
+        return True
+    
+    def save_zhihu_answers(self, answers: List[Dict[str, Any]], search_task_id: int = None,
+                           retry_on_conflict: bool = True, refresh_metrics: Optional[bool] = None) -> int:
         """
         保存知乎回答列表到数据库
         
         Args:
             answers (List[Dict[str, Any]]): 知乎回答列表
             search_task_id (int, optional): 关联的搜索任务ID. Defaults to None.
+            retry_on_conflict (bool, optional): 多个进程同时插入相同ID导致唯一约束冲突时重试一次，
+                重试时对方已提交的回答按已存在处理. Defaults to True.
+            refresh_metrics (Optional[bool], optional): 是否刷新已存在回答的点赞数和评论数，
+                默认使用REFRESH_ANSWER_METRICS配置. Defaults to None.
+        
+        按BULK_CHUNK_SIZE分块，每块用一次IN查询取出已存在回答的内容指纹和互动数据，新回答用一条多行INSERT写入，
+        已存在的回答内容指纹未变化时跳过，变化时按主键批量只更新标题、正文和指纹；
+        刷新互动数据时，新回答与点赞数/评论数变化的已有回答合并为一条INSERT ... ON CONFLICT DO UPDATE
         
         Returns:
-            int: 成功保存的回答数量
+            int: 成功保存的回答数量（新增，不含内容或互动数据更新的已有回答）
         """
         if not answers:
             return 0
+        if refresh_metrics is None:
+            refresh_metrics = STORAGE_CONFIG.get('REFRESH_ANSWER_METRICS', False)
         
         db = next(self.get_db())
         saved_count = 0
         duplicate_count = 0
+        updated_count = 0
+        refreshed_count = 0
+        known_ids = []
         
         try:
-            for answer_data in answers:
-                # 从URL中提取answer_id
-                url = answer_data.get('url', '')
-                answer_id = ''
-                if url:
-                    try:
-                        answer_id = url.split('/')[-1].split('?')[0]
-                    except Exception:
-                        pass
-                
-                if not answer_id:
-                    logger.warning(f"无法从URL提取answer_id，跳过该条记录")
+            records = {}
+            for record in normalize_answers(answers):
+                if not record['answer_id']:
+                    logger.warning("无法从URL提取answer_id，跳过该条记录")
                     continue
-                
-                # 检查回答是否已存在（去重逻辑）
-                existing = db.query(ZhihuAnswer).filter(
-                    ZhihuAnswer.answer_id == answer_id
-                ).first()
-                
-                if existing:
-                    # 已存在，跳过保存
+                if record['answer_id'] in records:
                     duplicate_count += 1
-                    logger.debug(f"回答已存在，跳过保存: {answer_id}")
                     continue
-                
-                # 构建保存数据
-                save_data = {
-                    'answer_id': answer_id,
-                    'question_id': answer_data.get('question_id', ''),
-                    'title': answer_data.get('title', ''),
-                    'title_raw': answer_data.get('title_raw', ''),
-                    'author': answer_data.get('author', ''),
-                    'content': answer_data.get('content', ''),
-                    'content_raw': answer_data.get('content_raw', ''),
-                    'url': url,
-                    'question_url': answer_data.get('question_url', ''),
-                    'vote_up': answer_data.get('vote_up_count', 0),
-                    'comment_count': answer_data.get('comment_count', 0),
-                    'search_task_id': search_task_id
+                records[record['answer_id']] = record
+            
+            for chunk in _chunked(list(records.values()), self.bulk_chunk_size):
+                # 一次查询取出本块中已存在的回答
+                existing = {
+                    row.answer_id: row
+                    for row in db.query(
+                        ZhihuAnswer.id, ZhihuAnswer.answer_id, ZhihuAnswer.content_hash,
+                        ZhihuAnswer.vote_up, ZhihuAnswer.comment_count
+                    ).filter(ZhihuAnswer.answer_id.in_([record['answer_id'] for record in chunk]))
                 }
                 
-                # 处理create_time字段，确保是datetime对象
-                create_time = answer_data.get('create_time')
-                if create_time is not None:
-                    if isinstance(create_time, str):
-                        try:
-                            save_data['create_time'] = datetime.strptime(create_time, '%Y-%m-%d %H:%M:%S')
-                        except Exception:
-                            try:
-                                from dateutil import parser
-                                save_data['create_time'] = parser.parse(create_time)
-                            except Exception as e:
-                                logger.warning(f"解析create_time字符串失败: {str(e)}，不设置create_time")
-                    elif isinstance(create_time, datetime):
-                        save_data['create_time'] = create_time
-                    else:
-                        logger.warning(f"create_time类型不支持: {type(create_time)}，不设置create_time")
+                new_rows = []
+                changed_rows = []
+                metric_rows = []
+                for record in chunk:
+                    answer_id = record['answer_id']
+                    found = existing.get(answer_id)
+                    if not record.get('content_cleaned', True) and (found is None
+                                                                    or found.content_hash != record['content_hash']):
+                        # 爬虫按查询时的指纹跳过了HTML清理，之后该回答被其他进程删除或更新，不能写入空的标题和正文
+                        duplicate_count += 1
+                        continue
+                    known_ids.append((answer_id, record['content_hash']))
+                    if found is None:
+                        # 规范化记录的类型已确定，直接映射到模型列
+                        new_rows.append(_answer_columns(record, search_task_id))
+                        continue
+                    
+                    metrics_changed = (found.vote_up, found.comment_count) != (record['vote_up_count'],
+                                                                               record['comment_count'])
+                    if refresh_metrics and metrics_changed:
+                        metric_rows.append(_answer_columns(record, search_task_id))
+                    if found.content_hash != record['content_hash']:
+                        # 内容指纹变化，只更新内容相关的列
+                        changed_rows.append({'id': found.id, **{column: record[column]
+                                                                for column in _ANSWER_CONTENT_COLUMNS}})
+                    elif not (refresh_metrics and metrics_changed):
+                        # 已存在且内容未变化，跳过保存
+                        duplicate_count += 1
                 
-                # 处理crawl_time字段，确保是datetime对象
-                crawl_time = answer_data.get('crawl_time')
-                if crawl_time is not None:
-                    if isinstance(crawl_time, str):
-                        try:
-                            save_data['crawl_time'] = datetime.strptime(crawl_time, '%Y-%m-%d %H:%M:%S')
-                        except Exception as e:
-                            logger.warning(f"解析crawl_time字符串失败: {str(e)}，使用当前时间")
-                            save_data['crawl_time'] = datetime.now()
-                    elif isinstance(crawl_time, datetime):
-                        save_data['crawl_time'] = crawl_time
-                    else:
-                        logger.warning(f"crawl_time类型不支持: {type(crawl_time)}，使用当前时间")
-                        save_data['crawl_time'] = datetime.now()
+                if refresh_metrics and self._upsert_rows(db, ZhihuAnswer, 'answer_id', new_rows + metric_rows,
+                                                         _ANSWER_METRIC_COLUMNS):
+                    # 以查询结果区分新增与刷新，与其他进程并发写入的少量回答会计为新增
+                    saved_count += len(new_rows)
                 else:
-                    save_data['crawl_time'] = datetime.now()
-                
-                # 创建新回答
-                answer = ZhihuAnswer(**save_data)
-                db.add(answer)
-                logger.debug(f"新增知乎回答: {answer_id}")
-                saved_count += 1
+                    inserted = self._insert_new(db, ZhihuAnswer, 'answer_id', new_rows)
+                    saved_count += len(inserted)
+                    duplicate_count += len(new_rows) - len(inserted)
+                    if metric_rows:
+                        db.execute(update(ZhihuAnswer), [
+                            {'id': existing[row['answer_id']].id, 'vote_up': row['vote_up'],
+                             'comment_count': row['comment_count']}
+                            for row in metric_rows
+                        ])
+                refreshed_count += len(metric_rows)
+                if changed_rows:
+                    db.execute(update(ZhihuAnswer), changed_rows)
+                    updated_count += len(changed_rows)
             
             db.commit()
-            logger.info(f"成功保存 {saved_count} 个知乎回答，跳过 {duplicate_count} 个重复回答")
+            self._mark_seen('answer', known_ids)
+            logger.info(f"成功保存 {saved_count} 个知乎回答，更新 {updated_count} 个内容变化的回答，"
+                        f"刷新 {refreshed_count} 个回答的互动数据，跳过 {duplicate_count} 个重复回答")
             return saved_count
+        except IntegrityError as e:
+            db.rollback()
+            if retry_on_conflict:
+                logger.warning("保存知乎回答时与其他进程写入冲突，重试一次")
+                return self.save_zhihu_answers(answers, search_task_id, retry_on_conflict=False,
+                                               refresh_metrics=refresh_metrics)
+            logger.error(f"保存知乎回答失败，错误: {str(e)}")
+            return 0
         except Exception as e:
             db.rollback()
             logger.error(f"保存知乎回答失败，错误: {str(e)}")
@@ -239,7 +412,172 @@ class DataStorage:
         finally:
             db.close()
     
-    def save_search_task(self, keyword: str, page_count: int = 0, total_results: int = 0) -> int:
+    def attach_seen_filter(self, seen_filter):
+        """
+        挂上已见ID过滤器，之后每次入库提交成功都会把新增和已存在的ID加入过滤器
+        
+        Args:
+            seen_filter (SeenIdFilter): 已见ID过滤器
+        """
+        self.seen_filter = seen_filter
+    
+    def _mark_seen(self, kind: str, items: List[Tuple[str, str]]):
+        """
+        把已入库的条目加入已见ID过滤器
+        
+        Args:
+            kind (str): ID类型，question或answer
+            items (List[Tuple[str, str]]): （ID, 内容指纹）列表
+        """
+        if self.seen_filter is not None and items:
+            self.seen_filter.add(kind, (self.seen_filter.key(item_id, content_hash) for item_id, content_hash in items))
+    
+    def iter_known_ids(self, kind: str, batch_size: int = 10000) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        流式读取已入库的问题或回答的ID与内容指纹，用于预热已见ID过滤器
+        
+        Args:
+            kind (str): ID类型，question或answer
+            batch_size (int, optional): 每批读取的行数. Defaults to 10000.
+        
+        Yields:
+            Tuple[str, Optional[str]]: （ID, 内容指纹），迁移前入库的行指纹为None
+        """
+        model = ZhihuQuestion if kind == 'question' else ZhihuAnswer
+        id_column = ZhihuQuestion.question_id if kind == 'question' else ZhihuAnswer.answer_id
+        db = next(self.get_db())
+        
+        try:
+            for row in db.query(id_column, model.content_hash).yield_per(batch_size):
+                yield row[0], row[1]
+        except Exception as e:
+            logger.error(f"读取已入库的{kind} ID失败，错误: {str(e)}")
+        finally:
+            db.close()
+    
+    def get_existing_answer_ids(self, answer_ids: Iterable[str], chunk_size: int = 500) -> Set[str]:
+        """
+        查询给定回答ID中已存在于zhihu_answers的部分，按块执行IN查询以避开SQLite的参数数量上限
+        
+        Args:
+            answer_ids (Iterable[str]): 回答ID列表
+            chunk_size (int, optional): 每次IN查询的ID数量. Defaults to 500.
+        
+        Returns:
+            Set[str]: 已存在的回答ID集合
+        """
+        answer_ids = list(dict.fromkeys(answer_ids))
+        existing_ids = set()
+        if not answer_ids:
+            return existing_ids
+        
+        db = next(self.get_db())
+        
+        try:
+            for start in range(0, len(answer_ids), chunk_size):
+                chunk = answer_ids[start:start + chunk_size]
+                rows = db.query(ZhihuAnswer.answer_id).filter(ZhihuAnswer.answer_id.in_(chunk)).all()
+                existing_ids.update(row[0] for row in rows)
+            return existing_ids
+        except Exception as e:
+            logger.error(f"查询已存在的回答ID失败，错误: {str(e)}")
+            return existing_ids
+        finally:
+            db.close()
+    
+    def get_answer_content_hashes(self, answer_ids: Iterable[str], chunk_size: int = 500) -> Dict[str, Optional[str]]:
+        """
+        查询已入库回答的内容指纹，按块执行IN查询，爬虫据此跳过内容未变化回答的HTML清理
+        
+        Args:
+            answer_ids (Iterable[str]): 回答ID列表
+            chunk_size (int, optional): 每次IN查询的ID数量. Defaults to 500.
+        
+        Returns:
+            Dict[str, Optional[str]]: 已入库的回答ID到内容指纹的映射，未入库的ID不在结果中
+        """
+        answer_ids = list(dict.fromkeys(answer_id for answer_id in answer_ids if answer_id))
+        hashes = {}
+        if not answer_ids:
+            return hashes
+        
+        db = next(self.get_db())
+        
+        try:
+            for start in range(0, len(answer_ids), chunk_size):
+                chunk = answer_ids[start:start + chunk_size]
+                rows = db.query(ZhihuAnswer.answer_id, ZhihuAnswer.content_hash).filter(
+                    ZhihuAnswer.answer_id.in_(chunk)
+                ).all()
+                hashes.update((answer_id, content_hash) for answer_id, content_hash in rows)
+            return hashes
+        except Exception as e:
+            logger.error(f"查询已入库回答的指纹失败，错误: {str(e)}")
+            return hashes
+        finally:
+            db.close()
+    
+    def get_scored_content_hashes(self, content_type: str, content_ids: Iterable[str],
+                                  chunk_size: int = 500) -> Dict[str, Optional[str]]:
+        """
+        查询已评估内容在评估时的内容指纹，按块执行IN查询
+        
+        Args:
+            content_type (str): 内容类型，question或answer
+            content_ids (Iterable[str]): 内容ID列表
+            chunk_size (int, optional): 每次IN查询的ID数量. Defaults to 500.
+        
+        Returns:
+            Dict[str, Optional[str]]: 已评估的内容ID到评估时指纹的映射，未评估的ID不在结果中
+        """
+        content_ids = list(dict.fromkeys(content_ids))
+        hashes = {}
+        if not content_ids:
+            return hashes
+        
+        db = next(self.get_db())
+        
+        try:
+            for start in range(0, len(content_ids), chunk_size):
+                chunk = content_ids[start:start + chunk_size]
+                rows = db.query(ContentScore.content_id, ContentScore.content_hash).filter(
+                    ContentScore.content_type == content_type,
+                    ContentScore.content_id.in_(chunk)
+                ).all()
+                hashes.update((content_id, content_hash) for content_id, content_hash in rows)
+            return hashes
+        except Exception as e:
+            logger.error(f"查询已评估内容的指纹失败，错误: {str(e)}")
+            return hashes
+        finally:
+            db.close()
+    
+    def filter_unscored(self, content_type: str, contents: List[Dict[str, Any]],
+                        id_key: str = 'id', hash_key: str = 'content_hash') -> List[Dict[str, Any]]:
+        """
+        过滤出需要评估的内容：从未评估过，或内容指纹与评估时不同；没有指纹的内容总是需要评估
+        
+        Args:
+            content_type (str): 内容类型，question或answer
+            contents (List[Dict[str, Any]]): 待评估内容
+            id_key (str, optional): 内容ID的键. Defaults to 'id'.
+            hash_key (str, optional): 内容指纹的键. Defaults to 'content_hash'.
+        
+        Returns:
+            List[Dict[str, Any]]: 需要评估的内容，顺序不变
+        """
+        scored = self.get_scored_content_hashes(content_type, (content[id_key] for content in contents))
+        pending = [
+            content for content in contents
+            if not content.get(hash_key) or scored.get(content[id_key], '') != content[hash_key]
+        ]
+        if len(pending) < len(contents):
+            logger.info(f"{len(contents) - len(pending)} 个{content_type}内容未变化且已评估，跳过")
+        return pending
+    
+    def save_search_task(self, keyword: str, page_count: int = 0, total_results: int = 0,
+                         last_create_time: datetime = None, last_answer_id: str = None,
+                         status: str = 'completed') -> int:
         """
         保存搜索任务到数据库
         
@@ -247,6 +585,9 @@ class DataStorage:
             keyword (str): 搜索关键词
             page_count (int, optional): 爬取页数. Defaults to 0.
             total_results (int, optional): 总结果数. Defaults to 0.
+            last_create_time (datetime, optional): 已爬取的最新回答创建时间（增量水位）. Defaults to None.
+            last_answer_id (str, optional): 已爬取的最新回答ID（增量水位）. Defaults to None.
+            status (str, optional): 任务状态，分页爬取中的任务为running. Defaults to 'completed'.
         
         Returns:
             int: 搜索任务ID
@@ -258,7 +599,10 @@ class DataStorage:
             search_task = SearchTask(
                 keyword=keyword,
                 page_count=page_count,
-                total_results=total_results
+                total_results=total_results,
+                last_create_time=last_create_time,
+                last_answer_id=last_answer_id,
+                status=status
             )
             
             db.add(search_task)
@@ -273,47 +617,437 @@ class DataStorage:
         finally:
             db.close()
     
-    def save_content_score(self, score_data: Dict[str, Any]) -> bool:
+    def get_search_task(self, search_task_id: int) -> Optional[SearchTask]:
         """
-        保存内容评分到数据库
+        根据ID获取搜索任务
         
         Args:
-            score_data (Dict[str, Any]): 内容评分数据
+            search_task_id (int): 搜索任务ID
         
         Returns:
-            bool: 是否保存成功
+            Optional[SearchTask]: 搜索任务对象，不存在则返回None
         """
         db = next(self.get_db())
         
         try:
-            # 检查评分是否已存在
-            existing = db.query(ContentScore).filter(
-                ContentScore.content_id == score_data['content_id'],
-                ContentScore.content_type == score_data['content_type']
-            ).first()
+            return db.query(SearchTask).filter(SearchTask.id == search_task_id).first()
+        except Exception as e:
+            logger.error(f"获取搜索任务失败，错误: {str(e)}")
+            return None
+        finally:
+            db.close()
+    
+    def update_search_task(self, search_task_id: int, **fields) -> bool:
+        """
+        更新搜索任务的字段
+        
+        Args:
+            search_task_id (int): 搜索任务ID
+            **fields: 要更新的字段及其值，如page_count、total_results
+        
+        Returns:
+            bool: 是否更新成功
+        """
+        db = next(self.get_db())
+        
+        try:
+            search_task = db.query(SearchTask).filter(SearchTask.id == search_task_id).first()
+            if not search_task:
+                logger.warning(f"搜索任务不存在，任务ID: {search_task_id}")
+                return False
             
-            if existing:
-                # 更新现有评分
-                for key, value in score_data.items():
-                    if hasattr(existing, key):
-                        setattr(existing, key, value)
-                logger.debug(f"更新内容评分: {score_data['content_id']}")
-            else:
-                # 创建新评分
-                score = ContentScore(**score_data)
-                db.add(score)
-                logger.debug(f"新增内容评分: {score_data['content_id']}")
+            for key, value in fields.items():
+                setattr(search_task, key, value)
             
             db.commit()
-            logger.info(f"成功保存内容评分: {score_data['content_id']}")
+            logger.debug(f"成功更新搜索任务，任务ID: {search_task_id}")
             return True
         except Exception as e:
             db.rollback()
-            logger.error(f"保存内容评分失败，错误: {str(e)}")
+            logger.error(f"更新搜索任务失败，错误: {str(e)}")
             return False
         finally:
             db.close()
     
+    def save_search_pages(self, pages: Iterable[Dict[str, Any]], search_task_id: int = None) -> int:
+        """
+        逐页保存搜索结果，每页在一个事务中批量写入，适用于ZhihuCrawler.iter_search_pages等按页产出的生成器；
+        中途失败时已写入的页面不受影响
+        
+        Args:
+            pages (Iterable[Dict[str, Any]]): 页面迭代器，每页包含results列表
+            search_task_id (int, optional): 关联的搜索任务ID. Defaults to None.
+        
+        Returns:
+            int: 成功保存的回答总数
+        """
+        saved_count = 0
+        
+        for page in pages:
+            page_saved = self.save_zhihu_answers(page['results'], search_task_id) if page['results'] else 0
+            saved_count += page_saved
+            logger.info(f"第 {page.get('page')} 页已保存 {page_saved} 条结果，累计 {saved_count} 条")
+        
+        return saved_count
+    
+    def get_paused_search_task(self, keyword: str) -> Optional[SearchTask]:
+        """
+        获取关键词最近一个因达到max_pages暂停的搜索任务
+        
+        Args:
+            keyword (str): 搜索关键词
+        
+        Returns:
+            Optional[SearchTask]: 暂停的搜索任务，没有时返回None
+        """
+        db = next(self.get_db())
+        
+        try:
+            return db.query(SearchTask).filter(
+                SearchTask.keyword == keyword,
+                SearchTask.status == 'paused'
+            ).order_by(SearchTask.id.desc()).first()
+        except Exception as e:
+            logger.error(f"获取暂停的搜索任务失败，错误: {str(e)}")
+            return None
+        finally:
+            db.close()
+    
+    def get_search_watermark(self, keyword: str, before_task_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        获取关键词最近一次搜索记录的增量水位
+        
+        只有已完成的任务才能作为水位：因达到max_pages暂停的任务在其分页游标之后还有未爬取的较旧页面，
+        用它作为水位会让这些页面永远不被爬取，暂停任务由search_incremental先续爬完成
+        
+        Args:
+            keyword (str): 搜索关键词
+            before_task_id (Optional[int], optional): 只取ID小于该值的任务，续爬任务时用于还原任务首次执行时的水位，
+                避免用任务自己记录的最新条目截断其较旧页面. Defaults to None.
+        
+        Returns:
+            Optional[Dict[str, Any]]: 包含create_time和answer_id的水位，没有记录时返回None
+        """
+        db = next(self.get_db())
+        
+        try:
+            # 运行中、暂停和失败的任务可能还有较旧的页面没有爬取，不作为水位
+            query = db.query(SearchTask).filter(
+                SearchTask.keyword == keyword,
+                SearchTask.last_create_time.isnot(None),
+                or_(SearchTask.status == 'completed', SearchTask.status.is_(None))
+            )
+            if before_task_id is not None:
+                query = query.filter(SearchTask.id < before_task_id)
+            search_task = query.order_by(SearchTask.last_create_time.desc()).first()
+            
+            if not search_task:
+                logger.info(f"关键词 {keyword} 没有增量水位记录，将全量搜索")
+                return None
+            
+            logger.info(f"关键词 {keyword} 的增量水位: {search_task.last_create_time}，回答ID: {search_task.last_answer_id}")
+            return {
+                'create_time': search_task.last_create_time,
+                'answer_id': search_task.last_answer_id
+            }
+        except Exception as e:
+            logger.error(f"获取增量水位失败，错误: {str(e)}")
+            return None
+        finally:
+            db.close()
+    
+    def _rebuild_hot_state(self, db: Session, snapshot: HotListSnapshot) -> Tuple[HotListState, Dict[str, Dict[str, Any]]]:
+        """
+        从最近的关键帧开始回放，重建指定快照时刻的热榜状态
+        
+        Args:
+            db (Session): 数据库会话
+            snapshot (HotListSnapshot): 目标快照
+        
+        Returns:
+            Tuple[HotListState, Dict[str, Dict[str, Any]]]: 热榜状态，以及目标快照记录的在榜条目（按问题ID索引）
+        """
+        keyframe = db.query(HotListSnapshot).filter(
+            HotListSnapshot.is_keyframe.is_(True),
+            HotListSnapshot.id <= snapshot.id
+        ).order_by(HotListSnapshot.id.desc()).first()
+        
+        entries = db.query(HotListEntry).filter(
+            HotListEntry.snapshot_id >= (keyframe.id if keyframe else 0),
+            HotListEntry.snapshot_id <= snapshot.id
+        ).order_by(HotListEntry.snapshot_id, HotListEntry.id).all()
+        
+        state = apply_hot_entries({}, entries)
+        changes = {
+            entry.question_id: {'rank_delta': entry.rank_delta, 'heat_delta': entry.heat_delta}
+            for entry in entries if entry.snapshot_id == snapshot.id and not entry.removed
+        }
+        return state, changes
+    
+    def save_hot_list_snapshot(self, questions: List[Dict[str, Any]], snapshot_time: datetime = None,
+                               save_questions: bool = True) -> Dict[str, Any]:
+        """
+        保存一次热榜轮询的快照：只记录相对上次快照的变化，每KEYFRAME_INTERVAL次记录一次完整热榜
+        
+        Args:
+            questions (List[Dict[str, Any]]): 热门问题列表，如ZhihuCrawler.get_hot_questions的结果
+            snapshot_time (datetime, optional): 快照时间，默认取当前时间. Defaults to None.
+            save_questions (bool, optional): 是否同时保存新上榜的问题（标题、链接等）到zhihu_questions. Defaults to True.
+        
+        Returns:
+            Dict[str, Any]: 包含snapshot_id、is_keyframe、item_count、entry_count和saved_questions，保存失败时snapshot_id为0
+        """
+        records = normalize_questions(questions)
+        saved_questions = self.save_zhihu_questions(records) if save_questions and records else 0
+        current = build_hot_state(records)
+        summary = {'snapshot_id': 0, 'is_keyframe': False, 'item_count': len(current), 'entry_count': 0,
+                   'saved_questions': saved_questions}
+        
+        db = next(self.get_db())
+        
+        try:
+            latest = db.query(HotListSnapshot).order_by(HotListSnapshot.id.desc()).first()
+            previous = self._rebuild_hot_state(db, latest)[0] if latest else {}
+            
+            # 距离上一个关键帧达到间隔时记录完整热榜，限制重建时的回放长度
+            last_keyframe = db.query(HotListSnapshot).filter(
+                HotListSnapshot.is_keyframe.is_(True)
+            ).order_by(HotListSnapshot.id.desc()).first()
+            since_keyframe = db.query(HotListSnapshot).filter(
+                HotListSnapshot.id > last_keyframe.id
+            ).count() if last_keyframe else 0
+            is_keyframe = last_keyframe is None or since_keyframe + 1 >= self.hot_list_config['KEYFRAME_INTERVAL']
+            
+            entries = diff_hot_states(previous, current, self.hot_list_config['HEAT_CHANGE_THRESHOLD'], is_keyframe)
+            snapshot = HotListSnapshot(
+                snapshot_time=snapshot_time or datetime.now(),
+                item_count=len(current),
+                entry_count=len(entries),
+                is_keyframe=is_keyframe
+            )
+            db.add(snapshot)
+            db.flush()
+            
+            db.bulk_insert_mappings(HotListEntry, [dict(entry, snapshot_id=snapshot.id) for entry in entries])
+            db.commit()
+            
+            summary.update(snapshot_id=snapshot.id, is_keyframe=is_keyframe, entry_count=len(entries))
+            logger.info(f"成功保存热榜快照，快照ID: {snapshot.id}，在榜 {len(current)} 条，"
+                        f"记录 {len(entries)} 条{'（关键帧）' if is_keyframe else '变化'}")
+            return summary
+        except Exception as e:
+            db.rollback()
+            logger.error(f"保存热榜快照失败，错误: {str(e)}")
+            return summary
+        finally:
+            db.close()
+    
+    def get_hot_list_snapshots(self, start: datetime = None, end: datetime = None,
+                               limit: int = 100) -> List[HotListSnapshot]:
+        """
+        获取时间范围内的热榜快照头，按快照时间升序排列
+        
+        Args:
+            start (datetime, optional): 开始时间（含）. Defaults to None.
+            end (datetime, optional): 结束时间（含）. Defaults to None.
+            limit (int, optional): 返回数量限制. Defaults to 100.
+        
+        Returns:
+            List[HotListSnapshot]: 热榜快照头列表
+        """
+        db = next(self.get_db())
+        
+        try:
+            query = db.query(HotListSnapshot)
+            if start:
+                query = query.filter(HotListSnapshot.snapshot_time >= start)
+            if end:
+                query = query.filter(HotListSnapshot.snapshot_time <= end)
+            return query.order_by(HotListSnapshot.snapshot_time, HotListSnapshot.id).limit(limit).all()
+        except Exception as e:
+            logger.error(f"获取热榜快照失败，错误: {str(e)}")
+            return []
+        finally:
+            db.close()
+    
+    def get_hot_list_at(self, at: datetime = None, snapshot_id: int = None) -> Optional[Dict[str, Any]]:
+        """
+        重建指定时刻（或指定快照）的完整热榜
+        
+        Args:
+            at (datetime, optional): 时间点，取该时间之前最近的一次快照，默认取最新快照. Defaults to None.
+            snapshot_id (int, optional): 快照ID，指定时忽略at. Defaults to None.
+        
+        Returns:
+            Optional[Dict[str, Any]]: 包含snapshot_id、snapshot_time和items（按排名排序，每项包含question_id、title、
+                url、rank、heat、rank_delta、heat_delta，新上榜的变化为None），没有快照时返回None
+        """
+        db = next(self.get_db())
+        
+        try:
+            query = db.query(HotListSnapshot)
+            if snapshot_id is not None:
+                query = query.filter(HotListSnapshot.id == snapshot_id)
+            elif at is not None:
+                query = query.filter(HotListSnapshot.snapshot_time <= at)
+            snapshot = query.order_by(HotListSnapshot.snapshot_time.desc(), HotListSnapshot.id.desc()).first()
+            
+            if not snapshot:
+                logger.info(f"没有找到热榜快照，时间点: {at}，快照ID: {snapshot_id}")
+                return None
+            
+            state, changes = self._rebuild_hot_state(db, snapshot)
+            items = state_to_list(state, changes)
+            
+            # 一次查询补全问题标题和链接
+            questions = {
+                question_id: (title, url) for question_id, title, url in db.query(
+                    ZhihuQuestion.question_id, ZhihuQuestion.title, ZhihuQuestion.url
+                ).filter(ZhihuQuestion.question_id.in_(list(state)))
+            } if state else {}
+            for item in items:
+                item['title'], item['url'] = questions.get(item['question_id'], ('', ''))
+            
+            return {
+                'snapshot_id': snapshot.id,
+                'snapshot_time': snapshot.snapshot_time,
+                'items': items
+            }
+        except Exception as e:
+            logger.error(f"重建热榜失败，错误: {str(e)}")
+            return None
+        finally:
+            db.close()
+    
+    def get_question_hot_history(self, question_id: str, start: datetime = None,
+                                 end: datetime = None) -> List[Dict[str, Any]]:
+        """
+        获取问题在热榜上的排名与热度变化记录，只包含发生变化（及关键帧）的快照，相邻记录之间排名与热度保持不变
+        
+        Args:
+            question_id (str): 知乎问题ID
+            start (datetime, optional): 开始时间（含）. Defaults to None.
+            end (datetime, optional): 结束时间（含）. Defaults to None.
+        
+        Returns:
+            List[Dict[str, Any]]: 按快照时间升序排列，每项包含snapshot_id、snapshot_time、rank、heat、
+                rank_delta、heat_delta和removed
+        """
+        db = next(self.get_db())
+        
+        try:
+            query = db.query(HotListEntry, HotListSnapshot.snapshot_time).join(
+                HotListSnapshot, HotListSnapshot.id == HotListEntry.snapshot_id
+            ).filter(HotListEntry.question_id == question_id)
+            if start:
+                query = query.filter(HotListSnapshot.snapshot_time >= start)
+            if end:
+                query = query.filter(HotListSnapshot.snapshot_time <= end)
+            
+            return [{
+                'snapshot_id': entry.snapshot_id,
+                'snapshot_time': snapshot_time,
+                'rank': entry.rank,
+                'heat': entry.heat,
+                'rank_delta': entry.rank_delta,
+                'heat_delta': entry.heat_delta,
+                'removed': entry.removed
+            } for entry, snapshot_time in query.order_by(HotListSnapshot.snapshot_time, HotListEntry.snapshot_id)]
+        except Exception as e:
+            logger.error(f"获取问题热榜历史失败，错误: {str(e)}")
+            return []
+        finally:
+            db.close()
+    
+    def save_content_score(self, score_data: Dict[str, Any]) -> bool:
+        """
+        保存内容评分到数据库
+        
+        Args:
+            score_data (Dict[str, Any]): 内容评分数据
+        
+        Returns:
+            bool: 是否保存成功
+        """
+        return self.save_content_scores([score_data]) == 1
+    
+    def save_content_scores(self, scores: List[Dict[str, Any]], chunk_size: int = None) -> int:
+        """
+        批量保存内容评分，同一内容（content_id + content_type）已有评分时更新
+        
+        有唯一索引时每块用一条INSERT ... ON CONFLICT DO UPDATE写入，否则用一次IN查询区分新增和更新；
+        每块提交一次事务，某块失败时回滚该块并停止，已提交的块保留
+        
+        Args:
+            scores (List[Dict[str, Any]]): 内容评分数据，不属于content_scores的键会被忽略，
+                同一内容出现多次时以最后一条为准，未提供evaluation_time时取当前时间
+            chunk_size (int, optional): 每个事务提交的评分条数，默认使用SCORE_COMMIT_CHUNK_SIZE. Defaults to None.
+        
+        Returns:
+            int: 成功保存的评分数量（新增与更新之和）
+        """
+        columns = set(ContentScore.__table__.columns.keys()) - {'id', 'created_at', 'updated_at'}
+        evaluation_time = datetime.now()
+        rows = {}
+        for score_data in scores:
+            row = {key: value for key, value in score_data.items() if key in columns}
+            row.setdefault('evaluation_time', evaluation_time)
+            rows[(row.get('content_id'), row.get('content_type'))] = row
+        if not rows:
+            return 0
+        
+        chunk_size = chunk_size or STORAGE_CONFIG.get('SCORE_COMMIT_CHUNK_SIZE', 200)
+        db = next(self.get_db())
+        saved_count = 0
+        
+        try:
+            for chunk in _chunked(list(rows.values()), chunk_size):
+                # 不同评估方式提供的列不同，按列集合分组，每组一条语句，只更新该组提供的列
+                groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+                for row in chunk:
+                    groups.setdefault(tuple(sorted(row)), []).append(row)
+                
+                for keys, group in groups.items():
+                    update_columns = tuple(key for key in keys if key not in ('content_id', 'content_type'))
+                    if not (self.content_score_upsert and
+                            self._upsert_rows(db, ContentScore, ('content_id', 'content_type'), group,
+                                              update_columns)):
+                        self._save_content_scores_by_lookup(db, group)
+                
+                db.commit()
+                saved_count += len(chunk)
+            
+            logger.info(f"成功保存 {saved_count} 条内容评分")
+            return saved_count
+        except Exception as e:
+            db.rollback()
+            logger.error(f"保存内容评分失败，已保存 {saved_count} 条，错误: {str(e)}")
+            return saved_count
+        finally:
+            db.close()
+    
+    def _save_content_scores_by_lookup(self, db: Session, rows: List[Dict[str, Any]]):
+        """
+        没有唯一索引时的批量保存：一次IN查询取出已有评分，新评分多行插入，已有评分按主键批量更新
+        
+        Args:
+            db (Session): 数据库会话
+            rows (List[Dict[str, Any]]): 评分数据，各行的键相同
+        """
+        existing = {
+            (content_id, content_type): row_id
+            for row_id, content_id, content_type in db.query(
+                ContentScore.id, ContentScore.content_id, ContentScore.content_type
+            ).filter(ContentScore.content_id.in_({row['content_id'] for row in rows}))
+        }
+        new_rows = [row for row in rows if (row['content_id'], row['content_type']) not in existing]
+        changed_rows = [{'id': existing[(row['content_id'], row['content_type'])], **row}
+                        for row in rows if (row['content_id'], row['content_type']) in existing]
+        if new_rows:
+            db.execute(insert(ContentScore.__table__), new_rows)
+        if changed_rows:
+            db.execute(update(ContentScore), changed_rows)
+    
     def get_zhihu_questions(self, limit: int = 100, offset: int = 0) -> List[ZhihuQuestion]:
         """
         获取知乎问题列表
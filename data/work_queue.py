@@ -0,0 +1,414 @@
+"""
+爬取工作队列模块，基于SQLite的持久化队列，多个工作进程（可在共享存储卷的多台机器上）按租约领取关键词任务
+
+工作进程领取条目时用一条带条件的UPDATE抢占租约（只有status和租约仍满足条件时才会更新成功），
+同一条目不会被两个进程同时领取；租约有可见性超时，工作进程运行中定期续租，进程退出后租约到期，
+条目重新可被领取。条目记录关联的搜索任务ID，重新领取时从该任务的分页游标继续，不会从第一页重爬
+"""
+import json
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import and_, case, create_engine, func, or_
+from sqlalchemy.orm import sessionmaker
+from data.models import Base, CrawlQueueItem, sqlite_connect_args
+from config.settings import DATABASE_URL, STORAGE_CONFIG
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 条目状态
+QUEUE_STATUSES = ('pending', 'leased', 'done', 'failed')
+
+# 未配置时使用的默认参数
+DEFAULT_WORK_QUEUE_CONFIG = {
+    "DATABASE_URL": None,
+    "VISIBILITY_TIMEOUT": 300,
+    "MAX_ATTEMPTS": 3,
+    "RETRY_DELAY": 30,
+    "POLL_INTERVAL": 5.0,
+    "WORKERS": 4,
+}
+
+
+def _utcnow() -> datetime:
+    """
+    当前UTC时间（不带时区），多台机器共享队列时不受各自时区影响
+    
+    Returns:
+        datetime: UTC时间
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def default_worker_id() -> str:
+    """
+    生成工作进程标识：主机名加进程ID
+    
+    Returns:
+        str: 工作进程标识，如 host-1:12345
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _item_to_dict(item: CrawlQueueItem) -> Dict[str, Any]:
+    """
+    把队列条目转换为字典，payload和result解析为字典
+    
+    Args:
+        item (CrawlQueueItem): 队列条目
+    
+    Returns:
+        Dict[str, Any]: 条目字典
+    """
+    return {
+        'id': item.id,
+        'queue': item.queue,
+        'keyword': item.keyword,
+        'payload': json.loads(item.payload) if item.payload else {},
+        'status': item.status,
+        'attempts': item.attempts or 0,
+        'lease_owner': item.lease_owner,
+        'lease_token': item.lease_token,
+        'lease_expires_at': item.lease_expires_at,
+        'search_task_id': item.search_task_id,
+        'result': json.loads(item.result) if item.result else None,
+        'last_error': item.last_error,
+    }
+
+
+class WorkQueue:
+    """
+    基于SQLite的爬取工作队列，每个进程创建自己的实例（引擎不能跨进程共享）
+    """
+    
+    def __init__(self, db_url: Optional[str] = None, config: Optional[Dict[str, Any]] = None):
+        """
+        初始化工作队列，队列表不存在时自动创建
+        
+        Args:
+            db_url (Optional[str], optional): 队列数据库连接URL，默认使用WORK_QUEUE配置的DATABASE_URL，
+                未配置时与DATABASE_URL相同. Defaults to None.
+            config (Optional[Dict[str, Any]], optional): WORK_QUEUE配置，默认读取STORAGE_CONFIG. Defaults to None.
+        """
+        if config is None:
+            config = STORAGE_CONFIG.get('WORK_QUEUE', {})
+        self.config = {**DEFAULT_WORK_QUEUE_CONFIG, **config}
+        self.db_url = db_url or self.config['DATABASE_URL'] or DATABASE_URL
+        self.visibility_timeout = self.config['VISIBILITY_TIMEOUT']
+        self.max_attempts = self.config['MAX_ATTEMPTS']
+        
+        self.engine = create_engine(self.db_url, echo=False, connect_args=sqlite_connect_args(self.db_url))
+        Base.metadata.create_all(bind=self.engine, tables=[CrawlQueueItem.__table__])
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+    
+    def enqueue(self, keywords: Iterable[str], queue: str = 'search', payload: Optional[Dict[str, Any]] = None,
+                dedupe: bool = True) -> int:
+        """
+        批量添加关键词条目
+        
+        Args:
+            keywords (Iterable[str]): 关键词列表
+            queue (str, optional): 队列名称. Defaults to 'search'.
+            payload (Optional[Dict[str, Any]], optional): 任务参数，如{'max_pages': 10, 'limit': 20}. Defaults to None.
+            dedupe (bool, optional): 是否跳过队列中已有未完成（pending/leased）条目的关键词. Defaults to True.
+        
+        Returns:
+            int: 新添加的条目数
+        """
+        keywords = list(dict.fromkeys(keyword.strip() for keyword in keywords if keyword and keyword.strip()))
+        if not keywords:
+            return 0
+        
+        db = self.SessionLocal()
+        try:
+            if dedupe:
+                existing = {
+                    row[0] for row in db.query(CrawlQueueItem.keyword).filter(
+                        CrawlQueueItem.queue == queue,
+                        CrawlQueueItem.status.in_(('pending', 'leased')),
+                        CrawlQueueItem.keyword.in_(keywords)
+                    )
+                }
+                keywords = [keyword for keyword in keywords if keyword not in existing]
+            
+            now = _utcnow()
+            payload_json = json.dumps(payload or {}, ensure_ascii=False)
+            db.add_all([
+                CrawlQueueItem(queue=queue, keyword=keyword, payload=payload_json, status='pending',
+                               attempts=0, available_at=now)
+                for keyword in keywords
+            ])
+            db.commit()
+            logger.info(f"工作队列 {queue} 新增 {len(keywords)} 个条目")
+            return len(keywords)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"工作队列添加条目失败，错误: {str(e)}")
+            return 0
+        finally:
+            db.close()
+    
+    def lease(self, worker_id: Optional[str] = None, queue: str = 'search', batch_size: int = 1,
+              visibility_timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        领取条目：可领取的条目为到达available_at的pending条目，以及租约已过期且未超过最多领取次数的leased条目
+        
+        先读出候选条目，再逐个用带条件的UPDATE抢占，条件不再满足（已被其他进程抢走）时跳过，
+        因此多个进程并发领取也不会拿到同一条目
+        
+        Args:
+            worker_id (Optional[str], optional): 工作进程标识，默认为主机名加进程ID. Defaults to None.
+            queue (str, optional): 队列名称. Defaults to 'search'.
+            batch_size (int, optional): 最多领取的条目数. Defaults to 1.
+            visibility_timeout (Optional[float], optional): 租约时长（秒），默认使用VISIBILITY_TIMEOUT. Defaults to None.
+        
+        Returns:
+            List[Dict[str, Any]]: 领取到的条目，包含lease_token，续租、完成和失败时需要传回
+        """
+        worker_id = worker_id or default_worker_id()
+        visibility_timeout = visibility_timeout or self.visibility_timeout
+        self.requeue_expired(queue)
+        
+        db = self.SessionLocal()
+        try:
+            now = _utcnow()
+            claimable = or_(
+                and_(CrawlQueueItem.status == 'pending', CrawlQueueItem.available_at <= now),
+                and_(CrawlQueueItem.status == 'leased', CrawlQueueItem.lease_expires_at < now,
+                     CrawlQueueItem.attempts < self.max_attempts)
+            )
+            # 多取一些候选，被其他进程抢走的条目直接跳过
+            candidates = [
+                row[0] for row in db.query(CrawlQueueItem.id)
+                .filter(CrawlQueueItem.queue == queue, claimable)
+                .order_by(CrawlQueueItem.available_at, CrawlQueueItem.id)
+                .limit(batch_size * 4)
+            ]
+            
+            leased = []
+            for item_id in candidates:
+                if len(leased) >= batch_size:
+                    break
+                token = uuid.uuid4().hex
+                claimed = db.query(CrawlQueueItem).filter(CrawlQueueItem.id == item_id, claimable).update({
+                    CrawlQueueItem.status: 'leased',
+                    CrawlQueueItem.attempts: CrawlQueueItem.attempts + 1,
+                    CrawlQueueItem.lease_owner: worker_id,
+                    CrawlQueueItem.lease_token: token,
+                    CrawlQueueItem.lease_expires_at: now + timedelta(seconds=visibility_timeout),
+                    CrawlQueueItem.updated_at: now,
+                }, synchronize_session=False)
+                db.commit()
+                if claimed == 1:
+                    leased.append(_item_to_dict(db.get(CrawlQueueItem, item_id)))
+            
+            if leased:
+                logger.info(f"工作进程 {worker_id} 领取 {len(leased)} 个条目: {[item['keyword'] for item in leased]}")
+            return leased
+        except Exception as e:
+            db.rollback()
+            logger.error(f"工作队列领取条目失败，错误: {str(e)}")
+            return []
+        finally:
+            db.close()
+    
+    def _update_leased(self, item_id: int, lease_token: str, fields: Dict[Any, Any]) -> bool:
+        """
+        在仍持有租约时更新条目
+        
+        Args:
+            item_id (int): 条目ID
+            lease_token (str): 领取时得到的租约令牌
+            fields (Dict[Any, Any]): 要更新的列
+        
+        Returns:
+            bool: 是否更新成功，租约已过期被其他进程领取或条目已结束时返回False
+        """
+        db = self.SessionLocal()
+        try:
+            updated = db.query(CrawlQueueItem).filter(
+                CrawlQueueItem.id == item_id,
+                CrawlQueueItem.lease_token == lease_token,
+                CrawlQueueItem.status == 'leased'
+            ).update({**fields, CrawlQueueItem.updated_at: _utcnow()}, synchronize_session=False)
+            db.commit()
+            return updated == 1
+        except Exception as e:
+            db.rollback()
+            logger.error(f"工作队列更新条目失败，条目ID: {item_id}，错误: {str(e)}")
+            return False
+        finally:
+            db.close()
+    
+    def heartbeat(self, item_id: int, lease_token: str, visibility_timeout: Optional[float] = None,
+                  search_task_id: Optional[int] = None) -> bool:
+        """
+        续租，可同时记录关联的搜索任务ID
+        
+        Args:
+            item_id (int): 条目ID
+            lease_token (str): 租约令牌
+            visibility_timeout (Optional[float], optional): 从现在起的租约时长（秒），默认使用VISIBILITY_TIMEOUT. Defaults to None.
+            search_task_id (Optional[int], optional): 关联的搜索任务ID. Defaults to None.
+        
+        Returns:
+            bool: 是否仍持有租约
+        """
+        fields = {CrawlQueueItem.lease_expires_at:
+                  _utcnow() + timedelta(seconds=visibility_timeout or self.visibility_timeout)}
+        if search_task_id is not None:
+            fields[CrawlQueueItem.search_task_id] = search_task_id
+        return self._update_leased(item_id, lease_token, fields)
+    
+    def complete(self, item_id: int, lease_token: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        标记条目完成并写回结果
+        
+        Args:
+            item_id (int): 条目ID
+            lease_token (str): 租约令牌
+            result (Optional[Dict[str, Any]], optional): 执行结果. Defaults to None.
+        
+        Returns:
+            bool: 是否成功，租约已失效时返回False
+        """
+        return self._update_leased(item_id, lease_token, {
+            CrawlQueueItem.status: 'done',
+            CrawlQueueItem.result: json.dumps(result or {}, ensure_ascii=False, default=str),
+            CrawlQueueItem.lease_token: None,
+            CrawlQueueItem.lease_expires_at: None,
+        })
+    
+    def requeue(self, item_id: int, lease_token: str, result: Optional[Dict[str, Any]] = None,
+                delay: float = 0) -> bool:
+        """
+        本次执行有进展但尚未完成（搜索任务因达到max_pages暂停）：放回队列等待下一次领取，
+        保留关联的搜索任务ID以便从其分页游标继续，并清零领取次数，有进展的领取不计入失败重试
+        
+        Args:
+            item_id (int): 条目ID
+            lease_token (str): 租约令牌
+            result (Optional[Dict[str, Any]], optional): 本次执行结果. Defaults to None.
+            delay (float, optional): 重新可领取前的延迟（秒）. Defaults to 0.
+        
+        Returns:
+            bool: 是否成功，租约已失效时返回False
+        """
+        return self._update_leased(item_id, lease_token, {
+            CrawlQueueItem.status: 'pending',
+            CrawlQueueItem.attempts: 0,
+            CrawlQueueItem.available_at: _utcnow() + timedelta(seconds=delay),
+            CrawlQueueItem.result: json.dumps(result or {}, ensure_ascii=False, default=str),
+            CrawlQueueItem.lease_token: None,
+            CrawlQueueItem.lease_expires_at: None,
+        })
+    
+    def fail(self, item_id: int, lease_token: str, error: str, retry_delay: Optional[float] = None) -> bool:
+        """
+        标记本次执行失败：未超过最多领取次数时延迟后重新入队，否则标记为failed
+        
+        Args:
+            item_id (int): 条目ID
+            lease_token (str): 租约令牌
+            error (str): 错误信息
+            retry_delay (Optional[float], optional): 重新可领取前的延迟（秒），默认使用RETRY_DELAY. Defaults to None.
+        
+        Returns:
+            bool: 是否成功，租约已失效时返回False
+        """
+        retry_delay = self.config['RETRY_DELAY'] if retry_delay is None else retry_delay
+        return self._update_leased(item_id, lease_token, {
+            CrawlQueueItem.status: case((CrawlQueueItem.attempts >= self.max_attempts, 'failed'), else_='pending'),
+            CrawlQueueItem.available_at: _utcnow() + timedelta(seconds=retry_delay),
+            CrawlQueueItem.last_error: (error or '')[:2000],
+            CrawlQueueItem.lease_token: None,
+            CrawlQueueItem.lease_expires_at: None,
+        })
+    
+    def requeue_expired(self, queue: Optional[str] = None) -> int:
+        """
+        回收租约已过期的条目：未超过最多领取次数的重新入队，超过的标记为failed
+        
+        Args:
+            queue (Optional[str], optional): 队列名称，None表示全部队列. Defaults to None.
+        
+        Returns:
+            int: 回收的条目数
+        """
+        db = self.SessionLocal()
+        try:
+            now = _utcnow()
+            expired = db.query(CrawlQueueItem).filter(CrawlQueueItem.status == 'leased',
+                                                      CrawlQueueItem.lease_expires_at < now)
+            if queue is not None:
+                expired = expired.filter(CrawlQueueItem.queue == queue)
+            failed = expired.filter(CrawlQueueItem.attempts >= self.max_attempts).update({
+                CrawlQueueItem.status: 'failed',
+                CrawlQueueItem.last_error: '租约过期且已达到最多领取次数',
+                CrawlQueueItem.lease_token: None,
+                CrawlQueueItem.updated_at: now,
+            }, synchronize_session=False)
+            requeued = expired.update({
+                CrawlQueueItem.status: 'pending',
+                CrawlQueueItem.available_at: now,
+                CrawlQueueItem.lease_token: None,
+                CrawlQueueItem.updated_at: now,
+            }, synchronize_session=False)
+            db.commit()
+            if failed or requeued:
+                logger.warning(f"回收租约过期的条目: 重新入队 {requeued} 个，标记失败 {failed} 个")
+            return failed + requeued
+        except Exception as e:
+            db.rollback()
+            logger.error(f"工作队列回收过期条目失败，错误: {str(e)}")
+            return 0
+        finally:
+            db.close()
+    
+    def stats(self, queue: Optional[str] = None) -> Dict[str, int]:
+        """
+        统计各状态的条目数
+        
+        Args:
+            queue (Optional[str], optional): 队列名称，None表示全部队列. Defaults to None.
+        
+        Returns:
+            Dict[str, int]: 状态到条目数的映射，包含全部状态
+        """
+        db = self.SessionLocal()
+        try:
+            query = db.query(CrawlQueueItem.status, func.count(CrawlQueueItem.id))
+            if queue is not None:
+                query = query.filter(CrawlQueueItem.queue == queue)
+            counts = {status: 0 for status in QUEUE_STATUSES}
+            counts.update(dict(query.group_by(CrawlQueueItem.status).all()))
+            return counts
+        finally:
+            db.close()
+    
+    def get_items(self, queue: Optional[str] = None, status: Optional[str] = None,
+                  limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        查询队列条目
+        
+        Args:
+            queue (Optional[str], optional): 队列名称. Defaults to None.
+            status (Optional[str], optional): 状态. Defaults to None.
+            limit (int, optional): 返回数量限制. Defaults to 100.
+        
+        Returns:
+            List[Dict[str, Any]]: 条目字典列表，按ID排序
+        """
+        db = self.SessionLocal()
+        try:
+            query = db.query(CrawlQueueItem)
+            if queue is not None:
+                query = query.filter(CrawlQueueItem.queue == queue)
+            if status is not None:
+                query = query.filter(CrawlQueueItem.status == status)
+            return [_item_to_dict(item) for item in query.order_by(CrawlQueueItem.id).limit(limit)]
+        finally:
+            db.close()
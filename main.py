@@ -35,16 +35,17 @@ def main():
         #     logger.warning("未爬取到知乎热门问题")
         #     return
         
-        # 3. 保存问题到数据库
+        # 3. 保存问题到数据库，同时记录本次热榜快照（只记录相对上次轮询的排名与热度变化）
         logger.info("保存知乎热门问题到数据库...")
-        saved_count = data_storage.save_zhihu_questions(questions)
-        logger.info(f"成功保存 {saved_count} 个知乎热门问题")
+        snapshot = data_storage.save_hot_list_snapshot(questions)
+        logger.info(f"成功保存 {snapshot['saved_questions']} 个知乎热门问题，热榜快照ID: {snapshot['snapshot_id']}")
         
-        # 4. 对问题进行评估（如果配置了OpenAI API）
+        # 4. 对问题进行评估（如果配置了OpenAI API），内容未变化且已评估过的问题跳过
+        pending_scores = []
         try:
             evaluator = ContentEvaluator()
             
-            for question in questions:
+            for question in data_storage.filter_unscored('question', questions, id_key='question_id'):
                 logger.info(f"评估问题: {question['title']}")
                 
                 # 构造评估内容
@@ -61,10 +62,11 @@ def main():
                     'spread_score': evaluation_result['spread_score'],
                     'operation_score': evaluation_result['operation_score'],
                     'total_score': evaluation_result['total_score'],
-                    'evaluation_details': evaluation_result['details']
+                    'evaluation_details': evaluation_result['details'],
+                    'content_hash': question.get('content_hash')
                 }
                 
-                data_storage.save_content_score(score_data)
+                pending_scores.append(score_data)
                 
                 # 添加延迟，避免API调用过快
                 time.sleep(2)
@@ -72,6 +74,10 @@ def main():
             logger.warning(f"内容评估模块未初始化: {str(e)}")
         except Exception as e:
             logger.error(f"内容评估失败: {str(e)}")
+        finally:
+            # 评估结果在一个事务中批量保存，评估中途出错时已完成的评分也会保存
+            if pending_scores:
+                data_storage.save_content_scores(pending_scores)
         
         # 5. 生成可视化图表
         logger.info("生成数据可视化图表...")
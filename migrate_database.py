@@ -36,7 +36,8 @@ def migrate_database():
             'content_raw': 'TEXT',
             'excerpt_raw': 'TEXT',
             'metrics_raw': 'TEXT',
-            'rank_raw': 'TEXT'
+            'rank_raw': 'TEXT',
+            'content_hash': 'VARCHAR(32)'
         }
         
         # 添加缺失的列
@@ -61,7 +62,8 @@ def migrate_database():
             'title_raw': 'TEXT',
             'excerpt_raw': 'TEXT',
             'metrics_raw': 'TEXT',
-            'rank_raw': 'TEXT'
+            'rank_raw': 'TEXT',
+            'content_hash': 'VARCHAR(32)'
         }
         
         # 添加缺失的列
@@ -76,12 +78,73 @@ def migrate_database():
             else:
                 logger.info(f"列 {column_name} 已存在，跳过")
         
+        # 检查search_tasks表的列
+        cursor.execute("PRAGMA table_info(search_tasks)")
+        columns = [column[1] for column in cursor.fetchall()]
+        logger.info(f"search_tasks表当前列: {columns}")
+        
+        # search_tasks表需要添加的列（增量搜索水位、断点续爬游标）
+        columns_to_add_search_tasks = {
+            'last_create_time': 'DATETIME',
+            'last_answer_id': 'VARCHAR(50)',
+            'next_cursor': 'TEXT',
+            'page_index': 'INTEGER DEFAULT 0',
+            'status': "VARCHAR(20) DEFAULT 'completed'"
+        }
+        
+        # 添加缺失的列
+        for column_name, column_type in columns_to_add_search_tasks.items():
+            if column_name not in columns:
+                try:
+                    alter_sql = f"ALTER TABLE search_tasks ADD COLUMN {column_name} {column_type}"
+                    cursor.execute(alter_sql)
+                    logger.info(f"成功添加列: {column_name}")
+                except Exception as e:
+                    logger.warning(f"添加列 {column_name} 失败: {str(e)}")
+            else:
+                logger.info(f"列 {column_name} 已存在，跳过")
+        
+        # 检查content_scores表的列
+        cursor.execute("PRAGMA table_info(content_scores)")
+        columns = [column[1] for column in cursor.fetchall()]
+        logger.info(f"content_scores表当前列: {columns}")
+        
+        # content_scores表需要添加的列（评估时的内容指纹）
+        columns_to_add_content_scores = {
+            'content_hash': 'VARCHAR(32)'
+        }
+        
+        # 添加缺失的列
+        for column_name, column_type in columns_to_add_content_scores.items():
+            if column_name not in columns:
+                try:
+                    alter_sql = f"ALTER TABLE content_scores ADD COLUMN {column_name} {column_type}"
+                    cursor.execute(alter_sql)
+                    logger.info(f"成功添加列: {column_name}")
+                except Exception as e:
+                    logger.warning(f"添加列 {column_name} 失败: {str(e)}")
+            else:
+                logger.info(f"列 {column_name} 已存在，跳过")
+        
+        # content_scores表去重（每个内容保留最新的一条评分）并创建唯一索引，批量保存评分时按该索引upsert
+        cursor.execute(
+            "DELETE FROM content_scores WHERE id NOT IN "
+            "(SELECT MAX(id) FROM content_scores GROUP BY content_id, content_type)"
+        )
+        if cursor.rowcount:
+            logger.info(f"删除重复的内容评分 {cursor.rowcount} 条")
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_content_scores_content "
+            "ON content_scores (content_id, content_type)"
+        )
+        logger.info("content_scores唯一索引已就绪")
+        
         conn.commit()
         conn.close()
         
         logger.info("数据库迁移完成")
         return True
-        
+    
     except Exception as e:
         logger.error(f"数据库迁移失败: {str(e)}")
         return False
@@ -0,0 +1,253 @@
+"""
+爬取链路吞吐基准：基于合成数据和本地替身服务器，测量get_hot_questions、search_content与
+_parse_search_results的页/秒、条/秒、每条解析CPU时间和峰值内存，结果写入JSON文件便于对比
+
+每个场景在独立子进程中运行，峰值内存（ru_maxrss）互不影响；替身服务器运行在父进程中，
+子进程的CPU时间只包含爬虫自身的请求与解析开销
+
+用法:
+    uv run python script/benchmark/bench_crawl.py --hot-sizes 50,500,5000 --search-pages 10 \
+        --content-size 8000 --output bench_crawl.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# 添加项目根目录到Python路径
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT_DIR)
+
+try:
+    import resource
+except ImportError:  # Windows没有resource模块
+    resource = None
+
+from crawler.zhihu.fixtures import build_search_page
+from crawler.zhihu.stub_server import ZhihuStubServer
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """
+    获取当前进程的峰值常驻内存
+    
+    Returns:
+        Optional[float]: 峰值RSS（MB），平台不支持时返回None
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux单位为KB，macOS为字节
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 2)
+
+
+def _make_crawler(options: Dict[str, Any], stub_url: Optional[str] = None):
+    """
+    在子进程中按基准参数创建爬虫
+    
+    Args:
+        options (Dict[str, Any]): 基准参数
+        stub_url (Optional[str], optional): 替身服务器地址，为None时不发请求. Defaults to None.
+    
+    Returns:
+        ZhihuCrawler: 爬虫实例
+    """
+    from config.settings import CRAWLER_CONFIG
+    zhihu_config = CRAWLER_CONFIG['ZHIHU']
+    zhihu_config['HTTP_CACHE'] = dict(zhihu_config['HTTP_CACHE'], ENABLED=False)
+    if stub_url:
+        zhihu_config['TRANSPORT'] = dict(zhihu_config['TRANSPORT'], MODE='stub', STUB_URL=stub_url)
+    
+    from crawler.zhihu.zhihu_crawler import ZhihuCrawler
+    crawler = ZhihuCrawler()
+    crawler.parser_backend = options['backend']
+    crawler.parse_workers = options['parse_workers']
+    crawler.search_prefetch_depth = options['prefetch_depth']
+    crawler.rate_limit = options['rate_limit'] or None
+    return crawler
+
+
+def _measure(func, repeat: int) -> Dict[str, Any]:
+    """
+    重复执行func，取墙钟时间最短的一次
+    
+    Args:
+        func (Callable[[], Tuple[int, int]]): 被测函数，返回（页数，条目数）
+        repeat (int): 重复次数
+    
+    Returns:
+        Dict[str, Any]: 页数、条目数、墙钟时间与CPU时间
+    """
+    best = None
+    for _ in range(repeat):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        pages, items = func()
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+        if best is None or wall < best['wall_seconds']:
+            best = {'pages': pages, 'items': items, 'wall_seconds': wall, 'cpu_seconds': cpu}
+    return best
+
+
+def run_scenario(name: str, params: Dict[str, Any], options: Dict[str, Any],
+                 stub_url: Optional[str] = None) -> Dict[str, Any]:
+    """
+    运行单个基准场景（在子进程中执行）
+    
+    Args:
+        name (str): 场景名称：parse_search_results、get_hot_questions或search_content
+        params (Dict[str, Any]): 场景参数
+        options (Dict[str, Any]): 全局基准参数
+        stub_url (Optional[str], optional): 替身服务器地址. Defaults to None.
+    
+    Returns:
+        Dict[str, Any]: 场景结果
+    """
+    logging.disable(logging.INFO)
+    crawler = _make_crawler(options, stub_url)
+    
+    try:
+        if name == 'parse_search_results':
+            pages = [build_search_page(offset=page * params['limit'], limit=params['limit'],
+                                       content_size=params['content_size'], total=params['pages'] * params['limit'])
+                     for page in range(params['pages'])]
+            
+            def func():
+                items = sum(len(crawler._parse_search_results(page)) for page in pages)
+                return len(pages), items
+        
+        elif name == 'get_hot_questions':
+            def func():
+                return 1, len(crawler.get_hot_questions(limit=params['items']))
+        
+        elif name == 'search_content':
+            def func():
+                results = crawler.search_content('python', max_pages=params['pages'], limit=params['limit'])
+                return crawler.last_search_page_count, len(results)
+        
+        else:
+            raise ValueError(f"未知场景: {name}")
+        
+        result = _measure(func, options['repeat'])
+    finally:
+        crawler.close()
+    
+    wall, cpu, items = result['wall_seconds'], result['cpu_seconds'], result['items']
+    return {
+        'scenario': name,
+        'params': params,
+        'pages': result['pages'],
+        'items': items,
+        'wall_seconds': round(wall, 6),
+        'cpu_seconds': round(cpu, 6),
+        'pages_per_sec': round(result['pages'] / wall, 2) if wall else None,
+        'items_per_sec': round(items / wall, 2) if wall else None,
+        'cpu_ms_per_item': round(cpu / items * 1000, 4) if items else None,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def _git_revision() -> Optional[str]:
+    """
+    获取当前代码的git提交号，便于对比不同版本的结果
+    
+    Returns:
+        Optional[str]: 提交号，非git仓库时返回None
+    """
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _parse_sizes(value: str) -> List[int]:
+    """
+    解析逗号分隔的规模列表
+    
+    Args:
+        value (str): 如 "50,500,5000"
+    
+    Returns:
+        List[int]: 规模列表
+    """
+    return [int(size) for size in value.split(',') if size.strip()]
+
+
+def main():
+    """
+    运行爬取链路吞吐基准
+    """
+    parser = argparse.ArgumentParser(description='爬取链路吞吐基准')
+    parser.add_argument('--hot-sizes', type=_parse_sizes, default=[50, 500, 5000], help='热门列表条目数，逗号分隔')
+    parser.add_argument('--search-pages', type=int, default=10, help='搜索页数')
+    parser.add_argument('--search-limit', type=int, default=20, help='每页搜索结果数')
+    parser.add_argument('--content-size', type=int, default=8000, help='每条搜索结果正文的近似字符数')
+    parser.add_argument('--latency', type=float, default=0.0, help='替身服务器每个请求的模拟延迟（秒）')
+    parser.add_argument('--backend', default='lxml', help='HTML解析后端：lxml或bs4')
+    parser.add_argument('--parse-workers', type=int, default=1, help='热门列表解析池工作线程数')
+    parser.add_argument('--prefetch-depth', type=int, default=1, help='搜索翻页预取深度')
+    parser.add_argument('--rate-limit', type=float, default=0, help='每秒请求数上限，0表示不限速')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数（取最好成绩）')
+    parser.add_argument('--output', default='bench_crawl.json', help='结果JSON文件路径')
+    args = parser.parse_args()
+    
+    options = {
+        'backend': args.backend,
+        'parse_workers': args.parse_workers,
+        'prefetch_depth': args.prefetch_depth,
+        'rate_limit': args.rate_limit,
+        'repeat': args.repeat,
+    }
+    search_params = {'pages': args.search_pages, 'limit': args.search_limit, 'content_size': args.content_size}
+    
+    # 每种热门列表规模一个替身服务器，搜索场景共用第一个
+    servers = {
+        size: ZhihuStubServer(port=0, latency=args.latency, hot_items=size,
+                              search_total=args.search_pages * args.search_limit,
+                              content_size=args.content_size).start_background()
+        for size in args.hot_sizes
+    }
+    search_server = next(iter(servers.values()))
+    
+    scenarios = [('parse_search_results', search_params, None)]
+    scenarios += [('get_hot_questions', {'items': size}, servers[size].base_url) for size in args.hot_sizes]
+    scenarios.append(('search_content', search_params, search_server.base_url))
+    
+    results = []
+    try:
+        for name, params, stub_url in scenarios:
+            # 每个场景使用新的子进程，峰值内存互不干扰
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                result = executor.submit(run_scenario, name, params, options, stub_url).result()
+            results.append(result)
+            print(f"{name:<22} {json.dumps(params, ensure_ascii=False):<52} "
+                  f"{result['pages_per_sec'] or 0:>9.2f} 页/秒 {result['items_per_sec'] or 0:>10.2f} 条/秒 "
+                  f"{result['cpu_ms_per_item'] or 0:>8.3f} ms CPU/条  峰值RSS {result['peak_rss_mb']} MB")
+    finally:
+        for server in servers.values():
+            server.shutdown()
+            server.server_close()
+    
+    report = {
+        'benchmark': 'bench_crawl',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'options': dict(options, latency=args.latency),
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已写入: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+JSON解码微基准：在大规模合成search_v3页面上对比response.json()、标准库字节解码与orjson解码的耗时，
+以及字段投影的额外开销，并校验各路径解析出的搜索结果一致
+
+用法:
+    uv run python script/benchmark/bench_json.py --items 200 --content-size 8000 --pages 20
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import requests
+from crawler.json_codec import ORJSON_AVAILABLE, decode_json, project
+from crawler.zhihu.fixtures import build_search_page
+from crawler.zhihu.zhihu_parser import SEARCH_PAGE_FIELDS, ZhihuParserMixin
+
+
+def _make_response(content: bytes) -> requests.Response:
+    """
+    构造与线上一致的requests响应（未声明charset，由requests自行推断编码）
+    
+    Args:
+        content (bytes): 响应正文
+    
+    Returns:
+        requests.Response: 响应对象
+    """
+    response = requests.Response()
+    response.status_code = 200
+    response.headers['Content-Type'] = 'application/json'
+    response._content = content
+    return response
+
+
+def _decoders() -> dict:
+    """
+    构建待比较的解码路径
+    
+    Returns:
+        dict: 路径名称到解码函数的映射
+    """
+    decoders = {
+        'response.json': lambda content: _make_response(content).json(),
+        'json': lambda content: decode_json(content, 'json'),
+        'json+投影': lambda content: project(decode_json(content, 'json'), SEARCH_PAGE_FIELDS),
+    }
+    if ORJSON_AVAILABLE:
+        decoders['orjson'] = lambda content: decode_json(content, 'orjson')
+        decoders['orjson+投影'] = lambda content: project(decode_json(content, 'orjson'), SEARCH_PAGE_FIELDS)
+    return decoders
+
+
+def _strip_volatile(records: list) -> list:
+    """
+    去掉每次运行都会变化的字段，便于比较
+    
+    Args:
+        records (list): 解析结果
+    
+    Returns:
+        list: 去掉crawl_time后的结果
+    """
+    return [{k: v for k, v in record.items() if k != 'crawl_time'} for record in records]
+
+
+def main():
+    """
+    运行JSON解码微基准
+    """
+    parser = argparse.ArgumentParser(description='JSON解码微基准')
+    parser.add_argument('--items', type=int, default=200, help='每页搜索结果条目数')
+    parser.add_argument('--content-size', type=int, default=8000, help='每条搜索结果正文的近似字符数')
+    parser.add_argument('--pages', type=int, default=20, help='页数')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数（取最好成绩）')
+    args = parser.parse_args()
+    
+    bodies = [
+        json.dumps(build_search_page(offset=page * args.items, limit=args.items, content_size=args.content_size,
+                                     total=args.pages * args.items), ensure_ascii=False).encode('utf-8')
+        for page in range(args.pages)
+    ]
+    total_mb = sum(len(body) for body in bodies) / (1024 * 1024)
+    print(f"=== search_v3 解码（{args.pages} 页 x {args.items} 条，正文约 {args.content_size} 字符，"
+          f"共 {total_mb:.1f} MB）===")
+    if not ORJSON_AVAILABLE:
+        print("orjson未安装，只比较标准库路径（uv sync --extra fast 安装）")
+    
+    mixin = ZhihuParserMixin()
+    baseline = None
+    reference = None
+    for name, decode in _decoders().items():
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            pages = [decode(body) for body in bodies]
+            best = min(best, time.perf_counter() - start)
+        baseline = baseline or best
+        
+        # 校验：投影后解析出的结果必须与完整解码一致
+        records = _strip_volatile([record for page in pages for record in mixin._parse_search_results(page)])
+        reference = reference if reference is not None else records
+        
+        print(f"{name:>14}: {best * 1000:9.2f} ms  {best / args.pages * 1000:8.2f} ms/页  "
+              f"{total_mb / best:8.1f} MB/s  加速比 {baseline / best:5.2f}x  "
+              f"解析结果一致: {'是' if records == reference else '否'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+HTML解析后端微基准：在大规模合成页面上对比lxml与BeautifulSoup后端的耗时，并校验输出一致
+
+用法:
+    uv run python script/benchmark/bench_parser.py --hot-items 2000 --search-items 200 --content-size 8000
+"""
+import argparse
+import os
+import sys
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from crawler.zhihu.fixtures import build_hot_list_html, build_search_page
+from crawler.zhihu.html_backends import get_html_backend
+
+BACKENDS = ['bs4', 'lxml']
+
+
+def _strip_volatile(record: dict) -> dict:
+    """
+    去掉每次运行都会变化的字段，便于比较
+    
+    Args:
+        record (dict): 解析结果
+    
+    Returns:
+        dict: 去掉crawl_time后的结果
+    """
+    return {k: v for k, v in record.items() if k != 'crawl_time'}
+
+
+def bench_hot_list(item_count: int, repeat: int) -> dict:
+    """
+    对比热门列表解析耗时
+    
+    Args:
+        item_count (int): 热门条目数量
+        repeat (int): 重复次数，取最好成绩
+    
+    Returns:
+        dict: 各后端的耗时（秒）与解析结果
+    """
+    html = build_hot_list_html(item_count)
+    results = {}
+    for name in BACKENDS:
+        backend = get_html_backend(name)
+        best = float('inf')
+        parsed = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parsed = [backend.parse_hot_item(item) for item in backend.find_hot_items(html, item_count)]
+            best = min(best, time.perf_counter() - start)
+        results[name] = {'seconds': best, 'records': [_strip_volatile(r) for r in parsed]}
+    return results
+
+
+def bench_search_clean(item_count: int, content_size: int, repeat: int) -> dict:
+    """
+    对比搜索结果title/content清理耗时
+    
+    Args:
+        item_count (int): 搜索结果数量
+        content_size (int): 每条正文的近似字符数
+        repeat (int): 重复次数，取最好成绩
+    
+    Returns:
+        dict: 各后端的耗时（秒）与清理结果
+    """
+    page = build_search_page(limit=item_count, total=item_count, content_size=content_size)
+    fields = []
+    for item in page['data']:
+        if item.get('type') == 'search_result':
+            fields.append(item['object']['title'])
+            fields.append(item['object']['content'])
+    
+    results = {}
+    for name in BACKENDS:
+        backend = get_html_backend(name)
+        best = float('inf')
+        cleaned = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            cleaned = [backend.clean_html(field) for field in fields]
+            best = min(best, time.perf_counter() - start)
+        results[name] = {'seconds': best, 'records': cleaned}
+    return results
+
+
+def _report(title: str, results: dict, unit_count: int):
+    """
+    打印对比结果
+    
+    Args:
+        title (str): 基准名称
+        results (dict): 各后端结果
+        unit_count (int): 处理的条目数
+    """
+    print(f"\n=== {title} ===")
+    baseline = results['bs4']['seconds']
+    for name in BACKENDS:
+        seconds = results[name]['seconds']
+        print(f"{name:>5}: {seconds * 1000:9.2f} ms  "
+              f"{seconds / unit_count * 1e6:9.2f} us/条  加速比 {baseline / seconds:5.2f}x")
+    
+    identical = results['bs4']['records'] == results['lxml']['records']
+    print(f"输出一致: {'是' if identical else '否'}")
+    if not identical:
+        for a, b in zip(results['bs4']['records'], results['lxml']['records']):
+            if a != b:
+                print(f"  bs4 : {a!r}"[:300])
+                print(f"  lxml: {b!r}"[:300])
+                break
+
+
+def main():
+    """
+    运行解析后端微基准
+    """
+    parser = argparse.ArgumentParser(description='HTML解析后端微基准')
+    parser.add_argument('--hot-items', type=int, default=2000, help='热门列表条目数')
+    parser.add_argument('--search-items', type=int, default=200, help='搜索结果条目数')
+    parser.add_argument('--content-size', type=int, default=8000, help='每条搜索结果正文的近似字符数')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数（取最好成绩）')
+    args = parser.parse_args()
+    
+    hot = bench_hot_list(args.hot_items, args.repeat)
+    _report(f"热门列表解析（{args.hot_items} 条）", hot, args.hot_items)
+    
+    search = bench_search_clean(args.search_items, args.content_size, args.repeat)
+    _report(f"搜索结果HTML清理（{args.search_items} 条，正文约 {args.content_size} 字符）",
+            search, args.search_items)
+
+
+if __name__ == "__main__":
+    main()
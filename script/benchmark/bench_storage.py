@@ -0,0 +1,133 @@
+"""
+入库微基准：在临时SQLite数据库上测量批量保存知乎问题和回答的耗时，
+依次为全部新增、全部重复和部分内容变化三种情形，回答另测刷新互动数据的情形，
+内容评分对比逐条保存与批量保存，并校验保存数量
+
+用法:
+    uv run python script/benchmark/bench_storage.py --items 10000
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from crawler.zhihu.fixtures import build_search_page
+from crawler.zhihu.zhihu_parser import ZhihuParserMixin
+from data.records import answer_fingerprint
+from data.storage import DataStorage
+
+
+def _build_questions(count: int) -> list:
+    """
+    构造合成的知乎问题
+    
+    Args:
+        count (int): 问题数量
+    
+    Returns:
+        list: 问题字典列表
+    """
+    return [
+        {
+            'question_id': str(100000000 + index),
+            'title': f'合成问题 {index}',
+            'title_raw': f'<span>合成问题 {index}</span>',
+            'url': f'https://www.zhihu.com/question/{100000000 + index}',
+            'rank': index + 1,
+            'metrics': f'{index} 万热度',
+            'excerpt': f'问题描述 {index}',
+            'excerpt_raw': f'<p>问题描述 {index}</p>',
+        }
+        for index in range(count)
+    ]
+
+
+def _build_answers(count: int, content_size: int) -> list:
+    """
+    构造合成的知乎回答（search_v3页面解析结果）
+    
+    Args:
+        count (int): 回答数量
+        content_size (int): 每条回答正文的近似字符数
+    
+    Returns:
+        list: 回答字典列表
+    """
+    mixin = ZhihuParserMixin()
+    answers = []
+    for offset in range(0, count, 200):
+        page = build_search_page(offset=offset, limit=min(200, count - offset), content_size=content_size, total=count)
+        answers.extend(mixin._parse_search_results(page))
+    return answers
+
+
+def _timed(label: str, func, expected: int):
+    """
+    运行并打印一次保存的耗时
+    
+    Args:
+        label (str): 情形名称
+        func (callable): 执行保存并返回保存数量的函数
+        expected (int): 期望的保存数量
+    """
+    start = time.perf_counter()
+    saved = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:>10}: {elapsed * 1000:9.1f} ms  保存 {saved:6d} 条  "
+          f"保存数量正确: {'是' if saved == expected else '否'}")
+
+
+def main():
+    """
+    运行入库微基准
+    """
+    parser = argparse.ArgumentParser(description='入库微基准')
+    parser.add_argument('--items', type=int, default=10000, help='每批条目数')
+    parser.add_argument('--changed-ratio', type=float, default=0.1, help='部分内容变化情形中内容变化的比例')
+    parser.add_argument('--content-size', type=int, default=500, help='每条回答正文的近似字符数')
+    parser.add_argument('--scores', type=int, default=1000, help='内容评分条数')
+    args = parser.parse_args()
+    
+    # 关闭入库日志，避免日志输出计入耗时
+    logging.disable(logging.INFO)
+    storage = DataStorage('sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench_storage.db'))
+    
+    questions = _build_questions(args.items)
+    print(f"=== save_zhihu_questions（{args.items} 条）===")
+    _timed('全部新增', lambda: storage.save_zhihu_questions(questions), args.items)
+    _timed('全部重复', lambda: storage.save_zhihu_questions(questions), 0)
+    step = max(1, int(1 / args.changed_ratio)) if args.changed_ratio > 0 else args.items + 1
+    for question in questions[::step]:
+        question['excerpt_raw'] += '<p>补充</p>'
+    _timed('部分变化', lambda: storage.save_zhihu_questions(questions), 0)
+    
+    answers = _build_answers(args.items, args.content_size)
+    print(f"=== save_zhihu_answers（{len(answers)} 条）===")
+    _timed('全部新增', lambda: storage.save_zhihu_answers(answers), len(answers))
+    _timed('全部重复', lambda: storage.save_zhihu_answers(answers), 0)
+    for answer in answers[::step]:
+        answer['content_raw'] += '<p>补充</p>'
+        answer['content_hash'] = answer_fingerprint(answer['content_raw'])
+    _timed('部分变化', lambda: storage.save_zhihu_answers(answers), 0)
+    for answer in answers[::step]:
+        answer['vote_up_count'] += 1
+    _timed('刷新互动', lambda: storage.save_zhihu_answers(answers, refresh_metrics=True), 0)
+    
+    scores = [
+        {'content_id': answer['answer_id'], 'content_type': 'answer', 'quality_score': 80.0, 'spread_score': 70.0,
+         'operation_score': 60.0, 'total_score': 70.0, 'evaluation_details': '合成评分',
+         'content_hash': answer['content_hash']}
+        for answer in answers[:args.scores]
+    ]
+    print(f"=== 内容评分（{len(scores)} 条）===")
+    _timed('逐条保存', lambda: sum(storage.save_content_score(score) for score in scores), len(scores))
+    _timed('批量保存', lambda: storage.save_content_scores(scores), len(scores))
+
+
+if __name__ == "__main__":
+    main()
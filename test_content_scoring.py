@@ -33,6 +33,9 @@ def parse_args():
                         type=float, 
                         default=2.0,
                         help='API调用间隔时间(秒) (默认: 2.0)')
+    parser.add_argument('--force', '-f', 
+                        action='store_true',
+                        help='重新评估内容未变化且已评估过的内容')
     parser.add_argument('--verbose', '-v', 
                         action='store_true',
                         help='显示详细日志')
@@ -42,7 +45,8 @@ def parse_args():
                         help='评估类型 (默认: english_article)')
     return parser.parse_args()
 
-def evaluate_content(evaluator, content_id, content_type, content_text, title, evaluation_type, delay):
+def evaluate_content(evaluator, content_id, content_type, content_text, title, evaluation_type, delay,
+                     content_hash=None):
     """
     评估单个内容并保存结果
     """
@@ -63,7 +67,8 @@ def evaluate_content(evaluator, content_id, content_type, content_text, title, e
                 'grade': evaluation_result['grade'],
                 'match_analysis': evaluation_result['match_analysis'],
                 'core_pain_points': ','.join(evaluation_result['core_pain_points']),
-                'evaluation_details': f"分级: {evaluation_result['grade']}, 匹配分析: {evaluation_result['match_analysis']}, 核心痛点: {','.join(evaluation_result['core_pain_points'])}"
+                'evaluation_details': f"分级: {evaluation_result['grade']}, 匹配分析: {evaluation_result['match_analysis']}, 核心痛点: {','.join(evaluation_result['core_pain_points'])}",
+                'content_hash': content_hash
             }
         else:
             # 综合评估
@@ -77,7 +82,8 @@ def evaluate_content(evaluator, content_id, content_type, content_text, title, e
                 'spread_score': evaluation_result['spread_score'],
                 'operation_score': evaluation_result['operation_score'],
                 'total_score': evaluation_result['total_score'],
-                'evaluation_details': evaluation_result['details']
+                'evaluation_details': evaluation_result['details'],
+                'content_hash': content_hash
             }
         
         saved = data_storage.save_content_score(score_data)
@@ -138,7 +144,8 @@ def main():
                     'id': question.question_id,
                     'type': 'question',
                     'text': content_text,
-                    'title': question.title
+                    'title': question.title,
+                    'content_hash': question.content_hash
                 })
         
         if args.type in ['answer', 'all']:
@@ -155,11 +162,22 @@ def main():
                         'id': answer.answer_id,
                         'type': 'answer',
                         'text': content_text,
-                        'title': f"回答 #{answer.answer_id}"
+                        'title': f"回答 #{answer.answer_id}",
+                        'content_hash': answer.content_hash
                     })
             except AttributeError:
                 logger.warning("✗ 数据存储未实现get_zhihu_answers方法，跳过回答评估")
         
+        # 跳过内容指纹与上次评估时一致的内容
+        if not args.force:
+            contents_to_evaluate = [
+                content
+                for content_type in ('question', 'answer')
+                for content in data_storage.filter_unscored(
+                    content_type, [c for c in contents_to_evaluate if c['type'] == content_type]
+                )
+            ]
+        
         if not contents_to_evaluate:
             logger.warning("未从数据库获取到可评估的内容")
             return 0
@@ -186,7 +204,8 @@ def main():
                 content_text=content['text'],
                 title=content['title'],
                 evaluation_type=args.evaluation_type,
-                delay=args.delay
+                delay=args.delay,
+                content_hash=content['content_hash']
             )
             
             if result['success']:
@@ -32,6 +32,12 @@ def main():
         
         logger.info(f"✓ 成功获取 {len(questions)} 个知乎问题")
         
+        # 内容指纹与上次评估时一致的问题无需重新评估
+        scored_hashes = data_storage.get_scored_content_hashes('question', [q.question_id for q in questions])
+        questions = [q for q in questions
+                     if not q.content_hash or scored_hashes.get(q.question_id, '') != q.content_hash]
+        logger.info(f"其中 {len(questions)} 个问题未评估或内容已变化")
+        
         # 3. 对每个问题进行评分
         logger.info("开始对问题进行评分...")
         scored_count = 0
@@ -54,7 +60,8 @@ def main():
                     'spread_score': evaluation_result['spread_score'],
                     'operation_score': evaluation_result['operation_score'],
                     'total_score': evaluation_result['total_score'],
-                    'evaluation_details': evaluation_result['details']
+                    'evaluation_details': evaluation_result['details'],
+                    'content_hash': question.content_hash
                 }
                 
                 saved = data_storage.save_content_score(score_data)
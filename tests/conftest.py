@@ -0,0 +1,47 @@
+"""
+测试公共夹具：本地替身服务器、指向替身服务器的爬虫配置和临时数据库
+"""
+import os
+import sys
+
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import CRAWLER_CONFIG
+from crawler.zhihu.stub_server import ZhihuStubServer
+from data.storage import DataStorage
+
+
+@pytest.fixture(scope='session')
+def stub_server():
+    """
+    会话内共用的知乎替身服务器
+    """
+    server = ZhihuStubServer(port=0, search_total=200).start_background()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def stub_config(stub_server, monkeypatch):
+    """
+    把知乎爬虫配置指向替身服务器，关闭HTTP缓存和已见ID过滤器，测试结束后恢复
+    """
+    zhihu_config = CRAWLER_CONFIG['ZHIHU']
+    monkeypatch.setitem(zhihu_config, 'TRANSPORT',
+                        dict(zhihu_config['TRANSPORT'], MODE='stub', STUB_URL=stub_server.base_url))
+    monkeypatch.setitem(zhihu_config, 'HTTP_CACHE', dict(zhihu_config['HTTP_CACHE'], ENABLED=False))
+    monkeypatch.setitem(zhihu_config, 'SEEN_FILTER', dict(zhihu_config['SEEN_FILTER'], ENABLED=False))
+    monkeypatch.setitem(zhihu_config, 'RATE_LIMIT', 100.0)
+    return zhihu_config
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """
+    临时SQLite数据库上的存储实例
+    """
+    return DataStorage('sqlite:///' + str(tmp_path / 'test.db'))
@@ -0,0 +1,164 @@
+"""
+自适应限速测试：注入时钟，确定性地验证限流状态码的乘性减小、健康响应的加性增加、p95延迟升高、
+Retry-After暂停与冷却期
+"""
+import pytest
+
+from crawler.adaptive import AdaptiveController
+from crawler.rate_limiter import TokenBucket
+
+CONFIG = {
+    'MIN_RATE': 0.2,
+    'MAX_RATE': 2.2,
+    'RATE_STEP': 0.1,
+    'MIN_CONCURRENCY': 1,
+    'MAX_CONCURRENCY': 10,
+    'DECREASE_FACTOR': 0.5,
+    'INCREASE_EVERY': 3,
+    'LATENCY_WINDOW': 4,
+    'LATENCY_TOLERANCE': 2.0,
+    'COOLDOWN': 1.0,
+    'MAX_RETRY_AFTER': 300,
+}
+
+
+class FakeClock:
+    """
+    手动推进的单调时钟，从0开始
+    """
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
+    
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _controller(clock, rate: float = 2.0, concurrency: int = 8, **config) -> AdaptiveController:
+    return AdaptiveController(TokenBucket(rate, burst=4, clock=clock), concurrency, {**CONFIG, **config}, clock=clock)
+
+
+def test_throttled_status_decreases_multiplicatively(clock):
+    controller = _controller(clock)
+    
+    # 时钟从0开始时第一次减小也不受冷却期影响
+    controller.release(429, 0.1)
+    assert controller.rate == 1.0
+    assert controller.limiter.rate == 1.0
+    assert controller.concurrency_limit == 4
+    
+    clock.advance(1.0)
+    controller.release(503, 0.1)
+    assert (controller.rate, controller.concurrency_limit) == (0.5, 2)
+    
+    # 非限流的错误状态码和网络错误不调整
+    clock.advance(1.0)
+    controller.release(404, 0.1)
+    controller.release(None, 5.0)
+    assert (controller.rate, controller.concurrency_limit) == (0.5, 2)
+    
+    # 不低于下限
+    for _ in range(3):
+        clock.advance(1.0)
+        controller.release(502, 0.1)
+    assert (controller.rate, controller.concurrency_limit) == (0.2, 1)
+    snapshot = controller.snapshot()
+    assert snapshot['decreases'] == 5
+    assert snapshot['throttled'] == 5
+
+
+def test_healthy_responses_increase_additively(clock):
+    controller = _controller(clock)
+    
+    for _ in range(2):
+        controller.release(200, 0.1)
+    assert (controller.rate, controller.concurrency_limit) == (2.0, 8)
+    
+    # 每INCREASE_EVERY个健康响应加一个RATE_STEP和一个并发
+    controller.release(304, 0.1)
+    assert controller.rate == pytest.approx(2.1)
+    assert controller.limiter.rate == pytest.approx(2.1)
+    assert controller.concurrency_limit == 9
+    
+    # 速率与并发数都到达上限后不再计为增加
+    for _ in range(9):
+        controller.release(200, 0.1)
+    assert controller.rate == pytest.approx(2.2)
+    assert controller.concurrency_limit == 10
+    assert controller.snapshot()['increases'] == 2
+    
+    # 限流响应清零健康计数
+    controller.release(200, 0.1)
+    controller.release(429, 0.1)
+    controller.release(200, 0.1)
+    controller.release(200, 0.1)
+    assert controller.snapshot()['increases'] == 2
+
+
+def test_latency_rise_above_baseline_decreases(clock):
+    controller = _controller(clock)
+    
+    for _ in range(3):
+        controller.release(200, 0.1)
+    assert controller.snapshot()['baseline_p95_latency'] == 0.1
+    assert controller.snapshot()['increases'] == 1
+    
+    # p95超过基线的LATENCY_TOLERANCE倍时视为拥塞
+    for _ in range(3):
+        controller.release(200, 0.5)
+    assert controller.rate == pytest.approx(1.05)
+    assert controller.snapshot()['decreases'] == 1
+
+
+def test_retry_after_pauses_new_requests(clock):
+    controller = _controller(clock)
+    assert controller.acquire() >= 0
+    
+    controller.release(429, 0.1, retry_after='5')
+    assert controller.snapshot()['paused_for'] == 5.0
+    with controller._cond:
+        assert controller._try_acquire_slot() is False
+    
+    clock.advance(4.9)
+    assert controller.snapshot()['paused_for'] == pytest.approx(0.1)
+    clock.advance(0.1)
+    with controller._cond:
+        assert controller._try_acquire_slot() is True
+    
+    # 暂停时间不超过MAX_RETRY_AFTER，较短的Retry-After不会缩短已有的暂停
+    controller.release(503, 0.1, retry_after='1000')
+    controller.release(503, 0.1, retry_after='2')
+    assert controller.snapshot()['paused_for'] == 300.0
+    assert controller.snapshot()['retry_after_pauses'] == 3
+    assert controller.snapshot()['in_flight'] == 0
+
+
+def test_cooldown_counts_one_decrease_per_burst_of_failures(clock):
+    controller = _controller(clock)
+    
+    # 同一批在途请求的失败在冷却期内只减一次，Retry-After仍然生效
+    controller.release(429, 0.1)
+    clock.advance(0.5)
+    controller.release(429, 0.1, retry_after='3')
+    assert controller.rate == 1.0
+    assert controller.snapshot()['paused_for'] == 3.0
+    
+    clock.advance(0.25)
+    controller.release(429, 0.1)
+    assert controller.rate == 1.0
+    
+    # 冷却期从上一次减小开始计算
+    clock.advance(0.25)
+    controller.release(429, 0.1)
+    assert controller.rate == 0.5
+    snapshot = controller.snapshot()
+    assert snapshot['decreases'] == 2
+    assert snapshot['throttled'] == 4
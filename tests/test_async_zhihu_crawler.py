@@ -0,0 +1,76 @@
+"""
+异步知乎爬虫测试：解析在线程池中执行，不阻塞事件循环；批量获取回答详情的工作协程数有上限
+"""
+import asyncio
+import json
+import threading
+
+from crawler.zhihu.async_zhihu_crawler import AsyncZhihuCrawler
+from crawler.zhihu.fixtures import build_search_page
+
+
+class _Response:
+    def __init__(self, data):
+        self.content = json.dumps(data).encode('utf-8')
+        self.text = self.content.decode('utf-8')
+
+
+def test_answer_parsing_runs_off_event_loop(monkeypatch):
+    crawler = AsyncZhihuCrawler()
+    page = build_search_page(offset=0, limit=5, total=5)
+    answer_objects = [item['object'] for item in page['data'] if item.get('type') == 'search_result']
+    answer_object = answer_objects[0]
+    parse_threads = []
+    parse_answer_list = crawler._parse_answer_list
+    parse_answer_object = crawler._parse_answer_object
+    
+    def recording_answer_list(response_data):
+        parse_threads.append(threading.get_ident())
+        return parse_answer_list(response_data)
+    
+    def recording_answer_object(object_data):
+        parse_threads.append(threading.get_ident())
+        return parse_answer_object(object_data)
+    
+    async def get(url, params=None):
+        if '/questions/' in url:
+            return _Response({'data': answer_objects, 'paging': {'is_end': True}})
+        return _Response(answer_object)
+    
+    monkeypatch.setattr(crawler, '_parse_answer_list', recording_answer_list)
+    monkeypatch.setattr(crawler, '_parse_answer_object', recording_answer_object)
+    monkeypatch.setattr(crawler, 'get', get)
+    
+    async def run():
+        loop_thread = threading.get_ident()
+        answers = await crawler.get_question_answers('1', limit=5)
+        detail = await crawler.get_answer_details(answer_object['id'])
+        return loop_thread, answers, detail
+    
+    loop_thread, answers, detail = asyncio.run(run())
+    assert len(answers) == len(answer_objects)
+    assert detail['answer_id'] == str(answer_object['id'])
+    assert len(parse_threads) == 2
+    assert loop_thread not in parse_threads
+
+
+def test_answer_details_batch_bounds_workers(monkeypatch):
+    crawler = AsyncZhihuCrawler()
+    in_flight = 0
+    peak = 0
+    
+    async def get_answer_details(answer_id):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return {} if answer_id == '7' else {'answer_id': answer_id}
+    
+    monkeypatch.setattr(crawler, 'get_answer_details', get_answer_details)
+    answer_ids = [str(index) for index in range(100)]
+    details = asyncio.run(crawler.get_answer_details_batch(answer_ids, skip_existing=False, max_workers=3))
+    
+    assert peak == 3
+    # 失败的回答被丢弃，其余按输入顺序返回
+    assert [detail['answer_id'] for detail in details] == [aid for aid in answer_ids if aid != '7']
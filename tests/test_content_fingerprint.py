@@ -0,0 +1,57 @@
+"""
+内容指纹测试：默认配置下（不启用已见ID过滤器），内容未变化的已入库回答不再清理HTML，内容变化的回答重新清理并更新
+"""
+from sqlalchemy import update
+
+from crawler.zhihu.zhihu_crawler import ZhihuCrawler
+from data.models import ZhihuAnswer
+
+
+def _count_clean_calls(crawler, monkeypatch) -> list:
+    calls = []
+    clean = crawler._clean_html_content
+    
+    def counting_clean(html_content):
+        calls.append(html_content)
+        return clean(html_content)
+    
+    monkeypatch.setattr(crawler, '_clean_html_content', counting_clean)
+    return calls
+
+
+def test_unchanged_answers_are_not_cleaned_again(stub_config, storage, monkeypatch):
+    crawler = ZhihuCrawler()
+    try:
+        calls = _count_clean_calls(crawler, monkeypatch)
+        first = crawler.search_incremental('kw', max_pages=2, limit=20, storage=storage)
+        assert first['saved_count'] == 40
+        # 首次入库：每条回答清理标题和正文
+        assert len(calls) == 80
+        
+        db = next(storage.get_db())
+        try:
+            stored = {row.answer_id: row.content for row in db.query(ZhihuAnswer)}
+            changed_id = sorted(stored)[0]
+            db.execute(update(ZhihuAnswer).where(ZhihuAnswer.answer_id == changed_id)
+                       .values(content_hash='stale'))
+            db.commit()
+        finally:
+            db.close()
+        
+        # 另一个关键词没有水位，同样的回答再次出现：只有指纹变化的一条重新清理
+        calls.clear()
+        second = crawler.search_incremental('other', max_pages=2, limit=20, storage=storage)
+        assert second['saved_count'] == 0
+        assert second['new_results'] == 40
+        assert len(calls) == 2
+        
+        db = next(storage.get_db())
+        try:
+            rows = {row.answer_id: row for row in db.query(ZhihuAnswer)}
+        finally:
+            db.close()
+        # 未清理的回答不会覆盖已入库的正文，指纹变化的回答按重新清理的结果更新
+        assert {answer_id: row.content for answer_id, row in rows.items()} == stored
+        assert rows[changed_id].content_hash != 'stale'
+    finally:
+        crawler.close()
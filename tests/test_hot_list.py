@@ -0,0 +1,88 @@
+"""
+热榜快照测试：关键帧与变化条目的记录，按快照ID和按时间点重建的热榜与每次轮询一致，
+包括下榜后重新上榜的问题和低于阈值的热度变化
+"""
+from datetime import datetime, timedelta
+
+from data.hot_list import diff_hot_states
+
+START = datetime(2026, 1, 1, 8, 0)
+
+
+def _poll(*items) -> list:
+    """
+    构造一次热榜轮询结果，items为(question_id, heat)，按顺序排名
+    """
+    return [
+        {'question_id': question_id, 'title': f'问题 {question_id}', 'url': f'https://www.zhihu.com/question/{question_id}',
+         'rank': rank, 'metrics': f'{heat} 热度'}
+        for rank, (question_id, heat) in enumerate(items, start=1)
+    ]
+
+
+# 每次轮询及重建后期望的热榜(question_id, rank, heat)：热度变化低于5%时沿用上次记录的热度
+POLLS = [
+    (_poll(('1', 1000), ('2', 800), ('3', 600)),
+     [('1', 1, 1000), ('2', 2, 800), ('3', 3, 600)]),
+    # 热度变化1%，不记录任何条目
+    (_poll(('1', 1010), ('2', 800), ('3', 600)),
+     [('1', 1, 1000), ('2', 2, 800), ('3', 3, 600)]),
+    # 排名变化、问题3下榜、问题4上榜；问题1热度相对记录值变化2%，沿用记录值
+    (_poll(('2', 900), ('1', 1020), ('4', 500)),
+     [('2', 1, 900), ('1', 2, 1000), ('4', 3, 500)]),
+    # 关键帧
+    (_poll(('2', 900), ('1', 1200), ('4', 500)),
+     [('2', 1, 900), ('1', 2, 1200), ('4', 3, 500)]),
+    (_poll(('2', 900), ('4', 700), ('5', 100)),
+     [('2', 1, 900), ('4', 2, 700), ('5', 3, 100)]),
+    # 问题1重新上榜
+    (_poll(('2', 930), ('4', 700), ('1', 1300)),
+     [('2', 1, 900), ('4', 2, 700), ('1', 3, 1300)]),
+    # 关键帧
+    (_poll(('1', 2000), ('2', 950)),
+     [('1', 1, 2000), ('2', 2, 950)]),
+]
+
+
+def _items(hot_list: dict) -> list:
+    return [(item['question_id'], item['rank'], item['heat']) for item in hot_list['items']]
+
+
+def test_snapshots_round_trip_every_poll(storage):
+    storage.hot_list_config = {'KEYFRAME_INTERVAL': 3, 'HEAT_CHANGE_THRESHOLD': 0.05}
+    
+    summaries = [
+        storage.save_hot_list_snapshot(questions, snapshot_time=START + timedelta(hours=index))
+        for index, (questions, _) in enumerate(POLLS)
+    ]
+    assert [summary['is_keyframe'] for summary in summaries] == [True, False, False, True, False, False, True]
+    # 关键帧记录全部在榜条目，其余只记录变化（含下榜）
+    assert [summary['entry_count'] for summary in summaries] == [3, 0, 4, 3, 3, 2, 3]
+    assert summaries[0]['saved_questions'] == 3
+    
+    for summary, (_, expected) in zip(summaries, POLLS):
+        assert _items(storage.get_hot_list_at(snapshot_id=summary['snapshot_id'])) == expected
+    
+    # 两个关键帧之间的时间点：取该时间之前最近的快照，从前一个关键帧回放
+    between = storage.get_hot_list_at(at=START + timedelta(hours=4, minutes=30))
+    assert between['snapshot_id'] == summaries[4]['snapshot_id']
+    assert _items(between) == POLLS[4][1]
+    assert _items(storage.get_hot_list_at(at=START + timedelta(hours=2, minutes=59))) == POLLS[2][1]
+    assert _items(storage.get_hot_list_at()) == POLLS[-1][1]
+    assert storage.get_hot_list_at(at=START - timedelta(minutes=1)) is None
+    
+    rebuilt = {item['question_id']: item for item in storage.get_hot_list_at(snapshot_id=summaries[2]['snapshot_id'])['items']}
+    assert rebuilt['2']['rank_delta'] == 1
+    assert rebuilt['2']['heat_delta'] == 100
+    assert rebuilt['1']['rank_delta'] == -1
+    assert rebuilt['1']['heat_delta'] == 0
+    assert rebuilt['4']['rank_delta'] is None
+    assert rebuilt['1']['title'] == '问题 1'
+
+
+def test_sub_threshold_drift_is_recorded_once_it_accumulates():
+    recorded = {'1': {'rank': 1, 'heat': 1000}}
+    # 相对上次记录值而不是上次轮询值比较，缓慢的热度变化累积超过阈值后记录
+    assert diff_hot_states(recorded, {'1': {'rank': 1, 'heat': 1040}}, 0.05) == []
+    entries = diff_hot_states(recorded, {'1': {'rank': 1, 'heat': 1060}}, 0.05)
+    assert [(entry['heat'], entry['heat_delta']) for entry in entries] == [(1060, 60)]
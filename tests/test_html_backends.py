@@ -0,0 +1,84 @@
+"""
+HTML解析后端一致性测试：lxml与BeautifulSoup后端对边界用例语料的文本清理结果、热门条目解析结果和序列化HTML一致
+"""
+import pytest
+
+from crawler.zhihu.fixtures import build_hot_list_html
+from crawler.zhihu.html_backends import get_html_backend
+
+pytest.importorskip('lxml')
+
+CLEAN_CORPUS = [
+    # ruby注音：rt和rp中的文本（含嵌套元素）不计入正文
+    '<ruby>漢<rt>han</rt></ruby>字',
+    '<p><ruby>漢<rp>(</rp><rt>han</rt><rp>)</rp></ruby>字</p>',
+    '<ruby><rb>漢</rb><rt>han</rt><rb>字</rb><rt>zi</rt></ruby>',
+    '<ruby>漢<rt>h<b>a</b>n</rt></ruby>',
+    '<p>x<rt>bare</rt>y</p>',
+    '<p>a<script>x</script>b<style>s</style><template>t</template>c</p>',
+    '<p>a<!-- c -->b</p>',
+    '<p>x<![CDATA[cd]]>y</p>',
+    '<p>&amp; &lt;tag&gt; &nbsp;x &#x6f22;</p>',
+    '<p>a<br>b<br/>c</p>',
+    '<textarea>ta</textarea><noscript>ns</noscript>',
+    '<html><head><title>T</title></head><body>B</body></html>',
+    '<!DOCTYPE html><p>d</p>',
+    '<svg><title>s</title><text>t</text></svg>',
+    '<table><tr><td>1</td><td> 2 </td></tr></table>',
+    '<p>  多个\n\t空白  </p>',
+    '<p>未闭合<b>标签',
+    '<p></p>',
+    '纯文本',
+    '  ',
+    '<',
+    '&',
+]
+
+HOT_ITEM_WITH_RUBY = (
+    '<section class="HotItem"><div class="HotItem-rank">1</div>'
+    '<h2 class="HotItem-title"><a href="https://www.zhihu.com/question/1?utm_source=hot">'
+    '<ruby>漢<rp>(</rp><rt>han</rt><rp>)</rp></ruby>字 &amp; 读音</a></h2>'
+    '<p class="HotItem-excerpt">描述<rt>注音</rt><script>x</script></p>'
+    '<div class="HotItem-metrics"><!-- m -->12 万热度<span>分享</span></div></section>'
+)
+
+
+@pytest.fixture
+def backends():
+    return get_html_backend('bs4'), get_html_backend('lxml')
+
+
+@pytest.mark.parametrize('html_content', CLEAN_CORPUS)
+def test_clean_html_parity(backends, html_content):
+    bs4_backend, lxml_backend = backends
+    assert lxml_backend.clean_html(html_content) == bs4_backend.clean_html(html_content)
+
+
+def test_ruby_annotations_are_dropped(backends):
+    for backend in backends:
+        assert backend.clean_html('<ruby>漢<rt>han</rt></ruby>') == '漢'
+
+
+def _parse_all(backend, html: str) -> list:
+    items = []
+    for item in backend.find_hot_items(html, 50):
+        question = backend.parse_hot_item(item)
+        question.pop('crawl_time')
+        items.append((question, backend.item_to_html(item)))
+    return items
+
+
+@pytest.mark.parametrize('html', [build_hot_list_html(20, seed=3), HOT_ITEM_WITH_RUBY])
+def test_hot_item_parity(backends, html):
+    bs4_backend, lxml_backend = backends
+    expected = _parse_all(bs4_backend, html)
+    assert expected
+    assert _parse_all(lxml_backend, html) == expected
+
+
+def test_hot_item_ruby_text(backends):
+    for backend in backends:
+        question = backend.parse_hot_item(backend.find_hot_items(HOT_ITEM_WITH_RUBY, 1)[0])
+        assert question['title'] == '漢字 & 读音'
+        assert question['excerpt'] == '描述'
+        assert question['metrics'] == '12 万热度分享'
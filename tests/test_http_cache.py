@@ -0,0 +1,78 @@
+"""
+HTTP缓存重新验证测试：304时缓存正文丢失应重新获取完整响应
+"""
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from crawler.base_crawler import BaseCrawler
+from crawler.http_cache import HttpCache
+
+BODY = b'{"data": []}'
+ETAG = '"v1"'
+
+
+class _EtagHandler(BaseHTTPRequestHandler):
+    """
+    带ETag的测试端点，If-None-Match匹配时返回304，并记录每次请求的条件请求头
+    """
+    
+    def do_GET(self):
+        self.server.conditional.append(self.headers.get('If-None-Match'))
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.send_header('ETag', ETAG)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.send_header('ETag', ETAG)
+        self.end_headers()
+        self.wfile.write(BODY)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def etag_server():
+    """
+    本地ETag测试服务器
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _EtagHandler)
+    server.conditional = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_revalidation_refetches_when_cached_body_is_missing(etag_server, tmp_path):
+    """
+    条目元数据仍在但正文文件已删除时，304不能作为成功响应返回，应删除条目并去掉条件请求头重新请求
+    """
+    base_url = f"http://127.0.0.1:{etag_server.server_address[1]}"
+    url = f"{base_url}/api/v4/questions/1/answers"
+    cache = HttpCache(str(tmp_path / 'http_cache'))
+    crawler = BaseCrawler(base_url=base_url, user_agent='test', cookie='', download_delay=0, http_cache=cache)
+    try:
+        assert crawler.get(url).content == BODY
+        entry = cache.lookup(url)
+        assert entry is not None
+        
+        os.remove(cache._paths(entry['key'])[1])
+        response = crawler.get(url)
+        
+        assert response.status_code == 200
+        assert response.content == BODY
+        # 首次请求、条件请求（304）、去掉条件请求头的重新请求
+        assert etag_server.conditional == [None, ETAG, None]
+        # 重新请求的完整响应已重新缓存，下一次重新验证直接使用缓存正文
+        assert crawler.get(url).content == BODY
+        assert etag_server.conditional[-1] == ETAG
+    finally:
+        crawler.close()
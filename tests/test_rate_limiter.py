@@ -0,0 +1,93 @@
+"""
+令牌桶限速测试：突发额度、按到达顺序预约的等待时间、调整速率，以及同一主机以不同配置获取共享限速器时按新配置调整
+"""
+import time
+
+import pytest
+
+from crawler import rate_limiter
+from crawler.rate_limiter import TokenBucket, get_host_limiter
+
+
+class FakeClock:
+    """
+    手动推进的单调时钟
+    """
+    
+    def __init__(self):
+        self.now = 100.0
+    
+    def __call__(self) -> float:
+        return self.now
+    
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def test_reserve_allows_burst_then_spaces_requests():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock)
+    
+    assert [bucket._reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # 桶空后并发调用方按到达顺序依次预约：0.5秒、1秒、1.5秒后放行
+    assert [bucket._reserve() for _ in range(3)] == pytest.approx([0.5, 1.0, 1.5])
+    
+    # 已预约的额度补充完之前仍需等待，空闲足够久后最多累积到burst个令牌
+    clock.advance(1.5)
+    assert bucket._reserve() == pytest.approx(0.5)
+    clock.advance(10)
+    assert [bucket._reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket._reserve() == pytest.approx(0.5)
+
+
+def test_set_rate_settles_tokens_at_old_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, burst=1, clock=clock)
+    assert bucket._reserve() == 0.0
+    
+    # 调整前的0.5秒按旧速率补充0.5个令牌，剩余0.5个按新速率补充
+    clock.advance(0.5)
+    bucket.set_rate(4)
+    assert bucket._reserve() == pytest.approx(0.125)
+    
+    bucket.set_rate(4, burst=5)
+    clock.advance(10)
+    assert [bucket._reserve() for _ in range(5)] == [0.0] * 5
+    assert bucket._reserve() == pytest.approx(0.25)
+
+
+def test_acquire_sleeps_for_reserved_wait():
+    bucket = TokenBucket(rate=20, burst=1)
+    start = time.monotonic()
+    assert bucket.acquire() == 0.0
+    waits = [bucket.acquire() for _ in range(3)]
+    elapsed = time.monotonic() - start
+    
+    assert all(0 < wait <= 0.05 for wait in waits)
+    # 3个令牌按每秒20个补充，至少等待0.15秒
+    assert 0.14 <= elapsed < 0.5
+
+
+def test_host_limiter_is_reconfigured_when_config_differs(monkeypatch):
+    monkeypatch.setattr(rate_limiter, '_host_limiters', {})
+    monkeypatch.setattr(rate_limiter, '_host_configs', {})
+    warnings = []
+    monkeypatch.setattr(rate_limiter.logger, 'warning', warnings.append)
+    url = 'https://www.zhihu.com/api/v4/search_v3'
+    
+    limiter = get_host_limiter(url, 0.5, 2)
+    assert get_host_limiter('https://www.zhihu.com/api/v4/questions/1', 0.5, 2) is limiter
+    assert get_host_limiter(url, None) is None
+    
+    # 自适应控制器调整速率不视为配置变化
+    limiter.set_rate(0.2)
+    assert get_host_limiter(url, 0.5, 2).rate == 0.2
+    
+    assert warnings == []
+    
+    assert get_host_limiter(url, 5, 4) is limiter
+    assert (limiter.rate, limiter.burst) == (5.0, 4)
+    assert len(warnings) == 1 and 'www.zhihu.com' in warnings[0]
+    
+    # 其他主机使用独立的限速器
+    assert get_host_limiter('https://zhuanlan.zhihu.com/p/1', 0.5, 2) is not limiter
@@ -0,0 +1,73 @@
+"""
+增量搜索水位测试：达到max_pages暂停的任务不作为水位，下一次增量搜索先续爬暂停任务，较旧的页面不会漏爬
+"""
+from crawler.zhihu.zhihu_crawler import ZhihuCrawler
+from data.models import ZhihuAnswer
+
+
+def _answer_count(storage) -> int:
+    db = next(storage.get_db())
+    try:
+        return db.query(ZhihuAnswer).count()
+    finally:
+        db.close()
+
+
+def test_paused_task_is_not_a_watermark(stub_config, storage):
+    crawler = ZhihuCrawler()
+    try:
+        first = crawler.search_incremental('kw', max_pages=3, limit=20, storage=storage)
+        assert first['status'] == 'paused'
+        assert first['page_count'] == 3
+        assert first['new_results'] == 60
+        assert storage.get_search_watermark('kw') is None
+    finally:
+        crawler.close()
+
+
+def test_incremental_run_resumes_paused_task_and_fetches_older_results(stub_config, storage):
+    crawler = ZhihuCrawler()
+    try:
+        first = crawler.search_incremental('kw', max_pages=3, limit=20, storage=storage)
+        
+        # 下一次增量搜索续爬暂停任务的第4-6页，而不是停在暂停任务的最新条目
+        second = crawler.search_incremental('kw', max_pages=3, limit=20, storage=storage)
+        assert second['search_task_id'] == first['search_task_id']
+        assert second['status'] == 'paused'
+        assert second['page_count'] == 6
+        assert second['new_results'] == 60
+        assert second['saved_count'] == 60
+        
+        # 替身服务器共200条（10页），继续续爬直到到达末页
+        third = crawler.search_incremental('kw', max_pages=5, limit=20, storage=storage)
+        assert third['search_task_id'] == first['search_task_id']
+        assert third['status'] == 'completed'
+        assert third['page_count'] == 10
+        assert third['new_results'] == 80
+        assert _answer_count(storage) == 200
+        assert storage.get_search_watermark('kw') is not None
+        
+        # 任务完成后才开始新任务，没有新回答时在第一页就到达水位
+        fourth = crawler.search_incremental('kw', max_pages=3, limit=20, storage=storage)
+        assert fourth['search_task_id'] != first['search_task_id']
+        assert fourth['status'] == 'completed'
+        assert fourth['page_count'] == 1
+        assert fourth['new_results'] == 0
+    finally:
+        crawler.close()
+
+
+def test_resume_paused_task_is_not_cut_by_later_watermark(stub_config, storage):
+    crawler = ZhihuCrawler()
+    try:
+        first = crawler.search_incremental('kw', max_pages=3, limit=20, storage=storage)
+        # 之后开始的任务已完成并记录了水位，续爬较早的暂停任务时只使用它之前的水位
+        later = storage.save_search_task(keyword='kw', status='running')
+        crawler.resume_search(later, max_pages=1, limit=20, storage=storage)
+        storage.update_search_task(later, status='completed')
+        
+        resumed = crawler.resume_search(first['search_task_id'], max_pages=5, limit=20, storage=storage)
+        assert resumed['page_count'] == 5
+        assert resumed['new_results'] == 40
+    finally:
+        crawler.close()
@@ -0,0 +1,43 @@
+"""
+已见ID过滤器测试：过滤器绑定到实际保存结果的存储实例，刷新互动数据时搜索不使用过滤器
+"""
+from config.settings import STORAGE_CONFIG
+from crawler.zhihu.zhihu_crawler import ZhihuCrawler
+
+
+def _enable_seen_filter(stub_config, monkeypatch):
+    monkeypatch.setitem(stub_config, 'SEEN_FILTER', dict(stub_config['SEEN_FILTER'], ENABLED=True, MATCH='id'))
+
+
+def test_seen_filter_follows_passed_storage(stub_config, storage, monkeypatch):
+    _enable_seen_filter(stub_config, monkeypatch)
+    crawler = ZhihuCrawler()
+    try:
+        first = crawler.search_incremental('kw', max_pages=2, limit=20, storage=storage)
+        assert first['saved_count'] == 40
+        # 入库时更新的是这个存储实例所用数据库的过滤器，而不是全局data_storage的
+        assert storage.seen_filter is not None
+        assert storage.seen_filter is not crawler.seen_filter
+        assert storage.seen_filter.snapshot()['answer']['ids'] == 40
+        
+        # 另一个关键词没有水位，已入库的回答在解析前被跳过
+        second = crawler.search_incremental('other', max_pages=2, limit=20, storage=storage)
+        assert second['new_results'] == 0
+        assert storage.seen_filter.snapshot()['answer']['skipped'] == 40
+    finally:
+        crawler.close()
+
+
+def test_refresh_metrics_bypasses_seen_filter(stub_config, storage, monkeypatch):
+    _enable_seen_filter(stub_config, monkeypatch)
+    monkeypatch.setitem(STORAGE_CONFIG, 'REFRESH_ANSWER_METRICS', True)
+    crawler = ZhihuCrawler()
+    try:
+        crawler.search_incremental('kw', max_pages=2, limit=20, storage=storage)
+        
+        # 已入库的回答仍然进入保存流程，点赞数和评论数才能刷新
+        second = crawler.search_incremental('other', max_pages=2, limit=20, storage=storage)
+        assert second['new_results'] == 40
+        assert second['saved_count'] == 0
+    finally:
+        crawler.close()
@@ -0,0 +1,229 @@
+"""
+存储层批量入库测试：分块IN查询、ON CONFLICT DO NOTHING RETURNING、刷新互动数据、写入冲突重试，
+以及内容评分的唯一索引upsert、无索引时的回退、分块提交和迁移去重
+"""
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import IntegrityError
+
+import migrate_database
+from data.models import ContentScore, ZhihuAnswer
+from data.storage import DataStorage
+
+
+def _answers(count: int, start: int = 0, votes: int = 0, body: str = '') -> list:
+    return [
+        {
+            'answer_id': str(1000 + index),
+            'question_id': '1',
+            'title': f'回答 {index}',
+            'title_raw': f'<em>回答</em> {index}',
+            'content': f'正文 {index}{body}',
+            'content_raw': f'<p>正文 {index}{body}</p>',
+            'url': f'https://www.zhihu.com/answer/{1000 + index}',
+            'question_url': 'https://www.zhihu.com/question/1',
+            'vote_up_count': votes + index,
+            'comment_count': index,
+            'create_time': 1700000000 + index,
+        }
+        for index in range(start, start + count)
+    ]
+
+
+def _stored(storage) -> dict:
+    db = next(storage.get_db())
+    try:
+        return {row.answer_id: row for row in db.query(ZhihuAnswer)}
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def answer_selects(storage):
+    """
+    记录查询zhihu_answers的SELECT语句
+    """
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'zhihu_answers' in statement:
+            statements.append(statement)
+    
+    event.listen(storage.engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(storage.engine, 'before_cursor_execute', record)
+
+
+def test_save_answers_chunks_existence_checks(storage, answer_selects):
+    storage.bulk_chunk_size = 3
+    answers = _answers(7)
+    
+    # 输入内重复的回答只保存一次
+    assert storage.save_zhihu_answers(answers + answers[:2]) == 7
+    assert len(answer_selects) == 3
+    assert len(_stored(storage)) == 7
+    
+    # 全部已存在且内容未变化
+    answer_selects.clear()
+    assert storage.save_zhihu_answers(answers) == 0
+    assert len(answer_selects) == 3
+    
+    # 跨块混合新增与已存在
+    assert storage.save_zhihu_answers(_answers(5, start=5)) == 3
+    assert len(_stored(storage)) == 10
+
+
+def test_save_answers_updates_changed_content_only(storage):
+    storage.save_zhihu_answers(_answers(4))
+    before = _stored(storage)
+    
+    changed = _answers(2, body='（补充）') + _answers(2, start=2)
+    assert storage.save_zhihu_answers(changed) == 0
+    
+    after = _stored(storage)
+    assert after['1000'].content_raw == '<p>正文 0（补充）</p>'
+    assert after['1000'].content_hash != before['1000'].content_hash
+    assert after['1002'].content_hash == before['1002'].content_hash
+
+
+def test_insert_new_returns_only_inserted_keys(storage):
+    storage.save_zhihu_answers(_answers(2))
+    rows = [
+        {'answer_id': answer_id, 'question_id': '1', 'title': 't', 'content': 'c', 'content_raw': 'c',
+         'content_hash': 'h', 'vote_up': 0, 'comment_count': 0}
+        for answer_id in ('1000', '1001', '2000', '2001')
+    ]
+    db = next(storage.get_db())
+    try:
+        assert storage._insert_new(db, ZhihuAnswer, 'answer_id', rows) == {'2000', '2001'}
+        db.commit()
+    finally:
+        db.close()
+    
+    stored = _stored(storage)
+    assert len(stored) == 4
+    # 冲突的行被忽略，已有回答不被覆盖
+    assert stored['1000'].content_hash != 'h'
+
+
+def test_refresh_metrics_upserts_vote_and_comment_counts(storage):
+    storage.save_zhihu_answers(_answers(4))
+    refreshed = _answers(4, votes=100)
+    
+    # 默认不刷新互动数据
+    assert storage.save_zhihu_answers(refreshed) == 0
+    assert _stored(storage)['1001'].vote_up == 1
+    
+    # 刷新时新增回答与互动数据变化的已有回答在同一条语句中写入
+    assert storage.save_zhihu_answers(refreshed + _answers(1, start=4, votes=100), refresh_metrics=True) == 1
+    stored = _stored(storage)
+    assert len(stored) == 5
+    assert [stored[str(1000 + index)].vote_up for index in range(5)] == [100, 101, 102, 103, 104]
+    assert stored['1003'].comment_count == 3
+    assert stored['1003'].content_raw == '<p>正文 3</p>'
+
+
+def test_integrity_error_is_retried_once(storage, monkeypatch):
+    insert_new = storage._insert_new
+    calls = []
+    
+    def conflicting_insert(db, model, key, rows):
+        calls.append(len(rows))
+        if len(calls) == 1:
+            # 模拟其他进程在存在性查询之后写入了同样的回答
+            raise IntegrityError('INSERT INTO zhihu_answers', {}, Exception('UNIQUE constraint failed'))
+        return insert_new(db, model, key, rows)
+    
+    monkeypatch.setattr(storage, '_insert_new', conflicting_insert)
+    assert storage.save_zhihu_answers(_answers(3)) == 3
+    assert calls == [3, 3]
+    assert len(_stored(storage)) == 3
+    
+    # 不重试时直接返回0
+    calls.clear()
+    assert storage.save_zhihu_answers(_answers(2, start=3), retry_on_conflict=False) == 0
+    assert len(_stored(storage)) == 3
+
+
+def _score(content_id: str, total: float = 70.0, **fields) -> dict:
+    return {'content_id': content_id, 'content_type': 'answer', 'quality_score': 80.0, 'spread_score': 60.0,
+            'operation_score': 70.0, 'total_score': total, 'evaluation_details': '评估', **fields}
+
+
+def _stored_scores(storage) -> list:
+    db = next(storage.get_db())
+    try:
+        return db.query(ContentScore).order_by(ContentScore.id).all()
+    finally:
+        db.close()
+
+
+def _drop_score_index(db_url: str):
+    """
+    模拟未迁移的旧数据库：删除content_scores的唯一索引
+    """
+    engine = create_engine(db_url)
+    with engine.begin() as conn:
+        conn.execute(text('DROP INDEX uq_content_scores_content'))
+    engine.dispose()
+
+
+def test_save_content_scores_upserts_on_unique_index(storage):
+    assert storage.content_score_upsert is True
+    assert storage.save_content_scores([_score('1'), _score('2')]) == 2
+    
+    # 同一内容再次评分时更新，只提供部分列时其余列保留
+    assert storage.save_content_scores([{'content_id': '1', 'content_type': 'answer', 'total_score': 95.0},
+                                        _score('3')]) == 2
+    scores = {score.content_id: score for score in _stored_scores(storage)}
+    assert len(scores) == 3
+    assert scores['1'].total_score == 95.0
+    assert scores['1'].quality_score == 80.0
+    # 同一批中重复的内容以最后一条为准
+    assert storage.save_content_scores([_score('2', total=10.0), _score('2', total=20.0)]) == 1
+    assert {score.content_id: score.total_score for score in _stored_scores(storage)}['2'] == 20.0
+
+
+def test_save_content_scores_without_index_falls_back_to_lookup(storage):
+    storage.save_content_scores([_score('1')])
+    _drop_score_index(storage.db_url)
+    legacy = DataStorage(storage.db_url)
+    assert legacy.content_score_upsert is False
+    
+    assert legacy.save_content_scores([_score('1', total=50.0), _score('2')]) == 2
+    scores = {score.content_id: score.total_score for score in _stored_scores(legacy)}
+    assert scores == {'1': 50.0, '2': 70.0}
+
+
+def test_save_content_scores_commits_per_chunk(storage):
+    commits = []
+    event.listen(storage.engine, 'commit', lambda conn: commits.append(1))
+    # 最后一块缺少content_type，违反非空约束：已提交的块保留
+    scores = [_score(str(index)) for index in range(4)] + [{'content_id': '9', 'content_type': None}]
+    assert storage.save_content_scores(scores, chunk_size=2) == 4
+    assert len(commits) == 2
+    assert len(_stored_scores(storage)) == 4
+
+
+def test_migration_dedupes_scores_and_creates_unique_index(storage, monkeypatch):
+    storage.save_content_scores([_score('1')])
+    _drop_score_index(storage.db_url)
+    legacy = DataStorage(storage.db_url)
+    # 旧版本逐条保存时可能写入的重复评分
+    db = next(legacy.get_db())
+    try:
+        db.add_all([ContentScore(**_score('1', total=80.0)), ContentScore(**_score('1', total=90.0)),
+                    ContentScore(**_score('2'))])
+        db.commit()
+    finally:
+        db.close()
+    
+    monkeypatch.setattr(migrate_database, 'DATABASE_URL', storage.db_url)
+    assert migrate_database.migrate_database() is True
+    
+    # 每个内容保留ID最大（最新）的一条
+    assert [(score.content_id, score.total_score) for score in _stored_scores(legacy)] == [('1', 90.0), ('2', 70.0)]
+    migrated = DataStorage(storage.db_url)
+    assert migrated.content_score_upsert is True
+    assert migrated.save_content_scores([_score('2', total=30.0)]) == 1
+    assert len(_stored_scores(migrated)) == 2
@@ -0,0 +1,60 @@
+"""
+录制/回放传输层测试：对替身服务器录制后关闭服务器，离线回放得到与录制时相同的响应，磁带中没有的请求报错
+"""
+import pytest
+import requests
+
+from crawler.base_crawler import BaseCrawler
+from crawler.zhihu.stub_server import ZhihuStubServer
+
+REQUESTS = [
+    ('/hot', None),
+    ('/api/v4/search_v3', {'q': '关键词', 'offset': 0, 'limit': 20}),
+    ('/api/v4/search_v3', {'q': '关键词', 'offset': 20, 'limit': 20}),
+    ('/api/v4/answers/1000003', None),
+]
+
+
+def _crawler(base_url: str, mode: str, cassette_dir: str) -> BaseCrawler:
+    return BaseCrawler(base_url=base_url, user_agent='test', cookie='', download_delay=0,
+                       transport={'MODE': mode, 'CASSETTE_DIR': cassette_dir})
+
+
+def _summary(response: requests.Response) -> tuple:
+    return response.status_code, response.headers.get('Content-Type'), response.content
+
+
+def test_replay_returns_recorded_responses_offline(tmp_path):
+    cassette_dir = str(tmp_path / 'cassettes')
+    # 压缩响应：磁带保存解码后的正文，回放时不带Content-Encoding
+    server = ZhihuStubServer(port=0, search_total=40, content_size=200, compress=True).start_background()
+    base_url = server.base_url
+    recorder = _crawler(base_url, 'record', cassette_dir)
+    try:
+        responses = [recorder.get(base_url + path, params=params) for path, params in REQUESTS]
+        assert responses[1].headers['Content-Encoding'] == 'gzip'
+        recorded = [_summary(response) for response in responses]
+        with pytest.raises(requests.HTTPError):
+            recorder.get(base_url + '/missing')
+    finally:
+        recorder.close()
+        server.shutdown()
+        server.server_close()
+    
+    replayer = _crawler(base_url, 'replay', cassette_dir)
+    try:
+        replayed = [replayer.get(base_url + path, params=params) for path, params in REQUESTS]
+        assert [_summary(response) for response in replayed] == recorded
+        assert replayed[1].json()['paging']['is_end'] is False
+        assert 'Content-Encoding' not in replayed[1].headers
+        
+        # 录制的错误响应同样回放
+        with pytest.raises(requests.HTTPError) as error:
+            replayer.get(base_url + '/missing')
+        assert error.value.response.status_code == 404
+        
+        # 参数不同即为磁带未命中，回放模式不访问网络，直接报连接错误
+        with pytest.raises(requests.ConnectionError, match='磁带中没有该请求'):
+            replayer.get(base_url + '/api/v4/search_v3', params={'q': '关键词', 'offset': 40, 'limit': 20})
+    finally:
+        replayer.close()
@@ -0,0 +1,114 @@
+"""
+工作队列测试：租约过期后重新领取、过期令牌失效、失败次数计数，以及暂停的搜索任务放回队列继续
+"""
+import time
+
+import pytest
+
+from crawler.zhihu.queue_worker import process_item
+from crawler.zhihu.zhihu_crawler import ZhihuCrawler
+from data.models import ZhihuAnswer
+from data.work_queue import WorkQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    """
+    临时数据库上的工作队列，最多领取2次，失败后立即可重新领取
+    """
+    return WorkQueue('sqlite:///' + str(tmp_path / 'queue.db'),
+                     config={'VISIBILITY_TIMEOUT': 60, 'MAX_ATTEMPTS': 2, 'RETRY_DELAY': 0})
+
+
+def test_expired_lease_is_released_and_stale_token_rejected(queue):
+    queue.enqueue(['kw'])
+    first = queue.lease('worker-a', visibility_timeout=0.05)[0]
+    assert first['attempts'] == 1
+    # 租约未过期时其他工作进程领取不到
+    assert queue.lease('worker-b') == []
+    
+    time.sleep(0.1)
+    second = queue.lease('worker-b')[0]
+    assert second['id'] == first['id']
+    assert second['attempts'] == 2
+    assert second['lease_token'] != first['lease_token']
+    
+    # 原工作进程的令牌已失效，不能续租或完成
+    assert queue.heartbeat(first['id'], first['lease_token']) is False
+    assert queue.complete(first['id'], first['lease_token']) is False
+    assert queue.complete(second['id'], second['lease_token'], {'status': 'completed'}) is True
+    assert queue.stats()['done'] == 1
+
+
+def test_heartbeat_extends_lease(queue):
+    queue.enqueue(['kw'])
+    item = queue.lease('worker-a', visibility_timeout=0.05)[0]
+    assert queue.heartbeat(item['id'], item['lease_token'], visibility_timeout=60, search_task_id=7) is True
+    
+    time.sleep(0.1)
+    assert queue.lease('worker-b') == []
+    assert queue.get_items()[0]['search_task_id'] == 7
+
+
+def test_fail_counts_attempts(queue):
+    queue.enqueue(['kw'])
+    item = queue.lease('worker-a')[0]
+    assert queue.fail(item['id'], item['lease_token'], 'boom') is True
+    assert queue.get_items()[0]['status'] == 'pending'
+    
+    item = queue.lease('worker-a')[0]
+    assert item['attempts'] == 2
+    assert queue.fail(item['id'], item['lease_token'], 'boom again') is True
+    failed = queue.get_items()[0]
+    assert failed['status'] == 'failed'
+    assert failed['last_error'] == 'boom again'
+    assert queue.lease('worker-a') == []
+
+
+def test_requeue_expired_fails_after_max_attempts(queue):
+    queue.enqueue(['kw'])
+    queue.lease('worker-a', visibility_timeout=0.01)
+    time.sleep(0.05)
+    queue.lease('worker-b', visibility_timeout=0.01)
+    time.sleep(0.05)
+    
+    assert queue.requeue_expired() == 1
+    assert queue.stats()['failed'] == 1
+
+
+def test_requeue_keeps_search_task_and_resets_attempts(queue):
+    queue.enqueue(['kw'])
+    item = queue.lease('worker-a')[0]
+    queue.heartbeat(item['id'], item['lease_token'], search_task_id=3)
+    assert queue.requeue(item['id'], item['lease_token'], {'status': 'paused'}) is True
+    
+    requeued = queue.get_items()[0]
+    assert requeued['status'] == 'pending'
+    assert requeued['attempts'] == 0
+    assert requeued['search_task_id'] == 3
+    assert requeued['result'] == {'status': 'paused'}
+
+
+def test_paused_item_is_resumed_until_search_completes(stub_config, storage, queue):
+    queue.enqueue(['kw'], payload={'max_pages': 3, 'limit': 20})
+    crawler = ZhihuCrawler()
+    try:
+        statuses = []
+        while True:
+            items = queue.lease('worker-a')
+            if not items:
+                break
+            statuses.append(process_item(queue, items[0], crawler, storage)['status'])
+    finally:
+        crawler.close()
+    
+    # 替身服务器共10页：每次领取3页，第4次领取到达末页
+    assert statuses == ['paused', 'paused', 'paused', 'completed']
+    item = queue.get_items()[0]
+    assert item['status'] == 'done'
+    assert item['result']['page_count'] == 10
+    db = next(storage.get_db())
+    try:
+        assert db.query(ZhihuAnswer).count() == 200
+    finally:
+        db.close()